@@ -1,130 +1,1528 @@
-import collections
-import heapq
-
-class SearchAlgorithms:
-    def __init__(self, grid_size):
-        self.grid_size = grid_size
-        # Strict Clockwise Order: Up, Right, Bottom, B-Right, Left, T-Left, T-Right, B-Left [cite: 32-40]
-        self.directions = [
-            (-1, 0), (0, 1), (1, 0), (1, 1), 
-            (0, -1), (-1, -1), (-1, 1), (1, -1)
-        ]
-
-    def get_neighbors(self, node, grid):
-        neighbors = []
-        r, c = node
-        for dr, dc in self.directions:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < self.grid_size and 0 <= nc < self.grid_size:
-                if grid[nr][nc] != -1: # Avoid static and dynamic walls [cite: 17, 21]
-                    neighbors.append((nr, nc))
-        return neighbors
-
-    # --- 1. BFS (Already provided) ---
-    def bfs(self, start, target, grid, callback):
-        queue = collections.deque([start])
-        visited = {start: None}
-        while queue:
-            current = queue.popleft()
-            if current == target: return self.reconstruct_path(visited, target)
-            for neighbor in self.get_neighbors(current, grid):
-                if neighbor not in visited:
-                    visited[neighbor] = current
-                    queue.append(neighbor)
-                    callback(neighbor, list(queue), visited.keys())
-        return None
-
-    # --- 2. DFS [cite: 26] ---
-    def dfs(self, start, target, grid, callback):
-        stack = [start]
-        visited = {start: None}
-        while stack:
-            current = stack.pop()
-            if current == target: return self.reconstruct_path(visited, target)
-            for neighbor in self.get_neighbors(current, grid):
-                if neighbor not in visited:
-                    visited[neighbor] = current
-                    stack.append(neighbor)
-                    callback(neighbor, list(stack), visited.keys())
-        return None
-
-    # --- 3. UCS [cite: 27] ---
-    def ucs(self, start, target, grid, callback):
-        pq = [(0, start)]
-        visited = {start: (0, None)}
-        while pq:
-            cost, current = heapq.heappop(pq)
-            if current == target: return self.reconstruct_path_dict(visited, target)
-            for neighbor in self.get_neighbors(current, grid):
-                new_cost = cost + 1
-                if neighbor not in visited or new_cost < visited[neighbor][0]:
-                    visited[neighbor] = (new_cost, current)
-                    heapq.heappush(pq, (new_cost, neighbor))
-                    callback(neighbor, [n for c, n in pq], visited.keys())
-        return None
-
-    # --- 4. Depth-Limited Search (DLS)  ---
-    def dls(self, start, target, grid, limit, callback):
-        def recursive_dls(node, target, depth, visited):
-            if node == target: return [node]
-            if depth <= 0: return None
-            
-            for neighbor in self.get_neighbors(node, grid):
-                if neighbor not in visited:
-                    visited[neighbor] = node
-                    callback(neighbor, [], visited.keys())
-                    path = recursive_dls(neighbor, target, depth - 1, visited)
-                    if path: return [node] + path
-            return None
-        
-        visited = {start: None}
-        return recursive_dls(start, target, limit, visited)
-
-    # --- 5. Iterative Deepening DFS (IDDFS)  ---
-    def iddfs(self, start, target, grid, max_depth, callback):
-        for depth in range(max_depth):
-            result = self.dls(start, target, grid, depth, callback)
-            if result: return result
-        return None
-
-    # --- 6. Bidirectional Search  ---
-    def bidirectional_search(self, start, target, grid, callback):
-        f_queue, b_queue = collections.deque([start]), collections.deque([target])
-        f_visited, b_visited = {start: None}, {target: None}
-
-        while f_queue and b_queue:
-            # Forward step
-            f_curr = f_queue.popleft()
-            for n in self.get_neighbors(f_curr, grid):
-                if n not in f_visited:
-                    f_visited[n] = f_curr
-                    f_queue.append(n)
-                    callback(n, list(f_queue), f_visited.keys())
-                if n in b_visited: return self.join_paths(f_visited, b_visited, n)
-            
-            # Backward step
-            b_curr = b_queue.popleft()
-            for n in self.get_neighbors(b_curr, grid):
-                if n not in b_visited:
-                    b_visited[n] = b_curr
-                    b_queue.append(n)
-                    callback(n, list(b_queue), b_visited.keys())
-                if n in f_visited: return self.join_paths(f_visited, b_visited, n)
-        return None
-
-    def join_paths(self, f_visited, b_visited, meeting_node):
-        path_f = self.reconstruct_path(f_visited, meeting_node)
-        path_b = self.reconstruct_path(b_visited, meeting_node)
-        return path_f[:-1] + path_b[::-1]
-
-    def reconstruct_path(self, visited, current):
-        path = []
-        while current is not None:
-            path.append(current); current = visited[current]
-        return path[::-1]
-
-    def reconstruct_path_dict(self, visited, current):
-        path = []
-        while current is not None:
-            path.append(current); current = visited[current][1]
-        return path[::-1]
\ No newline at end of file
+import collections
+import heapq
+import importlib.util
+import sys
+import time
+from array import array
+
+
+def lazy_import(name):
+    """Module `name`, executed on first attribute access; None if not installed.
+
+    numpy alone is ~100 ms of startup, which a headless query on a small map
+    never needs. Other modules take `np` from here: an `import numpy` statement
+    would look at the module's __spec__ and so load it right away.
+    """
+    if name in sys.modules: return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None: return None
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = sys.modules[name] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+np = lazy_import('numpy')  # Only needed for the bitset BFS and the numpy backends
+
+UNSEEN = -2  # Parent/distance buffer marker for cells the search hasn't reached
+ROOT = -1    # Parent marker for the search root (plays the role of None)
+INF = float('inf')
+
+# Step events yielded by the *_steps generators as (kind, data) pairs
+PUSH = 'push'      # data = node added to the frontier
+POP = 'pop'        # data = node removed from the frontier
+EXPAND = 'expand'  # data = node whose neighbours were just generated
+RESET = 'reset'    # data = new depth limit (IDDFS starts a fresh pass)
+DONE = 'done'      # data = path (list of nodes) or None; always the last event
+
+
+def wall_buffer(grid):
+    """Returns a flat, indexable wall buffer for the grid (nonzero = blocked)"""
+    if isinstance(grid, (bytes, bytearray, memoryview)):
+        return grid  # Already flat (e.g. a view handed out by the environment)
+    if getattr(grid, 'ndim', None) == 2:
+        # NumPy grid (0 / -1 as int8): zero-copy byte view, walls read as 255
+        return memoryview(grid.reshape(-1).view('u1'))
+    buf = bytearray()
+    for row in grid:
+        buf += bytes(map((-1).__eq__, row))
+    return buf
+
+
+def _pack_rows(mask, words):
+    """Packs a 2D bool array into uint64 words per row (bit j of word w = column 64w + j)"""
+    rows, cols = mask.shape
+    padded = np.zeros((rows, words * 64), dtype=bool)
+    padded[:, :cols] = mask
+    return np.packbits(padded, axis=1, bitorder='little').view(np.uint64)
+
+
+def _unpack_rows(packed, cols):
+    return np.unpackbits(packed.view(np.uint8), axis=1, bitorder='little')[:, :cols].astype(bool)
+
+
+LOW_BITS = 6  # Distance bits bitset_distance_field writes level by level
+
+
+def bitset_distance_field(passable, source, target=None):
+    """Level-synchronous 8-connected BFS over bit-packed rows.
+
+    `passable` is a 2D bool array, `source` / `target` are (r, c). The frontier
+    is kept as its nonzero 64-bit words only (flat word index, bits), and each
+    level dilates those words with shifts and ORs into their row and word
+    neighbours. A BFS frontier is a thin ring, so a level costs about its own
+    word count rather than the area of its bounding box. Returns (dist, peak)
+    where dist is an int32 array of step counts (-1 = unreached) and peak the
+    largest frontier. With a target, the search stops at the target's level,
+    so farther cells stay -1.
+    """
+    if np is None:
+        raise ImportError("bitset_distance_field requires numpy")
+    rows, cols = passable.shape
+    words = (cols + 63) // 64
+    # Each row gets a leading zero word and the map zero rows around it, so
+    # carries and row steps off the map land on words that are never passable
+    stride = words + 1
+    P = np.zeros((rows + 3, stride), dtype=np.uint64)
+    P[1:rows + 1, 1:] = _pack_rows(passable, words)
+    P = P.reshape(-1)
+    unseen = P.copy()  # Passable cells not reached yet
+    sr, sc = source
+    keys = np.array([(sr + 1) * stride + 1 + sc // 64], dtype=np.int64)
+    bits = np.array([1 << (sc % 64)], dtype=np.uint64)
+    unseen[keys] &= ~bits
+    # planes[b] holds bit b of every reached cell's distance. The low LOW_BITS
+    # are ORed in per level; the higher ones are shared by a whole block of
+    # 2 ** LOW_BITS levels, so they are filled once per block from the words
+    # the block reached (block_unseen & ~unseen)
+    planes = [np.zeros_like(unseen) for _ in range(LOW_BITS)]
+    block_unseen = unseen.copy()
+    def flush_block(level):
+        high = level >> LOW_BITS
+        if high:
+            block = block_unseen & ~unseen
+            for b in range(high.bit_length()):
+                if LOW_BITS + b == len(planes): planes.append(np.zeros_like(unseen))
+                if high >> b & 1: planes[LOW_BITS + b] |= block
+        block_unseen[:] = unseen
+    if target is not None:
+        tkey, tbit = (target[0] + 1) * stride + 1 + target[1] // 64, np.uint64(1 << (target[1] % 64))
+        if not P[tkey] & tbit: target = None  # A blocked target is never reached: search everything
+
+    level, peak = 0, 1
+    one, carry = np.uint64(1), np.uint64(63)
+    while True:
+        if target is not None and not unseen[tkey] & tbit: break
+        # Horizontal dilation; bits leaving a word carry into its neighbour
+        right, left = bits >> carry, bits << carry
+        to_right, to_left = np.flatnonzero(right), np.flatnonzero(left)
+        hkeys = np.concatenate((keys, keys[to_right] + 1, keys[to_left] - 1))
+        hbits = np.concatenate((bits | bits << one | bits >> one, right[to_right], left[to_left]))
+        # Vertical dilation: every word also reaches the rows above and below
+        vkeys = np.concatenate((hkeys, hkeys - stride, hkeys + stride))
+        vbits = np.concatenate((hbits, hbits, hbits))
+        order = np.argsort(vkeys, kind='stable')  # Merges the sorted runs
+        vkeys, vbits = vkeys[order], vbits[order]
+        starts = np.flatnonzero(np.concatenate(([True], vkeys[1:] != vkeys[:-1])))
+        keys = vkeys[starts]
+        bits = np.bitwise_or.reduceat(vbits, starts)
+        bits &= unseen[keys]
+        live = np.flatnonzero(bits)
+        if not len(live): break
+        keys, bits = keys[live], bits[live]
+
+        level += 1
+        if level % (1 << LOW_BITS) == 0: flush_block(level - 1)
+        unseen[keys] &= ~bits
+        for b in range(LOW_BITS):
+            if level >> b & 1: planes[b][keys] |= bits
+        if hasattr(np, 'bitwise_count'):
+            peak = max(peak, int(np.bitwise_count(bits).sum()))
+    flush_block(level)
+    visited = P & ~unseen
+
+    def unpack(plane):  # Bits of the map cells, one uint8 0 / 1 per cell
+        return np.unpackbits(plane.reshape(rows + 3, stride)[1:rows + 1].view(np.uint8), axis=1,
+                             bitorder='little')[:, 64:64 + cols]
+    # Distances are assembled a byte at a time, in uint8, to keep the passes small
+    dist = np.zeros((rows, cols), dtype=np.int32)
+    for base in range(0, len(planes), 8):
+        byte = np.zeros((rows, cols), dtype=np.uint8)
+        for b, plane in enumerate(planes[base:base + 8]):
+            byte |= unpack(plane) << np.uint8(b)
+        dist |= byte.astype(np.int32) << base
+    dist[unpack(visited) == 0] = -1
+    return dist, peak
+
+
+def wall_window(grid, r0, c0, side):
+    """Flat side x side wall buffer of the square at (r0, c0); cells off the map are walls.
+
+    Only that region of `grid` is read, so a chunked grid pages in just the
+    tiles under the window.
+    """
+    if hasattr(grid, 'window'):
+        return grid.window(r0, c0, side)
+    if getattr(grid, 'ndim', None) == 2:
+        buf = np.ones((side, side), dtype=np.uint8)
+        region = grid[r0:r0 + side, c0:c0 + side]
+        buf[:region.shape[0], :region.shape[1]] = region != 0
+        return memoryview(buf.reshape(-1))
+    size = len(grid)
+    buf = bytearray(b'\x01') * (side * side)
+    for i in range(min(side, size - r0)):
+        row = grid[r0 + i][c0:c0 + side]
+        buf[i * side:i * side + len(row)] = bytes(map((-1).__eq__, row))
+    return buf
+
+
+class GridEngine:
+    """Headless search core: cells are ints (r * size + c), buffers are preallocated arrays.
+
+    Every search takes a flat wall buffer and an optional observer. With no
+    observer attached the loops do no bookkeeping beyond the search itself.
+    """
+    def __init__(self, grid_size):
+        self.size = grid_size
+        self.cells = grid_size * grid_size
+        # Same strict clockwise order as SearchAlgorithms.directions
+        self.directions = [
+            (-1, 0), (0, 1), (1, 0), (1, 1),
+            (0, -1), (-1, -1), (-1, 1), (1, -1)
+        ]
+        # Offset table per column class (bit 0 = left edge, bit 1 = right edge) so a
+        # move never wraps around a row; rows are bounds-checked with 0 <= id < cells
+        self.offset_table = []
+        for cls in range(4):
+            self.offset_table.append(tuple(
+                dr * grid_size + dc for dr, dc in self.directions
+                if not (cls & 1 and dc < 0) and not (cls & 2 and dc > 0)
+            ))
+        self.col_class = bytearray(grid_size)
+        if grid_size:
+            self.col_class[0] |= 1
+            self.col_class[-1] |= 2
+        self.set_costs()
+
+        self._blank = array('i', [UNSEEN]) * self.cells
+        self.parent = array('i', self._blank)
+        self.parent_b = array('i', self._blank)  # Backward tree for bidirectional search
+        self.dist = array('i', self._blank)
+        self.dist_b = array('i', self._blank)
+
+        # DLS/IDDFS: best depth per cell lives in `dist`, valid only where stamp == generation,
+        # so a new pass starts without clearing anything. Stacks grow once and are reused.
+        self.stamp = array('i', self._blank)
+        self.generation = 0
+        self.stack_nodes = array('i')
+        self.stack_dirs = bytearray()
+
+        # Counters from the last search (cheap enough to keep on in headless runs)
+        self.expanded = 0       # Nodes popped / whose neighbours were generated
+        self.peak_frontier = 0  # Largest open list (stack depth for DLS)
+        self.pushes = 0         # Frontier insertions, root included
+        self.decrease_keys = 0  # Indexed-heap UCS: in-place priority updates
+        self.duplicate_pops = 0 # Stale heap entries / DLS revisits popped again
+        self.cutoff = False     # DLS: some cell was left unexpanded because of the limit
+        self.iteration_expanded = []  # IDDFS: expansions per depth pass
+        self.iteration_time = []      # IDDFS: seconds per depth pass
+
+    def set_costs(self, straight=1, diagonal=1, weights=None, queue='dial'):
+        """Cost model of the weighted searches: a move costs `straight` or `diagonal`,
+        times weights[destination] when a per-cell weight buffer (ints >= 1) is given.
+        Costs must be positive integers. Under anything but the unit model, ucs runs
+        on the `queue` structure (see ucs_weighted) and jps runs plain A*."""
+        self.straight_cost, self.diagonal_cost, self.weights = straight, diagonal, weights
+        self.uniform = straight == diagonal == 1 and weights is None
+        self.queue_kind = queue
+        w_min, w_max = (min(weights), max(weights)) if weights is not None and len(weights) else (1, 1)
+        self.weight_min = w_min
+        self.weight_buffer = weights if weights is not None else bytes(b'\x01') * self.cells
+        self.max_move_cost = max(straight, diagonal) * w_max  # Sizes the Dial bucket ring
+        size = self.size
+        # (offset, move cost) per column class, same order as offset_table
+        self.cost_table = [tuple(
+            (dr * size + dc, diagonal if dr and dc else straight) for dr, dc in self.directions
+            if not (cls & 1 and dc < 0) and not (cls & 2 and dc > 0)
+        ) for cls in range(4)]
+
+    # --- Encoding helpers ---
+    def node_id(self, cell):
+        return cell[0] * self.size + cell[1]
+
+    def cell(self, node):
+        return divmod(node, self.size)
+
+    def to_cells(self, path):
+        return [divmod(n, self.size) for n in path]
+
+    def neighbors(self, node, walls):
+        n = self.cells
+        return [node + off for off in self.offset_table[self.col_class[node % self.size]]
+                if 0 <= node + off < n and not walls[node + off]]
+
+    def _reset(self, buf):
+        buf[:] = self._blank
+        return buf
+
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation >= 2 ** 31 - 1:
+            self.stamp[:] = self._blank
+            self.generation = 1
+        return self.generation
+
+    def _stacks(self, limit):
+        """DLS stacks with room for `limit` + 1 frames (a simple path has at most `cells`)"""
+        need = min(limit, self.cells) + 1
+        if len(self.stack_nodes) < need:
+            self.stack_nodes = array('i', [0]) * need
+            self.stack_dirs = bytearray(need)
+        return self.stack_nodes, self.stack_dirs
+
+    def _finish(self, path, expanded, peak, pushes=0, duplicates=0, decreases=0):
+        self.expanded, self.peak_frontier = expanded, peak
+        self.pushes, self.duplicate_pops, self.decrease_keys = pushes, duplicates, decreases
+        return path
+
+    def visited_count(self, name):
+        """Cells marked visited by the last search `name` (a full buffer scan, for stats)"""
+        if name in ('dls', 'iddfs'): return self.stamp.count(self.generation)
+        if name == 'bfs_bitset': return self.pushes
+        if name.startswith('bidirectional'):  # A cell both trees reached counts once
+            return sum(1 for f, b in zip(self.parent, self.parent_b) if f != UNSEEN or b != UNSEEN)
+        return self.cells - self.parent.count(UNSEEN)
+
+    def path(self, parent, node):
+        path = []
+        while node != ROOT:
+            path.append(node); node = parent[node]
+        return path[::-1]
+
+    # --- 1. BFS ---
+    def bfs(self, start, target, walls, observer=None):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        parent = self._reset(self.parent)
+        parent[start] = ROOT
+        discovered = [start] if observer else None
+        queue = collections.deque([start])
+        expanded = peak = 0
+        pushes = 1
+        while queue:
+            if len(queue) > peak: peak = len(queue)
+            current = queue.popleft()
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes)
+            for off in table[col_class[current % size]]:
+                nb = current + off
+                if 0 <= nb < n and not walls[nb] and parent[nb] == UNSEEN:
+                    parent[nb] = current
+                    queue.append(nb)
+                    pushes += 1
+                    if observer:
+                        discovered.append(nb)
+                        observer(nb, queue, discovered)
+        return self._finish(None, expanded, peak, pushes)
+
+    # --- 2. DFS ---
+    def dfs(self, start, target, walls, observer=None):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        parent = self._reset(self.parent)
+        parent[start] = ROOT
+        discovered = [start] if observer else None
+        stack = [start]
+        expanded = peak = 0
+        pushes = 1
+        while stack:
+            if len(stack) > peak: peak = len(stack)
+            current = stack.pop()
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes)
+            for off in table[col_class[current % size]]:
+                nb = current + off
+                if 0 <= nb < n and not walls[nb] and parent[nb] == UNSEEN:
+                    parent[nb] = current
+                    stack.append(nb)
+                    pushes += 1
+                    if observer:
+                        discovered.append(nb)
+                        observer(nb, stack, discovered)
+        return self._finish(None, expanded, peak, pushes)
+
+    # --- 3. UCS ---
+    def ucs(self, start, target, walls, observer=None):
+        if not self.uniform: return self.ucs_weighted(start, target, walls, self.queue_kind, observer)
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        parent = self._reset(self.parent)
+        dist = self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        discovered = [start] if observer else None
+        pq = [(0, start)]
+        expanded = peak = stale = 0
+        pushes = 1
+        while pq:
+            if len(pq) > peak: peak = len(pq)
+            cost, current = heapq.heappop(pq)
+            if cost > dist[current]:  # Superseded by a cheaper push
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, stale)
+            new_cost = cost + 1
+            for off in table[col_class[current % size]]:
+                nb = current + off
+                if 0 <= nb < n and not walls[nb]:
+                    old = dist[nb]
+                    if old == UNSEEN or new_cost < old:
+                        if old == UNSEEN and observer: discovered.append(nb)
+                        dist[nb], parent[nb] = new_cost, current
+                        heapq.heappush(pq, (new_cost, nb))
+                        pushes += 1
+                        if observer: observer(nb, (m for _, m in pq), discovered)
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    # --- 3b. Weighted UCS over a selectable priority structure ---
+    # 'heap'    binary heap with lazy deletion (stale entries are skipped when popped)
+    # 'dial'    bucket queue: one bucket per cost mod (max move cost + 1), O(1) per op
+    # 'radix'   radix heap: buckets by the highest bit differing from the last pop
+    # 'indexed' binary heap with a position index and decrease-key, never stale
+    def ucs_weighted(self, start, target, walls, queue='dial', observer=None):
+        return getattr(self, '_ucs_' + queue)(start, target, walls, observer)
+
+    def ucs_heap(self, start, target, walls, observer=None):
+        return self.ucs_weighted(start, target, walls, 'heap', observer)
+
+    def ucs_dial(self, start, target, walls, observer=None):
+        return self.ucs_weighted(start, target, walls, 'dial', observer)
+
+    def ucs_radix(self, start, target, walls, observer=None):
+        return self.ucs_weighted(start, target, walls, 'radix', observer)
+
+    def ucs_indexed(self, start, target, walls, observer=None):
+        return self.ucs_weighted(start, target, walls, 'indexed', observer)
+
+    def _cost_model(self):
+        return self.size, self.cells, self.cost_table, self.col_class, self.weight_buffer
+
+    def _ucs_setup(self, start, observer):
+        parent, dist = self._reset(self.parent), self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        return parent, dist, [start] if observer else None
+
+    def _ucs_heap(self, start, target, walls, observer):
+        parent, dist, discovered = self._ucs_setup(start, observer)
+        size, n, table, col_class, weights = self._cost_model()
+        pq = [(0, start)]
+        expanded = stale = 0
+        pushes = peak = 1
+        while pq:
+            if len(pq) > peak: peak = len(pq)
+            cost, current = heapq.heappop(pq)
+            if cost > dist[current]:
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, stale)
+            for off, step in table[col_class[current % size]]:
+                nb = current + off
+                if nb < 0 or nb >= n or walls[nb]: continue
+                new_cost = cost + step * weights[nb]
+                old = dist[nb]
+                if old == UNSEEN or new_cost < old:
+                    if old == UNSEEN and observer: discovered.append(nb)
+                    dist[nb], parent[nb] = new_cost, current
+                    heapq.heappush(pq, (new_cost, nb))
+                    pushes += 1
+                    if observer: observer(nb, (m for _, m in pq), discovered)
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    def _ucs_dial(self, start, target, walls, observer):
+        # Every key in the queue lies in [cost, cost + max move cost], so a ring of that
+        # many buckets indexed by key mod width never mixes two different keys
+        parent, dist, discovered = self._ucs_setup(start, observer)
+        size, n, table, col_class, weights = self._cost_model()
+        width = self.max_move_cost + 1
+        buckets = [[] for _ in range(width)]
+        buckets[0].append(start)
+        cost, queued = 0, 1
+        expanded = stale = 0
+        pushes = peak = 1
+        while queued:
+            bucket = buckets[cost % width]
+            while not bucket:
+                cost += 1
+                bucket = buckets[cost % width]
+            current = bucket.pop()
+            queued -= 1
+            if dist[current] != cost:
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, stale)
+            for off, step in table[col_class[current % size]]:
+                nb = current + off
+                if nb < 0 or nb >= n or walls[nb]: continue
+                new_cost = cost + step * weights[nb]
+                old = dist[nb]
+                if old == UNSEEN or new_cost < old:
+                    if old == UNSEEN and observer: discovered.append(nb)
+                    dist[nb], parent[nb] = new_cost, current
+                    buckets[new_cost % width].append(nb)
+                    queued += 1
+                    pushes += 1
+                    if observer: observer(nb, (m for b in buckets for m in b), discovered)
+            if queued > peak: peak = queued
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    def _ucs_radix(self, start, target, walls, observer):
+        # Keys only ever grow past the last popped key `last`; bucket i holds keys whose
+        # highest bit differing from `last` is bit i - 1 (bucket 0: equal to `last`)
+        parent, dist, discovered = self._ucs_setup(start, observer)
+        size, n, table, col_class, weights = self._cost_model()
+        buckets = [[] for _ in range(65)]
+        buckets[0].append((0, start))
+        last, queued = 0, 1
+        expanded = stale = 0
+        pushes = peak = 1
+        while queued:
+            if not buckets[0]:
+                i = 1
+                while not buckets[i]: i += 1
+                moved = buckets[i]
+                buckets[i] = []
+                last = min(moved)[0]
+                for key, node in moved:
+                    buckets[(key ^ last).bit_length()].append((key, node))
+            cost, current = buckets[0].pop()
+            queued -= 1
+            if cost > dist[current]:
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, stale)
+            for off, step in table[col_class[current % size]]:
+                nb = current + off
+                if nb < 0 or nb >= n or walls[nb]: continue
+                new_cost = cost + step * weights[nb]
+                old = dist[nb]
+                if old == UNSEEN or new_cost < old:
+                    if old == UNSEEN and observer: discovered.append(nb)
+                    dist[nb], parent[nb] = new_cost, current
+                    buckets[(new_cost ^ last).bit_length()].append((new_cost, nb))
+                    queued += 1
+                    pushes += 1
+                    if observer: observer(nb, (m for b in buckets for _, m in b), discovered)
+            if queued > peak: peak = queued
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    def _ucs_indexed(self, start, target, walls, observer):
+        # heap holds node ids ordered by dist; pos[node] is its slot (UNSEEN = never
+        # queued, -1 = popped), so an improved node is sifted up instead of re-pushed
+        parent, dist, discovered = self._ucs_setup(start, observer)
+        size, n, table, col_class, weights = self._cost_model()
+        pos = self._reset(self.dist_b)
+        heap = [start]
+        pos[start] = 0
+        expanded = decreases = 0
+        pushes = peak = 1
+        while heap:
+            if len(heap) > peak: peak = len(heap)
+            current = heap[0]
+            last = heap.pop()
+            if heap: self._sift_down(heap, pos, dist, last)
+            pos[current] = -1
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, 0, decreases)
+            cost = dist[current]
+            for off, step in table[col_class[current % size]]:
+                nb = current + off
+                if nb < 0 or nb >= n or walls[nb]: continue
+                new_cost = cost + step * weights[nb]
+                slot = pos[nb]
+                if slot == UNSEEN:
+                    if observer: discovered.append(nb)
+                    dist[nb], parent[nb] = new_cost, current
+                    heap.append(nb)
+                    self._sift_up(heap, pos, dist, nb, len(heap) - 1)
+                    pushes += 1
+                elif slot >= 0 and new_cost < dist[nb]:
+                    dist[nb], parent[nb] = new_cost, current
+                    self._sift_up(heap, pos, dist, nb, slot)
+                    decreases += 1
+                else:
+                    continue
+                if observer: observer(nb, heap, discovered)
+        return self._finish(None, expanded, peak, pushes, 0, decreases)
+
+    @staticmethod
+    def _sift_up(heap, pos, dist, node, i):
+        key = dist[node]
+        while i:
+            up = (i - 1) >> 1
+            other = heap[up]
+            if dist[other] <= key: break
+            heap[i] = other; pos[other] = i
+            i = up
+        heap[i] = node; pos[node] = i
+
+    @staticmethod
+    def _sift_down(heap, pos, dist, node):
+        """Places `node` at the root and sifts it down"""
+        key, i, end = dist[node], 0, len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= end: break
+            if child + 1 < end and dist[heap[child + 1]] < dist[heap[child]]: child += 1
+            other = heap[child]
+            if dist[other] >= key: break
+            heap[i] = other; pos[other] = i
+            i = child
+        heap[i] = node; pos[node] = i
+
+    # --- 4. DLS (explicit stack, no recursion) ---
+    # Each frame is (node, index of the next direction to try). Until the limit first cuts
+    # something off this is a plain visited-set DFS. After that a cell is revisited only
+    # if it is reached shallower than before in this pass, which keeps the search complete
+    # within the limit without re-walking subtrees it already covered as deep. Cells that
+    # can't reach the target within the limit even in a straight line (Chebyshev distance,
+    # exact on an open 8-connected grid) are cut off without being entered.
+    def dls(self, start, target, walls, limit, observer=None):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        tr, tc = divmod(target, size)
+        prune = limit < n  # A simple path never needs more than `cells` moves
+        best, stamp, gen = self.dist, self.stamp, self._next_generation()
+        stamp[start], best[start] = gen, 0
+        discovered = [start] if observer else None
+        self.cutoff = False
+        if start == target: return self._finish([start], 0, 1, 1)
+        if limit <= 0:
+            self.cutoff = True
+            return self._finish(None, 0, 1, 1)
+
+        nodes, dirs = self._stacks(limit)
+        nodes[0], dirs[0] = start, 0
+        top = 0
+        expanded = peak = 1
+        revisits = 0
+        cutoff = False
+        while top >= 0:
+            node = nodes[top]
+            offsets = table[col_class[node % size]]
+            i = dirs[top]
+            depth = top + 1  # Depth of node's children
+            while i < len(offsets):
+                nb = node + offsets[i]
+                i += 1
+                if not 0 <= nb < n or walls[nb]: continue
+                if prune:
+                    r, c = divmod(nb, size)
+                    if depth + max(abs(r - tr), abs(c - tc)) > limit:
+                        cutoff = True; continue
+                if stamp[nb] == gen:
+                    if not cutoff or best[nb] <= depth: continue
+                    revisits += 1
+                else:
+                    stamp[nb] = gen
+                    if observer: discovered.append(nb)
+                best[nb] = depth
+                if observer: observer(nb, (), discovered)
+                if nb == target:
+                    path = nodes[:top + 1].tolist()
+                    path.append(nb)
+                    self.cutoff = cutoff
+                    # Every entered cell was pushed once; the target is reached but never entered
+                    return self._finish(path, expanded, peak, expanded + 1, revisits)
+                if depth < limit:
+                    dirs[top] = i
+                    top += 1
+                    nodes[top], dirs[top] = nb, 0
+                    expanded += 1
+                    if top >= peak: peak = top + 1
+                    break
+                cutoff = True
+            else:
+                top -= 1
+        self.cutoff = cutoff
+        return self._finish(None, expanded, peak, expanded, revisits)
+
+    # --- 5. IDDFS ---
+    def iddfs(self, start, target, walls, max_depth, observer=None):
+        expanded = peak = pushes = revisits = 0
+        self.iteration_expanded = per_depth = []
+        self.iteration_time = per_depth_time = []
+        for depth in range(max_depth):
+            t0 = time.perf_counter()
+            result = self.dls(start, target, walls, depth, observer)
+            per_depth_time.append(time.perf_counter() - t0)
+            per_depth.append(self.expanded)
+            expanded += self.expanded
+            pushes += self.pushes
+            revisits += self.duplicate_pops
+            peak = max(peak, self.peak_frontier)
+            if result: return self._finish(result, expanded, peak, pushes, revisits)
+            # Nothing was cut off: the whole reachable area fits in `depth`, deeper passes repeat it
+            if not self.cutoff: break
+        return self._finish(None, expanded, peak, pushes, revisits)
+
+    # --- 6. Bidirectional Search ---
+    # Expands whole BFS layers, always on the side with the smaller frontier. Before a
+    # layer no cell had been reached from both sides, so every cell the layer newly
+    # shares with the other tree lies on the other side's outer layer: the first one
+    # found closes a shortest path and the search can stop there.
+    def bidirectional_search(self, start, target, walls, observer=None):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        f_parent = self._reset(self.parent)
+        b_parent = self._reset(self.parent_b)
+        f_parent[start], b_parent[target] = ROOT, ROOT
+        if start == target: return self._finish([start], 0, 1, 1)
+        f_seen = [start] if observer else None
+        b_seen = [target] if observer else None
+        f_layer, b_layer = [start], [target]
+        expanded, pushes = 0, 2
+        peak = 2
+        while f_layer and b_layer:
+            if len(f_layer) + len(b_layer) > peak: peak = len(f_layer) + len(b_layer)
+            if len(f_layer) <= len(b_layer):
+                layer, parent, other, seen = f_layer, f_parent, b_parent, f_seen
+            else:
+                layer, parent, other, seen = b_layer, b_parent, f_parent, b_seen
+            nxt = []
+            for curr in layer:
+                expanded += 1
+                for off in table[col_class[curr % size]]:
+                    nb = curr + off
+                    if 0 <= nb < n and not walls[nb] and parent[nb] == UNSEEN:
+                        parent[nb] = curr
+                        nxt.append(nb)
+                        pushes += 1
+                        if observer:
+                            seen.append(nb)
+                            observer(nb, nxt, seen)
+                        if other[nb] != UNSEEN:
+                            return self._finish(self.join_paths(f_parent, b_parent, nb),
+                                                expanded, peak, pushes)
+            if layer is f_layer: f_layer = nxt
+            else: b_layer = nxt
+        return self._finish(None, expanded, peak, pushes)
+
+    # --- 6b. Bidirectional UCS (uses the set_costs cost model) ---
+    # Dijkstra from both ends, popping from the smaller heap. `best` is the cheapest
+    # start-target connection seen so far; once the two heap tops together cost at
+    # least that much, no undiscovered path can beat it.
+    def bidirectional_ucs(self, start, target, walls, observer=None):
+        size = self.size
+        f_parent, b_parent = self._reset(self.parent), self._reset(self.parent_b)
+        f_dist, b_dist = self._reset(self.dist), self._reset(self.dist_b)
+        f_parent[start], b_parent[target] = ROOT, ROOT
+        f_dist[start], b_dist[target] = 0, 0
+        if start == target: return self._finish([start], 0, 1, 1)
+        f_seen = [start] if observer else None
+        b_seen = [target] if observer else None
+        f_pq, b_pq = [(0, start)], [(0, target)]
+        best, meet = INF, None
+        expanded = stale = 0
+        pushes = peak = 2
+        while f_pq and b_pq and f_pq[0][0] + b_pq[0][0] < best:
+            if len(f_pq) + len(b_pq) > peak: peak = len(f_pq) + len(b_pq)
+            forward = len(f_pq) <= len(b_pq)
+            if forward:
+                pq, dist, parent, other, seen = f_pq, f_dist, f_parent, b_dist, f_seen
+            else:
+                pq, dist, parent, other, seen = b_pq, b_dist, b_parent, f_dist, b_seen
+            cost, curr = heapq.heappop(pq)
+            if cost > dist[curr]:
+                stale += 1; continue
+            expanded += 1
+            for nb, new_cost in self._weighted_moves(curr, cost, walls, forward):
+                old = dist[nb]
+                if old == UNSEEN or new_cost < old:
+                    if old == UNSEEN and observer: seen.append(nb)
+                    dist[nb], parent[nb] = new_cost, curr
+                    heapq.heappush(pq, (new_cost, nb))
+                    pushes += 1
+                    if observer: observer(nb, (m for _, m in pq), seen)
+                if other[nb] != UNSEEN and dist[nb] + other[nb] < best:
+                    best, meet = dist[nb] + other[nb], nb
+        if meet is None: return self._finish(None, expanded, peak, pushes, stale)
+        return self._finish(self.join_paths(f_parent, b_parent, meet), expanded, peak, pushes, stale)
+
+    def _weighted_moves(self, node, cost, walls, forward=True):
+        """(neighbour, cost to reach it) under the set_costs model. Backward searches
+        pay the weight of the cell being left, since they walk the moves in reverse."""
+        n, weights = self.cells, self.weight_buffer
+        for off, step in self.cost_table[self.col_class[node % self.size]]:
+            nb = node + off
+            if 0 <= nb < n and not walls[nb]:
+                yield nb, cost + step * (weights[nb] if forward else weights[node])
+
+    def join_paths(self, f_parent, b_parent, meeting_node):
+        path_f = self.path(f_parent, meeting_node)
+        path_b = self.path(b_parent, meeting_node)
+        return path_f[:-1] + path_b[::-1]
+
+    # --- 7. Bitset BFS (whole frontier per level, needs numpy) ---
+    def distance_field(self, source, walls, target=None):
+        """BFS step counts from `source`, indexed by node id (-1 = unreached).
+
+        With numpy this is the bitset BFS and returns a flat int32 array;
+        without it, a plain queue BFS filling an array('i'). With a target,
+        cells beyond the target's level may be left at -1.
+        """
+        if np is None:
+            return self._queue_distance_field(source, walls)
+        blocked = np.frombuffer(walls, dtype=np.uint8, count=self.cells)
+        passable = (blocked == 0).reshape(self.size, self.size)
+        dist, self.peak_frontier = bitset_distance_field(passable, self.cell(source),
+                                                         self.cell(target) if target is not None else None)
+        return dist.reshape(-1)
+
+    def _queue_distance_field(self, source, walls):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        dist = array('i', [-1]) * n
+        dist[source] = 0
+        queue = collections.deque([source])
+        peak = 1
+        while queue:
+            if len(queue) > peak: peak = len(queue)
+            current = queue.popleft()
+            d = dist[current] + 1
+            for off in table[col_class[current % size]]:
+                nb = current + off
+                if 0 <= nb < n and not walls[nb] and dist[nb] < 0:
+                    dist[nb] = d
+                    queue.append(nb)
+        self.peak_frontier = peak
+        return dist
+
+    def downhill_path(self, dist, node):
+        """Walks a distance field from `node` back to its source, trying moves in
+        clockwise order; returns node ids source..node, or None if unreached"""
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        d = int(dist[node])
+        if d < 0: return None
+        path = [node]
+        while d:
+            d -= 1
+            for off in table[col_class[node % size]]:
+                nb = node + off
+                if 0 <= nb < n and dist[nb] == d:
+                    node = nb; break
+            path.append(node)
+        return path[::-1]
+
+    def bfs_bitset(self, start, target, walls, observer=None):
+        """Same path lengths as bfs. Nodes are not visited one by one, so `observer`
+        is not called; `expanded` counts every cell reached before the target level."""
+        if np is None:
+            raise ImportError("bfs_bitset requires numpy")
+        dist = self.distance_field(start, walls, target)
+        reached = dist >= 0
+        expanded = int(np.count_nonzero(reached & (dist < dist[target]))) \
+            if dist[target] >= 0 else int(np.count_nonzero(reached))
+        return self._finish(self.downhill_path(dist, target), expanded, self.peak_frontier,
+                            int(np.count_nonzero(reached)))
+
+    # --- 8. A* and Jump Point Search ---
+    # With unit moves the Chebyshev distance is an admissible and consistent
+    # heuristic (see _h for other cost models). JPS only pushes jump points (cells
+    # with a forced neighbour, or the target) and fills in the straight runs between
+    # them when building the path; its pruning assumes unit moves, so under any other
+    # cost model it runs plain A*.
+    def astar(self, start, target, walls, observer=None):
+        if not self.uniform: return self._astar_weighted(start, target, walls, observer)
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        tr, tc = divmod(target, size)
+        parent = self._reset(self.parent)
+        dist = self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        discovered = [start] if observer else None
+        pq = [(self._h(start, target), 0, start)]
+        expanded = peak = stale = 0
+        pushes = 1
+        while pq:
+            if len(pq) > peak: peak = len(pq)
+            _, neg_g, current = heapq.heappop(pq)
+            if -neg_g > dist[current]:  # Stale entry
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, stale)
+            g = 1 - neg_g
+            for off in table[col_class[current % size]]:
+                nb = current + off
+                if 0 <= nb < n and not walls[nb]:
+                    old = dist[nb]
+                    if old == UNSEEN or g < old:
+                        if old == UNSEEN and observer: discovered.append(nb)
+                        dist[nb], parent[nb] = g, current
+                        r, c = divmod(nb, size)
+                        # Ties go to the deeper node, which is closer to the target
+                        heapq.heappush(pq, (g + max(abs(r - tr), abs(c - tc)), -g, nb))
+                        pushes += 1
+                        if observer: observer(nb, (m for _, _, m in pq), discovered)
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    def _astar_weighted(self, start, target, walls, observer=None):
+        size, n, table, col_class, weights = self._cost_model()
+        tr, tc = divmod(target, size)
+        straight, diagonal = self._octile_costs()
+        h = self._h
+        parent = self._reset(self.parent)
+        dist = self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        discovered = [start] if observer else None
+        pq = [(h(start, target), 0, start)]
+        expanded = peak = stale = 0
+        pushes = 1
+        while pq:
+            if len(pq) > peak: peak = len(pq)
+            _, neg_g, current = heapq.heappop(pq)
+            if -neg_g > dist[current]:
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.path(parent, target), expanded, peak, pushes, stale)
+            for off, step in table[col_class[current % size]]:
+                nb = current + off
+                if nb < 0 or nb >= n or walls[nb]: continue
+                g = step * weights[nb] - neg_g
+                old = dist[nb]
+                if old == UNSEEN or g < old:
+                    if old == UNSEEN and observer: discovered.append(nb)
+                    dist[nb], parent[nb] = g, current
+                    r, c = divmod(nb, size)
+                    dr, dc = abs(r - tr), abs(c - tc)
+                    lo, hi = (dr, dc) if dr < dc else (dc, dr)  # Same as _h, inlined
+                    heapq.heappush(pq, (g + diagonal * lo + straight * (hi - lo), -g, nb))
+                    pushes += 1
+                    if observer: observer(nb, (m for _, _, m in pq), discovered)
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    def jps(self, start, target, walls, observer=None):
+        if not self.uniform: return self._astar_weighted(start, target, walls, observer)
+        parent = self._reset(self.parent)
+        dist = self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        discovered = [start] if observer else None
+        pq = [(self._h(start, target), 0, start)]
+        expanded = peak = stale = 0
+        pushes = 1
+        while pq:
+            if len(pq) > peak: peak = len(pq)
+            _, neg_g, current = heapq.heappop(pq)
+            if -neg_g > dist[current]:
+                stale += 1; continue
+            expanded += 1
+            if current == target: return self._finish(self.jump_path(parent, target), expanded, peak, pushes, stale)
+            for jp, g in self._jps_successors(current, -neg_g, parent[current], walls, target):
+                old = dist[jp]
+                if old == UNSEEN or g < old:
+                    if old == UNSEEN and observer: discovered.append(jp)
+                    dist[jp], parent[jp] = g, current
+                    heapq.heappush(pq, (g + self._h(jp, target), -g, jp))
+                    pushes += 1
+                    if observer: observer(jp, (m for _, _, m in pq), discovered)
+        return self._finish(None, expanded, peak, pushes, stale)
+
+    def _h(self, node, target):
+        (r, c), (tr, tc) = divmod(node, self.size), divmod(target, self.size)
+        dr, dc = abs(r - tr), abs(c - tc)
+        if self.uniform: return max(dr, dc)
+        lo, hi = min(dr, dc), max(dr, dc)
+        straight, diagonal = self._octile_costs()
+        return diagonal * lo + straight * (hi - lo)
+
+    def _octile_costs(self):
+        """Per-step costs of the weighted heuristic, at the cheapest terrain weight.
+        A diagonal never costs more than the two straight moves it could be swapped
+        for, and a zigzag of diagonals advances one cell along an axis per diagonal,
+        so a straight step never costs more than a diagonal. With both caps octile
+        distance stays admissible and consistent, e.g. for straight 3 / diagonal 1."""
+        straight, diagonal = self.straight_cost, self.diagonal_cost
+        return min(straight, diagonal) * self.weight_min, min(diagonal, 2 * straight) * self.weight_min
+
+    def _blocked(self, r, c, walls):
+        size = self.size
+        return not (0 <= r < size and 0 <= c < size) or walls[r * size + c]
+
+    def _jump(self, r, c, dr, dc, walls, tr, tc):
+        """Walks from (r, c) in direction (dr, dc); returns the first jump point's id, or -1"""
+        size, blocked = self.size, self._blocked
+        if not dr: return self._jump_straight(r * size + c, c, dc, size, 1, walls, tr * size + tc)
+        if not dc: return self._jump_straight(r * size + c, r, dr, size, size, walls, tr * size + tc)
+        while True:
+            r += dr; c += dc
+            if not (0 <= r < size and 0 <= c < size) or walls[r * size + c]: return -1
+            if r == tr and c == tc: return r * size + c
+            if ((blocked(r, c - dc, walls) and not blocked(r + dr, c - dc, walls)) or
+                    (blocked(r - dr, c, walls) and not blocked(r - dr, c + dc, walls))):
+                return r * size + c
+            # A diagonal cell is a jump point if either straight scan from it finds one
+            if (self._jump(r, c, 0, dc, walls, tr, tc) >= 0 or
+                    self._jump(r, c, dr, 0, walls, tr, tc) >= 0):
+                return r * size + c
+
+    def _jump_straight(self, node, pos, d, size, stride, walls, target):
+        """Straight scan along a row (stride 1) or column (stride size); `pos` is the
+        coordinate along the scan, `lo` / `hi` track the cells on either side"""
+        side = size if stride == 1 else 1
+        lo, hi = node - side, node + side
+        # Parallel lines off the grid can never hold a forced neighbour
+        has_lo = (node // size if stride == 1 else node % size) > 0
+        has_hi = (node // size if stride == 1 else node % size) < size - 1
+        step = d * stride
+        while True:
+            pos += d; node += step; lo += step; hi += step
+            if not 0 <= pos < size or walls[node]: return -1
+            if node == target: return node
+            if 0 <= pos + d < size:
+                if has_lo and walls[lo] and not walls[lo + step]: return node
+                if has_hi and walls[hi] and not walls[hi + step]: return node
+
+    def _jps_successors(self, node, g, from_node, walls, target):
+        """(jump point, cost) pairs reachable from `node`, pruned by the direction it was entered"""
+        size, blocked = self.size, self._blocked
+        r, c = divmod(node, size)
+        if from_node == ROOT:
+            moves = self.directions
+        else:
+            pr, pc = divmod(from_node, size)
+            dr, dc = (r > pr) - (r < pr), (c > pc) - (c < pc)
+            if dr and dc:
+                moves = [(dr, 0), (0, dc), (dr, dc)]
+                if blocked(r, c - dc, walls): moves.append((dr, -dc))
+                if blocked(r - dr, c, walls): moves.append((-dr, dc))
+            elif dc:
+                moves = [(0, dc)]
+                if blocked(r - 1, c, walls): moves.append((-1, dc))
+                if blocked(r + 1, c, walls): moves.append((1, dc))
+            else:
+                moves = [(dr, 0)]
+                if blocked(r, c - 1, walls): moves.append((dr, -1))
+                if blocked(r, c + 1, walls): moves.append((dr, 1))
+        tr, tc = divmod(target, size)
+        for dr, dc in moves:
+            jp = self._jump(r, c, dr, dc, walls, tr, tc)
+            if jp >= 0:
+                jr, jc = divmod(jp, size)
+                yield jp, g + max(abs(jr - r), abs(jc - c))
+
+    def jump_path(self, parent, node):
+        """Cell-by-cell path through the jump points ending at `node`"""
+        size = self.size
+        points = self.path(parent, node)
+        path = points[:1]
+        for a, b in zip(points, points[1:]):
+            (ar, ac), (br, bc) = divmod(a, size), divmod(b, size)
+            step = ((br > ar) - (br < ar)) * size + (bc > ac) - (bc < ac)
+            while a != b:
+                a += step
+                path.append(a)
+        return path
+
+    # --- Step generators ---
+    # Same searches as above, but yielding small delta events instead of calling an
+    # observer, so a UI can consume them at its own pace (and stop early). They
+    # share the engine buffers: run one generator per engine at a time.
+    def steps(self, name, start, target, walls, *args):
+        return getattr(self, name + '_steps')(start, target, walls, *args)
+
+    def _queue_steps(self, start, target, walls, lifo):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        parent = self._reset(self.parent)
+        parent[start] = ROOT
+        frontier = collections.deque([start])
+        pop = frontier.pop if lifo else frontier.popleft
+        yield PUSH, start
+        while frontier:
+            current = pop()
+            yield POP, current
+            if current == target:
+                yield DONE, self.path(parent, target); return
+            for off in table[col_class[current % size]]:
+                nb = current + off
+                if 0 <= nb < n and not walls[nb] and parent[nb] == UNSEEN:
+                    parent[nb] = current
+                    frontier.append(nb)
+                    yield PUSH, nb
+            yield EXPAND, current
+        yield DONE, None
+
+    def bfs_steps(self, start, target, walls):
+        return self._queue_steps(start, target, walls, lifo=False)
+
+    def dfs_steps(self, start, target, walls):
+        return self._queue_steps(start, target, walls, lifo=True)
+
+    def ucs_steps(self, start, target, walls):
+        parent = self._reset(self.parent)
+        dist = self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        pq = [(0, start)]
+        yield PUSH, start
+        while pq:
+            cost, current = heapq.heappop(pq)
+            yield POP, current
+            if cost > dist[current]: continue
+            if current == target:
+                yield DONE, self.path(parent, target); return
+            for nb, new_cost in self._weighted_moves(current, cost, walls):
+                old = dist[nb]
+                if old == UNSEEN or new_cost < old:
+                    dist[nb], parent[nb] = new_cost, current
+                    heapq.heappush(pq, (new_cost, nb))
+                    yield PUSH, nb
+            yield EXPAND, current
+        yield DONE, None
+
+    def dls_steps(self, start, target, walls, limit):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        tr, tc = divmod(target, size)
+        prune = limit < n  # A simple path never needs more than `cells` moves
+        best, stamp, gen = self.dist, self.stamp, self._next_generation()
+        stamp[start], best[start] = gen, 0
+        self.cutoff = False
+        yield PUSH, start
+        if start == target:
+            yield DONE, [start]; return
+        if limit <= 0:
+            self.cutoff = True
+            yield DONE, None; return
+
+        nodes, dirs = self._stacks(limit)
+        nodes[0], dirs[0] = start, 0
+        top = 0
+        yield EXPAND, start
+        cutoff = False
+        while top >= 0:
+            node = nodes[top]
+            offsets = table[col_class[node % size]]
+            i = dirs[top]
+            depth = top + 1
+            while i < len(offsets):
+                nb = node + offsets[i]
+                i += 1
+                if not 0 <= nb < n or walls[nb]: continue
+                if prune:
+                    r, c = divmod(nb, size)
+                    if depth + max(abs(r - tr), abs(c - tc)) > limit:
+                        cutoff = self.cutoff = True; continue
+                if stamp[nb] == gen and (not cutoff or best[nb] <= depth): continue
+                stamp[nb], best[nb] = gen, depth
+                yield PUSH, nb
+                if nb == target:
+                    path = nodes[:top + 1].tolist()
+                    path.append(nb)
+                    yield DONE, path; return
+                if depth < limit:
+                    dirs[top] = i
+                    top += 1
+                    nodes[top], dirs[top] = nb, 0
+                    yield EXPAND, nb
+                    break
+                cutoff = self.cutoff = True
+            else:
+                top -= 1
+                yield POP, node
+        yield DONE, None
+
+    def iddfs_steps(self, start, target, walls, max_depth):
+        for depth in range(max_depth):
+            yield RESET, depth
+            for kind, data in self.dls_steps(start, target, walls, depth):
+                if kind != DONE:
+                    yield kind, data
+                elif data:
+                    yield DONE, data; return
+            if not self.cutoff: break
+        yield DONE, None
+
+    def bidirectional_search_steps(self, start, target, walls):
+        size, n = self.size, self.cells
+        table, col_class = self.offset_table, self.col_class
+        f_parent = self._reset(self.parent)
+        b_parent = self._reset(self.parent_b)
+        f_parent[start], b_parent[target] = ROOT, ROOT
+        yield PUSH, start
+        if start == target:
+            yield DONE, [start]; return
+        yield PUSH, target
+        f_layer, b_layer = [start], [target]
+
+        while f_layer and b_layer:
+            if len(f_layer) <= len(b_layer):
+                layer, parent, other = f_layer, f_parent, b_parent
+            else:
+                layer, parent, other = b_layer, b_parent, f_parent
+            nxt = []
+            for curr in layer:
+                yield POP, curr
+                for off in table[col_class[curr % size]]:
+                    nb = curr + off
+                    if 0 <= nb < n and not walls[nb] and parent[nb] == UNSEEN:
+                        parent[nb] = curr
+                        nxt.append(nb)
+                        yield PUSH, nb
+                        if other[nb] != UNSEEN:
+                            yield DONE, self.join_paths(f_parent, b_parent, nb); return
+                yield EXPAND, curr
+            if layer is f_layer: f_layer = nxt
+            else: b_layer = nxt
+        yield DONE, None
+
+    def bidirectional_ucs_steps(self, start, target, walls):
+        f_parent, b_parent = self._reset(self.parent), self._reset(self.parent_b)
+        f_dist, b_dist = self._reset(self.dist), self._reset(self.dist_b)
+        f_parent[start], b_parent[target] = ROOT, ROOT
+        f_dist[start], b_dist[target] = 0, 0
+        f_pq, b_pq = [(0, start)], [(0, target)]
+        best, meet = INF, None
+        yield PUSH, start
+        if start == target:
+            yield DONE, [start]; return
+        yield PUSH, target
+        while f_pq and b_pq and f_pq[0][0] + b_pq[0][0] < best:
+            forward = len(f_pq) <= len(b_pq)
+            if forward: pq, dist, parent, other = f_pq, f_dist, f_parent, b_dist
+            else: pq, dist, parent, other = b_pq, b_dist, b_parent, f_dist
+            cost, curr = heapq.heappop(pq)
+            yield POP, curr
+            if cost > dist[curr]: continue
+            for nb, new_cost in self._weighted_moves(curr, cost, walls, forward):
+                old = dist[nb]
+                if old == UNSEEN or new_cost < old:
+                    dist[nb], parent[nb] = new_cost, curr
+                    heapq.heappush(pq, (new_cost, nb))
+                    yield PUSH, nb
+                if other[nb] != UNSEEN and dist[nb] + other[nb] < best:
+                    best, meet = dist[nb] + other[nb], nb
+            yield EXPAND, curr
+        yield DONE, self.join_paths(f_parent, b_parent, meet) if meet is not None else None
+
+    def astar_steps(self, start, target, walls):
+        return self._informed_steps(start, target, walls, jump=False)
+
+    def jps_steps(self, start, target, walls):
+        return self._informed_steps(start, target, walls, jump=True)
+
+    def _informed_steps(self, start, target, walls, jump):
+        jump = jump and self.uniform
+        parent = self._reset(self.parent)
+        dist = self._reset(self.dist)
+        parent[start], dist[start] = ROOT, 0
+        pq = [(self._h(start, target), 0, start)]
+        yield PUSH, start
+        while pq:
+            _, neg_g, current = heapq.heappop(pq)
+            yield POP, current
+            if -neg_g > dist[current]: continue
+            if current == target:
+                yield DONE, self.jump_path(parent, target) if jump else self.path(parent, target)
+                return
+            if jump:
+                successors = self._jps_successors(current, -neg_g, parent[current], walls, target)
+            else:
+                successors = self._weighted_moves(current, -neg_g, walls)
+            for nb, g in successors:
+                old = dist[nb]
+                if old == UNSEEN or g < old:
+                    dist[nb], parent[nb] = g, current
+                    heapq.heappush(pq, (g + self._h(nb, target), -g, nb))
+                    yield PUSH, nb
+            yield EXPAND, current
+        yield DONE, None
+
+
+class SearchAlgorithms:
+    def __init__(self, grid_size):
+        self.grid_size = grid_size
+        # Strict Clockwise Order: Up, Right, Bottom, B-Right, Left, T-Left, T-Right, B-Left [cite: 32-40]
+        self.directions = [
+            (-1, 0), (0, 1), (1, 0), (1, 1), 
+            (0, -1), (-1, -1), (-1, 1), (1, -1)
+        ]
+        self._engine = None  # Whole-map engine, allocated on first use (huge maps only use windows)
+        self.window_engine = None  # Reused by region_search while the window size holds
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = GridEngine(self.grid_size)
+        return self._engine
+
+    def set_costs(self, straight=1, diagonal=1, terrain=None, queue='dial'):
+        """Move costs and per-cell terrain weights (a flat buffer, e.g.
+        GridEnvironment.terrain_buffer()) for ucs / astar / bidirectional_ucs"""
+        self.engine.set_costs(straight, diagonal, terrain, queue)
+
+    def get_neighbors(self, node, grid):
+        neighbors = []
+        r, c = node
+        for dr, dc in self.directions:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.grid_size and 0 <= nc < self.grid_size:
+                if grid[nr][nc] != -1: # Avoid static and dynamic walls [cite: 17, 21]
+                    neighbors.append((nr, nc))
+        return neighbors
+
+    # Tuple API: thin wrappers over GridEngine. `callback` is optional; without it
+    # the engine runs headless. The grid is snapshotted when the search starts.
+    # `stats` (a search_stats.SearchStats) is optional too: it gets counters, the
+    # split between search and callback time, and runs any profiling hooks.
+    def _run(self, method, start, target, grid, callback, *args, stats=None):
+        eng = self.engine
+        observer = self._observer(callback)
+        if stats is not None:
+            if observer: observer = stats.timed(observer)
+            stats.begin(method.__name__)
+        path = method(eng.node_id(start), eng.node_id(target), wall_buffer(grid),
+                      *args, observer=observer)
+        if stats is not None: stats.end(eng, path)
+        return eng.to_cells(path) if path is not None else None
+
+    def _observer(self, callback):
+        """Adapts the engine's id-based observer to callback(cell, frontier, discovered).
+
+        The engine's discovered lists only ever grow, so each is mirrored by one
+        cell list that is extended with the new ids, not rebuilt on every push.
+        The callback gets that live list and must not modify it.
+        """
+        if callback is None: return None
+        size = self.engine.size
+        mirrors = {}  # id(discovered) -> (discovered, cells); bidirectional search has two
+        def observer(node, frontier, discovered):
+            entry = mirrors.get(id(discovered))
+            if entry is None or entry[0] is not discovered:
+                if len(mirrors) >= 2: mirrors.clear()  # IDDFS starts a new list per depth
+                entry = mirrors[id(discovered)] = (discovered, [])
+            cells = entry[1]
+            if len(cells) < len(discovered):
+                cells.extend([divmod(n, size) for n in discovered[len(cells):]])
+            callback(divmod(node, size), [divmod(n, size) for n in frontier], cells)
+        return observer
+
+    def steps(self, name, start, target, grid, *args):
+        """Event stream of search `name` as (kind, cell) pairs; DONE carries the path"""
+        eng = self.engine
+        for kind, data in eng.steps(name, eng.node_id(start), eng.node_id(target),
+                                    wall_buffer(grid), *args):
+            if kind == DONE:
+                yield kind, eng.to_cells(data) if data is not None else None
+            elif kind == RESET:
+                yield kind, data
+            else:
+                yield kind, divmod(data, eng.size)
+
+    # --- 1. BFS (Already provided) ---
+    def bfs(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.bfs, start, target, grid, callback, stats=stats)
+
+    # --- 2. DFS [cite: 26] ---
+    def dfs(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.dfs, start, target, grid, callback, stats=stats)
+
+    # --- 3. UCS [cite: 27] ---
+    def ucs(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.ucs, start, target, grid, callback, stats=stats)
+
+    def ucs_weighted(self, start, target, grid, queue='dial', callback=None, stats=None):
+        """UCS on an explicit priority structure: 'dial', 'radix', 'indexed' or 'heap'"""
+        return self._run(self.engine.ucs_weighted, start, target, grid, callback, queue, stats=stats)
+
+    # --- 4. Depth-Limited Search (DLS)  ---
+    def dls(self, start, target, grid, limit, callback=None, stats=None):
+        return self._run(self.engine.dls, start, target, grid, callback, limit, stats=stats)
+
+    # --- 5. Iterative Deepening DFS (IDDFS)  ---
+    def iddfs(self, start, target, grid, max_depth, callback=None, stats=None):
+        return self._run(self.engine.iddfs, start, target, grid, callback, max_depth, stats=stats)
+
+    # --- 6. Bidirectional Search  ---
+    def bidirectional_search(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.bidirectional_search, start, target, grid, callback, stats=stats)
+
+    def bidirectional_ucs(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.bidirectional_ucs, start, target, grid, callback, stats=stats)
+
+    # --- 7. Bitset BFS (numpy) ---
+    def bfs_bitset(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.bfs_bitset, start, target, grid, callback, stats=stats)
+
+    # --- 8. A* / Jump Point Search (informed, same moves and costs as BFS) ---
+    def astar(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.astar, start, target, grid, callback, stats=stats)
+
+    def jps(self, start, target, grid, callback=None, stats=None):
+        return self._run(self.engine.jps, start, target, grid, callback, stats=stats)
+
+    # --- Windowed search (maps too large for whole-map buffers) ---
+    def region_search(self, start, target, grid, name='jps', margin=16):
+        """Runs engine search `name` inside a square window around start and target.
+
+        Only the window is read from `grid`, so on a ChunkedGrid a short query
+        touches a few tiles. The window doubles until the path found is provably
+        shortest (no route leaving it could be shorter) or it covers the map.
+        """
+        size = len(grid)
+        (sr, sc), (tr, tc) = start, target
+        margin = max(margin, 1)
+        while True:
+            r0, c0 = max(min(sr, tr) - margin, 0), max(min(sc, tc) - margin, 0)
+            side = min(max(max(sr, tr) + margin + 1 - r0, max(sc, tc) + margin + 1 - c0), size)
+            r0, c0 = min(r0, size - side), min(c0, size - side)
+            r1, c1 = r0 + side, c0 + side
+            eng = self.window_engine
+            if eng is None or eng.size != side:
+                eng = self.window_engine = GridEngine(side)
+            path = getattr(eng, name)(eng.node_id((sr - r0, sc - c0)), eng.node_id((tr - r0, tc - c0)),
+                                      wall_window(grid, r0, c0, side))
+            # A route through a cell outside the window costs at least this much
+            bound = INF
+            if r0 > 0: bound = min(bound, sr - r0 + 1 + tr - r0 + 1)
+            if r1 < size: bound = min(bound, r1 - sr + r1 - tr)
+            if c0 > 0: bound = min(bound, sc - c0 + 1 + tc - c0 + 1)
+            if c1 < size: bound = min(bound, c1 - sc + c1 - tc)
+            if side == size or (path is not None and len(path) - 1 <= bound):
+                return [(r + r0, c + c0) for r, c in eng.to_cells(path)] if path is not None else None
+            margin *= 2
+
+    def join_paths(self, f_visited, b_visited, meeting_node):
+        path_f = self.reconstruct_path(f_visited, meeting_node)
+        path_b = self.reconstruct_path(b_visited, meeting_node)
+        return path_f[:-1] + path_b[::-1]
+
+    def reconstruct_path(self, visited, current):
+        path = []
+        while current is not None:
+            path.append(current); current = visited[current]
+        return path[::-1]
+
+    def reconstruct_path_dict(self, visited, current):
+        path = []
+        while current is not None:
+            path.append(current); current = visited[current][1]
+        return path[::-1]
+
+
+
+
+class IncrementalPlanner:
+    """D* Lite replanner for the moving agent.
+
+    Searches backward from the target, so the tree survives the agent moving.
+    When cells change (the batches of GridEnvironment.obstacles.advance, or
+    toggle_obstacle) only the affected vertices are re-queued and repaired.
+    Moves cost 1 in all 8 directions, so the heuristic is Chebyshev distance.
+    """
+    def __init__(self, grid_size):
+        self.engine = GridEngine(grid_size)
+        self.size = grid_size
+        self.expanded = 0  # Expansions done by the last plan/update call
+
+    def _h(self, a, b):
+        ar, ac = divmod(a, self.size)
+        br, bc = divmod(b, self.size)
+        return max(abs(ar - br), abs(ac - bc))
+
+    def _key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (m + self._h(self.s_start, u) + self.km, m)
+
+    def _adjacent(self, u):
+        """In-bounds neighbours of u, walls included (clockwise order)"""
+        n = self.engine.cells
+        return [u + off for off in self.engine.offset_table[self.engine.col_class[u % self.size]]
+                if 0 <= u + off < n]
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            best = INF
+            if not self.walls[u]:
+                g, walls = self.g, self.walls
+                for s in self._adjacent(u):
+                    if not walls[s] and g[s] + 1 < best: best = g[s] + 1
+            self.rhs[u] = best
+        if self.g[u] != self.rhs[u]:
+            heapq.heappush(self.queue, self._key(u) + (u,))
+
+    def _compute_shortest_path(self):
+        g, rhs, queue = self.g, self.rhs, self.queue
+        start = self.s_start
+        expanded = 0
+        while queue:
+            k1, k2, u = queue[0]
+            if g[u] == rhs[u]:  # Stale entry (lazy deletion)
+                heapq.heappop(queue); continue
+            if (k1, k2) >= self._key(start) and rhs[start] == g[start]: break
+            heapq.heappop(queue)
+            k_new = self._key(u)
+            if (k1, k2) < k_new:
+                heapq.heappush(queue, k_new + (u,)); continue
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            for s in self._adjacent(u):
+                self._update_vertex(s)
+        self.expanded = expanded
+
+    def plan(self, start, target, grid):
+        """Full initial search; the tree is kept for later update() calls"""
+        eng = self.engine
+        self.walls = bytearray(wall_buffer(grid))  # Own copy: changes arrive via update()
+        self.g = [INF] * eng.cells
+        self.rhs = [INF] * eng.cells
+        self.queue = []
+        self.km = 0
+        self.s_start = self.s_last = eng.node_id(start)
+        self.goal = eng.node_id(target)
+        self.rhs[self.goal] = 0
+        heapq.heappush(self.queue, self._key(self.goal) + (self.goal,))
+        self._compute_shortest_path()
+        return self.path()
+
+    def move_to(self, cell):
+        """Tells the planner the agent has advanced to `cell`"""
+        self.s_start = self.engine.node_id(cell)
+
+    def update(self, changed_cells, grid):
+        """Repairs the tree after `changed_cells` flipped state and returns the new path"""
+        eng = self.engine
+        self.km += self._h(self.s_last, self.s_start)
+        self.s_last = self.s_start
+        for cell in changed_cells:
+            if cell is None: continue
+            u = eng.node_id(cell)
+            self.walls[u] = grid[cell[0]][cell[1]] == -1
+            self._update_vertex(u)
+            for s in self._adjacent(u):
+                self._update_vertex(s)
+        self._compute_shortest_path()
+        return self.path()
+
+    def stale_cells(self, grid):
+        """Cells whose wall state in `grid` differs from the planner's copy, i.e. edits
+        update() was never told about. O(cells); a fallback, not the normal path."""
+        walls, cell = wall_buffer(grid), self.engine.cell
+        return [cell(u) for u, blocked in enumerate(self.walls) if blocked != bool(walls[u])]
+
+    def path(self):
+        """Greedy descent over g from the agent to the target (clockwise tie-break)"""
+        u, g, walls = self.s_start, self.g, self.walls
+        if g[u] == INF and self.rhs[u] == INF: return None
+        path = [u]
+        for _ in range(self.engine.cells):
+            if u == self.goal: return self.engine.to_cells(path)
+            best, best_g = None, INF
+            for s in self._adjacent(u):
+                if not walls[s] and g[s] < best_g: best, best_g = s, g[s]
+            if best is None: return None
+            u = best
+            path.append(u)
+        return None
@@ -0,0 +1,257 @@
+"""Batch runner: answers large scenario sets across a process pool.
+
+A manifest is a JSON-lines file with one scenario per line:
+
+    {"id": "m3-q17", "map": {"kind": "scatter", "size": 200, "seed": 3, "coverage": 0.2},
+     "start": [0, 0], "target": [199, 199], "algorithm": "bfs"}
+
+`map` is a benchmark.map_from_spec spec (optionally with "terrain": max weight
+and "costs": [straight, diagonal]), including {"kind": "file", "path": ...}
+for .map / binary map files; `args` (optional) overrides the depth
+limits of dls / iddfs. Scenarios are grouped by map and submitted in chunks,
+so a worker builds each map once and answers many queries on it. Results are
+appended to a .jsonl or .csv file as chunks complete; rerunning with the same
+output skips scenarios already recorded there. A MovingAI .scen file works as
+a manifest too: each of its queries is run with every --algorithms entry.
+
+    python batch.py --make-manifest scenarios.jsonl --sizes 100 200 --maps 8 --queries 200
+    python batch.py scenarios.jsonl --out results.jsonl --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from ALGORITHM import SearchAlgorithms, wall_buffer
+from benchmark import ALGORITHMS, build_map, map_from_spec, search_args
+from map_io import read_scen
+
+FIELDS = ['id', 'algorithm', 'map', 'start', 'target', 'time_s', 'expanded',
+          'peak_frontier', 'path_len', 'error']
+
+# Per-process state: the last few maps this worker built, keyed by their spec
+WORKER_MAPS = {}
+WORKER_MAP_SLOTS = 4
+
+
+def map_key(spec):
+    return json.dumps(spec, sort_keys=True)
+
+
+def load_map(spec):
+    """(SearchAlgorithms, wall buffer) for a map spec, built at most once per worker"""
+    key = map_key(spec)
+    entry = WORKER_MAPS.pop(key, None)
+    if entry is None:
+        env = map_from_spec(spec)
+        algo = SearchAlgorithms(env.size)
+        algo.set_costs(env.straight_cost, env.diagonal_cost, env.terrain_buffer())
+        entry = (algo, wall_buffer(env.grid))
+        while len(WORKER_MAPS) >= WORKER_MAP_SLOTS:
+            WORKER_MAPS.pop(next(iter(WORKER_MAPS)))
+    WORKER_MAPS[key] = entry  # Most recently used last
+    return entry
+
+
+def check_cell(value, size):
+    """(r, c) of a scenario's start / target; ValueError if malformed or off the map"""
+    try:
+        r, c = value
+    except (TypeError, ValueError):
+        raise ValueError(f"bad cell {value!r}") from None
+    if not (isinstance(r, int) and isinstance(c, int) and 0 <= r < size and 0 <= c < size):
+        raise ValueError(f"cell {value!r} is off the {size}x{size} map")
+    return r, c
+
+
+def empty_row(spec, sc):
+    return {'id': sc['id'], 'algorithm': sc['algorithm'], 'map': map_key(spec),
+            'start': sc['start'], 'target': sc['target'], 'time_s': None, 'expanded': None,
+            'peak_frontier': None, 'path_len': None, 'error': None}
+
+
+def run_chunk(spec, scenarios):
+    """Worker entry point: runs scenarios that all share map `spec`"""
+    try:
+        algo, walls = load_map(spec)
+    except Exception as exc:  # A bad map fails its own scenarios, not the batch
+        error = f"{type(exc).__name__}: {exc}"
+        return [dict(empty_row(spec, sc), error=error) for sc in scenarios]
+    engine = algo.engine
+    rows = []
+    for sc in scenarios:
+        name = sc['algorithm']
+        row = empty_row(spec, sc)
+        try:
+            start = check_cell(sc['start'], algo.grid_size)
+            target = check_cell(sc['target'], algo.grid_size)
+            args = sc.get('args') or search_args(name, algo.grid_size)
+            method = getattr(engine, name)
+            t0 = time.perf_counter()
+            path = method(engine.node_id(start), engine.node_id(target), walls, *args)
+            row['time_s'] = round(time.perf_counter() - t0, 6)
+            row['expanded'], row['peak_frontier'] = engine.expanded, engine.peak_frontier
+            row['path_len'] = len(path) if path else None
+        except Exception as exc:  # One bad scenario must not sink the chunk
+            row['error'] = f"{type(exc).__name__}: {exc}"
+        rows.append(row)
+    return rows
+
+
+# --- Manifests ---
+def read_manifest(path, algorithms=('bfs',)):
+    if path.endswith('.scen'):
+        for sc in read_scen(path):
+            for name in algorithms:
+                yield dict(sc, id=f"{sc['id']}-{name}", algorithm=name)
+        return
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line: continue
+            sc = json.loads(line)
+            sc.setdefault('id', str(line_no))
+            yield sc
+
+
+def make_manifest(path, sizes, maps, queries, algorithms, seed=0, coverage=0.2):
+    """Writes a random manifest: `maps` scatter maps per size, `queries` start/target
+    pairs per map, every pair run with every algorithm"""
+    rng = random.Random(seed)
+    count = 0
+    with open(path, 'w') as f:
+        for size in sizes:
+            for m in range(maps):
+                spec = {'kind': 'scatter', 'size': size, 'seed': rng.randrange(2 ** 31), 'coverage': coverage}
+                grid = build_map(spec['kind'], size, spec['seed'], coverage).grid
+                open_cells = [(r, c) for r in range(size) for c in range(size) if grid[r][c] != -1]
+                for q in range(queries):
+                    start, target = rng.sample(open_cells, 2)
+                    for name in algorithms:
+                        f.write(json.dumps({'id': f"s{size}-m{m}-q{q}-{name}", 'map': spec,
+                                            'start': start, 'target': target, 'algorithm': name}) + '\n')
+                        count += 1
+    return count
+
+
+# --- Result files (append-only, so a partial run can be resumed) ---
+def done_ids(path):
+    if not os.path.exists(path): return set()
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            return {row['id'] for row in csv.DictReader(f)}
+        ids = set()
+        for line in f:
+            # Manifest ids may be JSON numbers; compared as strings, as in a CSV
+            try: ids.add(str(json.loads(line)['id']))
+            except (ValueError, KeyError): pass  # Torn last line from an interrupted run
+        return ids
+
+
+def drop_torn_line(path):
+    """Truncates a partial last row left by an interrupted run"""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+class ResultWriter:
+    def __init__(self, path):
+        self.csv = path.endswith('.csv')
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not fresh: drop_torn_line(path)
+        self.file = open(path, 'a', newline='')
+        if self.csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if fresh: self.writer.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.csv: self.writer.writerow(row)
+            else: self.file.write(json.dumps(row) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def chunks(scenarios, chunk_size):
+    """Groups scenarios by map, then splits each group into (spec, chunk) tasks"""
+    groups = {}
+    for sc in scenarios:
+        groups.setdefault(map_key(sc['map']), []).append(sc)
+    for group in groups.values():
+        spec = group[0]['map']
+        for i in range(0, len(group), chunk_size):
+            yield spec, group[i:i + chunk_size]
+
+
+def run_batch(manifest, out, workers=None, chunk_size=64, log=None, algorithms=('bfs',)):
+    """Runs every scenario of `manifest` not already in `out`; returns rows written"""
+    done = done_ids(out)
+    todo = [sc for sc in read_manifest(manifest, algorithms) if str(sc['id']) not in done]
+    if log: log(f"{len(todo)} scenarios to run ({len(done)} already done)")
+    writer = ResultWriter(out)
+    written = 0
+    t0 = time.perf_counter()
+    try:
+        if workers == 1:
+            # In-process: easier to debug and profile
+            for spec, chunk in chunks(todo, chunk_size):
+                rows = run_chunk(spec, chunk)
+                writer.write(rows)
+                written += len(rows)
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(workers) as pool:
+                tasks = chunks(todo, chunk_size)
+                in_flight = set()
+                limit = 4 * workers  # Bounded submission keeps memory flat
+                while True:
+                    for spec, chunk in tasks:
+                        in_flight.add(pool.submit(run_chunk, spec, chunk))
+                        if len(in_flight) >= limit: break
+                    if not in_flight: break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        rows = future.result()
+                        writer.write(rows)
+                        written += len(rows)
+                    if log: log(f"{written}/{len(todo)} done, "
+                                f"{written / (time.perf_counter() - t0):.0f} scenarios/s")
+    finally:
+        writer.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a scenario manifest across a process pool")
+    parser.add_argument('manifest', help="Scenario manifest (.jsonl)")
+    parser.add_argument('--out', help="Results file (.jsonl or .csv); existing rows are skipped")
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: CPU count, 1 = in-process)")
+    parser.add_argument('--chunk', type=int, default=64, help="Scenarios per submitted task")
+    parser.add_argument('--make-manifest', action='store_true', help="Write a random manifest instead of running one")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100])
+    parser.add_argument('--maps', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--algorithms', nargs='+', default=['bfs'], choices=ALGORITHMS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.make_manifest:
+        count = make_manifest(args.manifest, args.sizes, args.maps, args.queries, args.algorithms, args.seed)
+        print(f"Wrote {count} scenarios to {args.manifest}")
+        return 0
+    if not args.out:
+        parser.error("--out is required to run a manifest")
+    run_batch(args.manifest, args.out, args.workers, args.chunk, log=print, algorithms=args.algorithms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
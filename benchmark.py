@@ -0,0 +1,243 @@
+"""Headless benchmark for the search algorithms.
+
+Runs every algorithm on seeded maps (random scatter at several coverages,
+backtracker mazes and empty grids) without pygame, sleeps or
+callbacks, and reports wall time, nodes expanded, frontier pushes, peak
+frontier, peak memory and path length (a cost under --terrain).
+
+    python benchmark.py --sizes 20 100 1000 --out results.json
+    python benchmark.py --terrain 9 --costs 10 14 --algorithms ucs_heap ucs_dial ucs_radix ucs_indexed
+    python benchmark.py --baseline results.json      # flag regressions
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from environment import GridEnvironment
+from ALGORITHM import GridEngine, wall_buffer, np
+
+ALGORITHMS = ['bfs', 'dfs', 'ucs', 'dls', 'iddfs', 'bidirectional_search', 'bidirectional_ucs',
+              'astar', 'jps', 'ucs_heap', 'ucs_dial', 'ucs_radix', 'ucs_indexed']
+if np is not None:
+    ALGORITHMS.append('bfs_bitset')
+DEFAULT_SIZES = [20, 50, 100, 200, 500, 1000]
+DEFAULT_COVERAGES = [0.1, 0.2, 0.3]
+
+# IDDFS repeats a DLS per depth, so on mazes (long paths, little pruning) it is still
+# O(depth * cells); keep it to sizes that finish in reasonable time unless --no-limits.
+# 'name/kind' entries override the limit on one map kind (maze 40: ~3 s per run).
+SIZE_LIMITS = {'iddfs': 200, 'iddfs/maze': 40}
+
+FIELDS = ['map', 'coverage', 'size', 'seed', 'terrain', 'algorithm', 'time_s', 'expanded',
+          'pushes', 'decrease_keys', 'peak_frontier', 'peak_mem_kb', 'path_len', 'path_cost']
+
+
+def build_map(kind, size, seed, coverage=0.0, terrain=0, costs=(1, 1), path=None):
+    """Returns a seeded GridEnvironment with start/target corners open.
+    `terrain` > 1 gives every cell a random weight up to that value. Kind
+    'file' loads the .map / binary map at `path` as is (size is taken from it).
+    Draws only from a local random.Random(seed), so it is safe in threads."""
+    rng = random.Random(seed)
+    if kind == 'file':
+        env = GridEnvironment.from_file(path)
+    else:
+        env = GridEnvironment(size)
+        if kind == 'scatter':
+            env.random_scatter(coverage, rng)
+        elif kind.startswith('maze'):
+            # 'maze' is a backtracker maze; 'maze:kruskal', 'maze:wilson', 'maze:eller' pick another
+            env.generate_maze(kind.partition(':')[2] or 'backtracker', seed=rng.getrandbits(64))
+        for r, c in ((0, 0), (size - 1, size - 1)):
+            env.grid[r][c] = 0
+            env.static_obstacles.discard((r, c))
+    if terrain > 1: env.random_terrain(terrain, rng=rng)
+    env.set_move_costs(*costs)
+    env.mark_changed()
+    return env
+
+
+def map_from_spec(spec):
+    """build_map for a JSON map spec, e.g. {"kind": "scatter", "size": 200, "seed": 3,
+    "coverage": 0.2} or {"kind": "file", "path": "arena.map"}"""
+    return build_map(spec['kind'], spec.get('size'), spec.get('seed', 0), spec.get('coverage', 0.0),
+                     spec.get('terrain', 0), spec.get('costs', (1, 1)), spec.get('path'))
+
+
+def make_engine(env):
+    """GridEngine for `env` using its move costs and terrain"""
+    engine = GridEngine(env.size)
+    engine.set_costs(env.straight_cost, env.diagonal_cost, env.terrain_buffer())
+    return engine
+
+
+def path_cost(engine, path):
+    """Cost of a node-id path under the engine's cost model"""
+    if not path: return None
+    weights, cost = engine.weights, 0
+    for a, b in zip(path, path[1:]):
+        step = engine.straight_cost if abs(b - a) in (1, engine.size) else engine.diagonal_cost
+        cost += step * (weights[b] if weights is not None else 1)
+    return cost
+
+
+def map_suite(sizes, coverages):
+    for size in sizes:
+        yield 'empty', 0.0, size
+        for coverage in coverages:
+            yield 'scatter', coverage, size
+        yield 'maze', 0.0, size
+
+
+def search_args(name, size):
+    """Extra positional arguments (depth limits) for DLS / IDDFS. Neither limit can cut
+    off a path: IDDFS stops at the first depth that finds one, or once a depth
+    reaches every reachable cell, so a limit of `cells` costs nothing extra."""
+    if name in ('dls', 'iddfs'): return (size * size,)
+    return ()
+
+
+def size_limit(limits, name, kind):
+    """Largest map size `name` runs on for map `kind` (None = no limit)"""
+    return limits.get(f"{name}/{kind.partition(':')[0]}", limits.get(name))
+
+
+def run_one(engine, name, walls, size, repeat, memory):
+    method = getattr(engine, name)
+    start, target = 0, size * size - 1
+    args = search_args(name, size)
+
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        path = method(start, target, walls, *args)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak_mem = None
+    if memory:
+        # Separate pass: tracemalloc slows allocation down and would skew time_s
+        tracemalloc.start()
+        method(start, target, walls, *args)
+        peak_mem = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    return {
+        'time_s': round(best, 6),
+        'expanded': engine.expanded,
+        'pushes': engine.pushes,
+        'decrease_keys': engine.decrease_keys,
+        'peak_frontier': engine.peak_frontier,
+        'peak_mem_kb': peak_mem,
+        'path_len': len(path) if path else None,
+        'path_cost': path_cost(engine, path),
+    }
+
+
+def run_suite(sizes, coverages, algorithms, seed=0, repeat=3, memory=True,
+              limits=SIZE_LIMITS, log=None, terrain=0, costs=(1, 1)):
+    results = []
+    for kind, coverage, size in map_suite(sizes, coverages):
+        env = build_map(kind, size, seed, coverage, terrain, costs)
+        walls = wall_buffer(env.grid)
+        engine = make_engine(env)
+        for name in algorithms:
+            limit = size_limit(limits, name, kind)
+            if limit is not None and size > limit: continue
+            row = {'map': kind, 'coverage': coverage, 'size': size, 'seed': seed, 'terrain': terrain,
+                   'algorithm': name}
+            row.update(run_one(engine, name, walls, size, repeat, memory))
+            results.append(row)
+            if log: log(row)
+    return results
+
+
+def row_key(row):
+    return (row['map'], row['coverage'], row['size'], row['seed'], row.get('terrain', 0), row['algorithm'])
+
+
+def compare(results, baseline, threshold=1.25):
+    """Returns human-readable regressions against a baseline result list"""
+    base = {row_key(row): row for row in baseline}
+    problems = []
+    for row in results:
+        old = base.get(row_key(row))
+        if old is None: continue
+        label = '{map}/{coverage}/{size}/{algorithm}'.format(**row)
+        if row['path_len'] != old['path_len']:
+            problems.append(f"{label}: path length {old['path_len']} -> {row['path_len']}")
+        if old.get('path_cost') is not None and row['path_cost'] != old['path_cost']:
+            problems.append(f"{label}: path cost {old['path_cost']} -> {row['path_cost']}")
+        if row['expanded'] > old['expanded']:
+            problems.append(f"{label}: expanded {old['expanded']} -> {row['expanded']}")
+        # Sub-millisecond runs are too noisy to compare on time
+        if old['time_s'] >= 0.001 and row['time_s'] > old['time_s'] * threshold:
+            problems.append(f"{label}: time {old['time_s']:.4f}s -> {row['time_s']:.4f}s")
+    return problems
+
+
+def write_results(results, path):
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=1)
+
+
+def load_results(path):
+    if path.endswith('.csv'):
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for key in ('coverage', 'time_s'): row[key] = float(row[key])
+            for key in ('size', 'seed', 'expanded', 'peak_frontier'): row[key] = int(row[key])
+            for key in ('terrain', 'pushes', 'decrease_keys', 'peak_mem_kb', 'path_len', 'path_cost'):
+                row[key] = int(row[key]) if row.get(key) else None
+        return rows
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search algorithms headlessly")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--coverages', type=float, nargs='+', default=DEFAULT_COVERAGES)
+    parser.add_argument('--algorithms', nargs='+', default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--terrain', type=int, default=0, metavar='MAXW', help="Random terrain weights up to MAXW")
+    parser.add_argument('--costs', type=int, nargs=2, default=[1, 1], metavar=('STRAIGHT', 'DIAGONAL'),
+                        help="Move costs (e.g. 10 14)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case (min is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--no-limits', action='store_true', help="Ignore SIZE_LIMITS")
+    parser.add_argument('--out', help="Write results to .json or .csv")
+    parser.add_argument('--baseline', help="Compare against a saved .json/.csv result file")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Allowed time ratio vs baseline")
+    args = parser.parse_args(argv)
+
+    def log(row):
+        print('{map:8} {coverage:4} {size:5} {algorithm:21} {time_s:10.4f}s '
+              'exp={expanded:<9} push={pushes:<9} frontier={peak_frontier:<8} mem_kb={peak_mem_kb} '
+              'path={path_len} cost={path_cost}'.format(**row))
+
+    results = run_suite(args.sizes, args.coverages, args.algorithms, args.seed, args.repeat,
+                        not args.no_memory, {} if args.no_limits else SIZE_LIMITS, log,
+                        args.terrain, tuple(args.costs))
+    if args.out:
+        write_results(results, args.out)
+
+    if args.baseline:
+        problems = compare(results, load_results(args.baseline), args.threshold)
+        for line in problems: print("REGRESSION", line)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Headless command line: solve, benchmark, generate and replay without pygame.
+
+Only the GUI imports pygame (`gui`, or python main.py), so a one-shot query
+starts in tens of milliseconds. NumPy is imported lazily as well, the first
+time a search or backend actually uses it.
+
+    python cli.py solve --map arena.map --start 1 1 --target 40 60 --algorithm astar
+    python cli.py solve --kind scatter --size 300 --seed 3 --coverage 0.2 --path
+    python cli.py generate maze.bmap --kind maze:eller --size 10001 --seed 7
+    python cli.py benchmark --sizes 100 200 --out results.json   (benchmark.py options)
+    python cli.py agents --size 200 --agents 500                 (multi_agent.py options)
+    python cli.py replay traces/run-001-bfs.svt --at 500
+    python cli.py gui --map arena.map                            (main.py options)
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from ALGORITHM import wall_buffer
+from benchmark import ALGORITHMS, build_map, make_engine, path_cost, search_args
+from map_io import save_map
+from maze import maze_rows
+
+# Replay rendering, one character per cell (later layers win)
+REPLAY_CHARS = {'open': '.', 'wall': '#', 'explored': '-', 'frontier': 'o', 'dynamic': '%',
+                'path': '*', 'start': 'S', 'target': 'T'}
+
+
+def add_map_args(parser):
+    parser.add_argument('--map', metavar='FILE', help=".map or binary map (otherwise a generated map)")
+    parser.add_argument('--kind', default='scatter',
+                        help="empty, scatter, maze or maze:<kruskal|wilson|eller> (default scatter)")
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--coverage', type=float, default=0.2, help="Wall share of scatter maps")
+    parser.add_argument('--terrain', type=int, default=0, metavar='MAXW', help="Random terrain weights up to MAXW")
+    parser.add_argument('--costs', type=int, nargs=2, default=[1, 1], metavar=('STRAIGHT', 'DIAGONAL'))
+
+
+def map_from_args(args):
+    if args.map:
+        return build_map('file', None, args.seed, terrain=args.terrain, costs=tuple(args.costs), path=args.map)
+    return build_map(args.kind, args.size, args.seed, args.coverage, args.terrain, tuple(args.costs))
+
+
+# --- Commands ---
+def solve(args):
+    env = map_from_args(args)
+    size = env.size
+    start = tuple(args.start) if args.start else (0, 0)
+    target = tuple(args.target) if args.target else (size - 1, size - 1)
+    for cell in (start, target):
+        if not all(0 <= v < size for v in cell):
+            raise SystemExit(f"cell {list(cell)} is off the {size}x{size} map")
+    engine = make_engine(env)
+    walls = wall_buffer(env.grid)
+    t0 = time.perf_counter()
+    ids = getattr(engine, args.algorithm)(engine.node_id(start), engine.node_id(target), walls,
+                                          *search_args(args.algorithm, size))
+    elapsed = time.perf_counter() - t0
+    row = {'algorithm': args.algorithm, 'size': size, 'start': list(start), 'target': list(target),
+           'path_len': len(ids) if ids else None, 'path_cost': path_cost(engine, ids),
+           'expanded': engine.expanded, 'pushes': engine.pushes, 'time_s': round(elapsed, 6)}
+    if args.path: row['path'] = engine.to_cells(ids) if ids else None
+    print(json.dumps(row))
+    return 0 if ids else 1
+
+
+def generate(args):
+    """Writes a generated map. Mazes without terrain stream straight from the
+    generator into the file, so `maze:eller` needs only O(size) memory."""
+    size = args.size
+    if args.kind.startswith('maze') and args.terrain <= 1 and not args.map:
+        def rows():
+            # Same maze and open corners as build_map
+            seed = random.Random(args.seed).getrandbits(64)
+            for r, row in maze_rows(size, args.kind.partition(':')[2] or 'backtracker', seed):
+                if r in (0, size - 1):
+                    row = bytearray(row)
+                    row[0 if r == 0 else size - 1] = 0
+                yield r, row
+        save_map(args.out, size, rows())
+    else:
+        env = map_from_args(args)
+        env.save_map(args.out)
+    print(f"Wrote {args.kind} {size}x{size} map to {args.out}")
+    return 0
+
+
+def replay(args):
+    """Prints a trace's header and, with --at, the search state after that many records"""
+    from search_trace import TraceReader, TraceReplay, K_PUSH, K_POP, K_EXPAND, K_UNEXPAND, K_RESET, K_SPAWN
+
+    reader = TraceReader(args.trace)
+    try:
+        kinds = {K_PUSH: 'push', K_POP: 'pop', K_EXPAND: 'expand', K_UNEXPAND: 'unexpand',
+                 K_RESET: 'reset', K_SPAWN: 'spawn'}
+        counts = dict.fromkeys(kinds.values(), 0)
+        for i in range(len(reader)):
+            name = kinds.get(reader.record(i)[0])
+            if name: counts[name] += 1
+        print(json.dumps({'trace': args.trace, 'size': reader.size, 'start': list(reader.start),
+                          'target': list(reader.target), 'records': len(reader),
+                          'path_len': len(reader.path) if reader.path else None, 'counts': counts}))
+        if args.at is None: return 0
+        state = TraceReplay(reader)
+        state.seek(args.at)
+        size, chars = reader.size, REPLAY_CHARS
+        on_path = set(reader.path or ()) if state.finished else set()
+        for r in range(size):
+            line = []
+            for c in range(size):
+                n = r * size + c
+                if (r, c) == reader.start: ch = chars['start']
+                elif (r, c) == reader.target: ch = chars['target']
+                elif (r, c) in on_path: ch = chars['path']
+                elif state.dynamic[n] > 0: ch = chars['dynamic']
+                elif reader.walls[n]: ch = chars['wall']
+                elif state.frontier[n] > 0: ch = chars['frontier']
+                elif state.explored[n] > 0: ch = chars['explored']
+                else: ch = chars['open']
+                line.append(ch)
+            print(''.join(line))
+        print(f"record {state.pos} of {len(reader)}" + (f", depth limit {state.depth}" if state.depth is not None else ""))
+    finally:
+        reader.close()
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # benchmark, agents and gui hand their arguments to benchmark.py / multi_agent.py / main.py unchanged
+    if argv and argv[0] == 'benchmark':
+        import benchmark
+        return benchmark.main(argv[1:])
+    if argv and argv[0] == 'agents':
+        import multi_agent
+        return multi_agent.main(argv[1:])
+    if argv and argv[0] == 'gui':
+        import main as gui
+        return gui.main(argv[1:])
+
+    parser = argparse.ArgumentParser(description="Headless pathfinding tools (no pygame)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('benchmark', help="Run benchmark.py (see python benchmark.py --help)")
+    sub.add_parser('agents', help="Multi-agent throughput run (see python multi_agent.py --help)")
+    sub.add_parser('gui', help="Open the visualizer (see python main.py --help)")
+
+    solve_p = sub.add_parser('solve', help="One path query; prints a JSON line")
+    add_map_args(solve_p)
+    solve_p.add_argument('--start', type=int, nargs=2, metavar=('R', 'C'), help="Default: top-left corner")
+    solve_p.add_argument('--target', type=int, nargs=2, metavar=('R', 'C'), help="Default: bottom-right corner")
+    solve_p.add_argument('--algorithm', default='bfs', choices=ALGORITHMS)
+    solve_p.add_argument('--path', action='store_true', help="Include the path cells in the output")
+
+    gen_p = sub.add_parser('generate', help="Write a generated map (.map text or binary)")
+    gen_p.add_argument('out', help="Output file; .map is text, any other extension binary")
+    add_map_args(gen_p)
+
+    replay_p = sub.add_parser('replay', help="Summarize a recorded trace, or print its state at a record")
+    replay_p.add_argument('trace')
+    replay_p.add_argument('--at', type=int, metavar='K', help="Render the grid after K records")
+
+    args = parser.parse_args(argv)
+    return {'solve': solve, 'generate': generate, 'replay': replay}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
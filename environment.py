@@ -1,115 +1,701 @@
-import random
-
-class GridEnvironment:
-    def __init__(self, size=20):
-        self.size = size
-        # 0 = Empty, -1 = Static Wall, -2 = Dynamic Obstacle
-        self.grid = [[0 for _ in range(size)] for _ in range(size)]
-        
-        # Fixed: Removed invalid text markers
-        self.obstacle_chance = 0.03  # Probability of dynamic spawn
-        
-        self.static_obstacles = set()
-        self.dynamic_obstacles = set()
-
-    def add_static_wall(self, start_row, col, length):
-        """Creates a vertical wall for testing static obstacles"""
-        for i in range(length):
-            if start_row + i < self.size:
-                r, c = start_row + i, col
-                self.grid[r][c] = -1
-                self.static_obstacles.add((r, c))
-
-    def toggle_obstacle(self, r, c):
-        """Allows manual drawing/erasing of walls"""
-        if 0 <= r < self.size and 0 <= c < self.size:
-            if self.grid[r][c] == -1:
-                # Remove wall
-                self.grid[r][c] = 0
-                if (r, c) in self.static_obstacles:
-                    self.static_obstacles.remove((r, c))
-            else:
-                # Add wall
-                self.grid[r][c] = -1
-                self.static_obstacles.add((r, c))
-
-    def spawn_dynamic_obstacle(self, start, target, current_agent_pos):
-        """Handles runtime events where obstacles appear randomly"""
-        if random.random() < self.obstacle_chance:
-            r = random.randint(0, self.size - 1)
-            c = random.randint(0, self.size - 1)
-            
-            # Constraints: 
-            # 1. Don't spawn on Start, Target, or Agent
-            # 2. Don't overwrite existing Static Walls (Keep map integrity)
-            safe_zone = [start, target, current_agent_pos]
-            if (r, c) not in safe_zone and self.grid[r][c] == 0:
-                self.grid[r][c] = -1  # Treat as wall
-                self.dynamic_obstacles.add((r, c))
-                return (r, c)
-        return None
-
-    def reset_grid(self):
-        """Completely wipes the grid clean"""
-        self.grid = [[0 for _ in range(self.size)] for _ in range(self.size)]
-        self.static_obstacles.clear()
-        self.dynamic_obstacles.clear()
-
-    def clean_dynamic(self):
-        """Removes only dynamic obstacles (Purple) but keeps Static Walls (Black)"""
-        for r, c in self.dynamic_obstacles:
-            # Only remove if it wasn't originally a static wall
-            if (r, c) not in self.static_obstacles:
-                self.grid[r][c] = 0
-        self.dynamic_obstacles.clear()
-
-    # --- ADVANCED FEATURES ---
-
-    def random_scatter(self, coverage=0.25):
-        """Scatters random walls covering X% of the grid (Chaos Mode)"""
-        self.reset_grid()
-        num_obstacles = int(self.size * self.size * coverage)
-        for _ in range(num_obstacles):
-            r, c = random.randint(0, self.size-1), random.randint(0, self.size-1)
-            if self.grid[r][c] == 0:
-                self.grid[r][c] = -1
-                self.static_obstacles.add((r, c))
-
-    def generate_maze(self):
-        """Generates a perfect maze using Randomized DFS (Recursive Backtracker)"""
-        self.reset_grid()
-        # Fill grid with walls first
-        for r in range(self.size):
-            for c in range(self.size):
-                self.grid[r][c] = -1
-                self.static_obstacles.add((r, c))
-
-        # Helper to carve paths
-        def carve(r, c):
-            self.grid[r][c] = 0
-            if (r, c) in self.static_obstacles:
-                self.static_obstacles.remove((r, c))
-
-            # Directions: Up, Right, Down, Left (jump 2 steps to preserve walls)
-            directions = [(0, 2), (0, -2), (2, 0), (-2, 0)]
-            random.shuffle(directions)
-
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.size and 0 <= nc < self.size and self.grid[nr][nc] == -1:
-                    # Knock down the wall between current and next
-                    wr, wc = r + dr // 2, c + dc // 2
-                    self.grid[wr][wc] = 0
-                    if (wr, wc) in self.static_obstacles:
-                        self.static_obstacles.remove((wr, wc))
-                    carve(nr, nc)
-
-        # Start carving from (0,0)
-        carve(0, 0)
-        
-        # Ensure Start (2,2) and Target (17,17) are open
-        safe_spots = [(0, 0), (self.size-1, self.size-1), (2, 2), (17, 17)]
-        for r, c in safe_spots:
-            if 0 <= r < self.size and 0 <= c < self.size:
-                self.grid[r][c] = 0
-                if (r, c) in self.static_obstacles: self.static_obstacles.remove((r, c))
\ No newline at end of file
+import mmap
+import os
+import random
+import tempfile
+from collections import OrderedDict
+
+from ALGORITHM import np  # Lazily imported; None without NumPy (the NumPy backend is optional)
+from map_io import MapFile, save_map
+from maze import maze_rows
+from obstacles import ObstacleScheduler
+
+class GridEnvironment:
+    per_cell_terrain = True  # False where a weight per cell would not fit in RAM
+
+    def __init__(self, size=20):
+        self.size = size
+        # 0 = Empty, -1 = Static Wall, -2 = Dynamic Obstacle
+        self.grid = [[0 for _ in range(size)] for _ in range(size)]
+        
+        self.static_obstacles = set()
+        self.dynamic_obstacles = set()
+        self.obstacles = ObstacleScheduler(self)  # Seeded dynamic-obstacle timeline (obstacles.py)
+        self.version = 0  # Bumped on every map change; keys cached search results
+
+        # Weighted searches: a move costs straight/diagonal times the terrain weight
+        # (1-255) of the cell entered. terrain stays None while the map is uniform.
+        self.straight_cost = self.diagonal_cost = 1
+        self.terrain = None
+
+    def mark_changed(self):
+        """Bumps the map version. Call after editing `grid` directly."""
+        self.version += 1
+
+    def add_static_wall(self, start_row, col, length):
+        """Creates a vertical wall for testing static obstacles"""
+        for i in range(length):
+            if start_row + i < self.size:
+                r, c = start_row + i, col
+                self.grid[r][c] = -1
+                self.static_obstacles.add((r, c))
+        self.mark_changed()
+
+    def toggle_obstacle(self, r, c):
+        """Allows manual drawing/erasing of walls. Returns the changed cell (for replanners)"""
+        if 0 <= r < self.size and 0 <= c < self.size:
+            if self.grid[r][c] == -1:
+                # Remove wall
+                self.grid[r][c] = 0
+                if (r, c) in self.static_obstacles:
+                    self.static_obstacles.remove((r, c))
+            else:
+                # Add wall
+                self.grid[r][c] = -1
+                self.static_obstacles.add((r, c))
+            self.mark_changed()
+            return (r, c)
+        return None
+
+    def add_dynamic_obstacle(self, r, c):
+        """Blocks the empty cell (r, c) as a dynamic obstacle (the scheduler's
+        events, path server edits). Returns the cell, or None if it was not empty."""
+        if 0 <= r < self.size and 0 <= c < self.size and self.grid[r][c] == 0:
+            self.grid[r][c] = -1  # Treat as wall
+            self.dynamic_obstacles.add((r, c))
+            self.mark_changed()
+            return (r, c)
+        return None
+
+    def wall_count(self):
+        """Number of blocked cells (static + dynamic)"""
+        return sum(row.count(-1) for row in self.grid)
+
+    def wall_buffer(self):
+        """Flat wall buffer for the headless search engine (nonzero = blocked)"""
+        buf = bytearray()
+        for row in self.grid:
+            buf += bytes(map((-1).__eq__, row))
+        return buf
+
+    def wall_rows(self, dynamic=True):
+        """Yields (r, row) with row as `size` bytes, nonzero = blocked. With
+        dynamic=False, cells blocked only by dynamic obstacles read as open."""
+        skip = {}
+        if not dynamic:
+            for r, c in self.dynamic_obstacles:
+                if (r, c) not in self.static_obstacles: skip.setdefault(r, []).append(c)
+        for r, row in enumerate(self.grid):
+            walls = bytearray(map((-1).__eq__, row))
+            for c in skip.get(r, ()): walls[c] = 0
+            yield r, bytes(walls)
+
+    # --- Map files (see map_io.py) ---
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """New environment sized to the map in `path` (.map text or binary), loaded from it"""
+        with MapFile(path) as m: size = m.size
+        env = cls(size, **kwargs)
+        env.load_map(path)
+        return env
+
+    def load_map(self, path):
+        """Replaces the grid (and terrain, if the file has some) with the map in `path`"""
+        with MapFile(path) as m:
+            if m.size != self.size:
+                raise ValueError(f"{path}: map is {m.size}x{m.size}, grid is {self.size}x{self.size}")
+            terrain = m.terrain
+            if terrain is not None and not self.per_cell_terrain:
+                raise ValueError(f"{path}: map has per-cell terrain, which "
+                                 f"{type(self).__name__} does not support")
+            self.reset_grid()
+            self._write_rows(m.rows())
+        if terrain is not None: self._terrain_array('load_map')[:] = terrain
+        self.mark_changed()
+
+    def save_map(self, path, dynamic=True):
+        """Writes the walls (dynamic obstacles too, unless dynamic=False) as a .map
+        file, or as a binary map with terrain for any other extension"""
+        save_map(path, self.size, self.wall_rows(dynamic), self.terrain)
+
+    def reset_grid(self):
+        """Completely wipes the grid clean"""
+        self.grid = [[0 for _ in range(self.size)] for _ in range(self.size)]
+        self.static_obstacles.clear()
+        self.dynamic_obstacles.clear()
+        self.terrain = None
+        self.mark_changed()
+
+    def clean_dynamic(self):
+        """Removes only dynamic obstacles (Purple) but keeps Static Walls (Black)"""
+        for r, c in self.dynamic_obstacles:
+            # Only remove if it wasn't originally a static wall
+            if (r, c) not in self.static_obstacles:
+                self.grid[r][c] = 0
+        self.dynamic_obstacles.clear()
+        self.mark_changed()
+
+    # --- Terrain and move costs ---
+    def set_move_costs(self, straight=1, diagonal=1):
+        """Base cost of a straight and a diagonal move (positive integers, e.g. 10 / 14)"""
+        self.straight_cost, self.diagonal_cost = straight, diagonal
+        self.mark_changed()
+
+    def _terrain_array(self, feature):
+        if not self.per_cell_terrain:
+            raise ValueError(f"{feature}: {type(self).__name__} only supports uniform terrain")
+        if self.terrain is None:
+            self.terrain = bytearray(b'\x01') * (self.size * self.size)
+        return self.terrain
+
+    def set_terrain(self, r, c, weight):
+        """Sets the weight (1-255) paid for entering cell (r, c)"""
+        if 0 <= r < self.size and 0 <= c < self.size:
+            self._terrain_array('set_terrain')[r * self.size + c] = weight
+            self.mark_changed()
+
+    def random_terrain(self, max_weight=9, coverage=1.0, rng=None):
+        """Gives `coverage` of the cells a random weight in 2..max_weight (the rest
+        weigh 1). Draws from `rng` (a random.Random), else the global RNG."""
+        rng = rng or random
+        terrain = self._terrain_array('random_terrain')
+        terrain[:] = bytearray(b'\x01') * len(terrain)
+        if max_weight > 1:
+            for cell in rng.sample(range(len(terrain)), int(len(terrain) * coverage)):
+                terrain[cell] = rng.randint(2, max_weight)
+        self.mark_changed()
+
+    def clear_terrain(self):
+        self.terrain = None
+        self.mark_changed()
+
+    def terrain_buffer(self):
+        """Flat per-cell weights indexed by node id, or None for uniform terrain"""
+        return self.terrain
+
+    # --- ADVANCED FEATURES ---
+
+    def fill_walls(self):
+        """Turns every cell into a static wall (starting point for maze carving)"""
+        self.reset_grid()
+        for r in range(self.size):
+            for c in range(self.size):
+                self.grid[r][c] = -1
+                self.static_obstacles.add((r, c))
+        self.mark_changed()
+
+    def random_scatter(self, coverage=0.25, rng=None):
+        """Scatters random walls covering X% of the grid (Chaos Mode). Draws from
+        `rng` (a random.Random), else the global RNG."""
+        rng = rng or random
+        self.reset_grid()
+        num_obstacles = int(self.size * self.size * coverage)
+        for _ in range(num_obstacles):
+            r, c = rng.randint(0, self.size-1), rng.randint(0, self.size-1)
+            if self.grid[r][c] == 0:
+                self.grid[r][c] = -1
+                self.static_obstacles.add((r, c))
+        self.mark_changed()
+
+    def generate_maze(self, algorithm='backtracker', seed=None, keep_open=()):
+        """Generates a perfect maze (see maze.py for the algorithms).
+
+        Rows are written once each as the generator emits them. Both corners
+        and any `keep_open` cells (e.g. start and target) are left open.
+        """
+        self.reset_grid()
+        self._write_rows(maze_rows(self.size, algorithm, seed))
+        for r, c in ((0, 0), (self.size - 1, self.size - 1), *keep_open):
+            if 0 <= r < self.size and 0 <= c < self.size and self.grid[r][c] == -1:
+                self.toggle_obstacle(r, c)
+        self.mark_changed()
+
+    def _write_rows(self, rows):
+        """Writes (r, row) pairs of wall bytes (1 = static wall) over an empty grid"""
+        for r, row in rows:
+            self.grid[r] = [-b for b in row]
+            self.static_obstacles.update((r, c) for c in range(self.size) if row[c])
+
+
+class _MaskSet:
+    """Set-like view over a boolean mask so `(r, c) in env.dynamic_obstacles` keeps working"""
+    def __init__(self, contains, add, discard, mask):
+        self._contains, self._add, self._discard, self._mask = contains, add, discard, mask
+
+    def __contains__(self, cell):
+        r, c = cell
+        return bool(self._contains(r, c))
+
+    def __iter__(self):
+        return ((int(r), int(c)) for r, c in np.argwhere(self._mask()))
+
+    def __len__(self):
+        return int(np.count_nonzero(self._mask()))
+
+    def add(self, cell): self._add(*cell)
+
+    def discard(self, cell): self._discard(*cell)
+
+    def remove(self, cell):
+        if cell not in self: raise KeyError(cell)
+        self._discard(*cell)
+
+    def clear(self):
+        for cell in list(self): self._discard(*cell)
+
+
+class NumpyGridEnvironment(GridEnvironment):
+    """GridEnvironment stored as an int8 NumPy array plus a dynamic-obstacle bitmask.
+
+    `grid` keeps the 0 / -1 encoding so `grid[r][c]` reads work unchanged, and
+    `static_obstacles` / `dynamic_obstacles` are views derived from the arrays,
+    so there are no Python sets to keep in sync.
+    """
+    def __init__(self, size=20):
+        if np is None:
+            raise ImportError("NumpyGridEnvironment requires numpy")
+        self.size = size
+        self.grid = np.zeros((size, size), dtype=np.int8)
+        self.dynamic = np.zeros((size, size), dtype=bool)
+        self.obstacles = ObstacleScheduler(self)
+        self.version = 0
+        self.straight_cost = self.diagonal_cost = 1
+        self.terrain = None
+
+        self.static_obstacles = _MaskSet(
+            lambda r, c: self.grid[r, c] == -1 and not self.dynamic[r, c],
+            self._set_static, self._clear_cell, self.static_mask)
+        self.dynamic_obstacles = _MaskSet(
+            lambda r, c: self.dynamic[r, c],
+            self._set_dynamic, self._clear_dynamic_bit, lambda: self.dynamic)
+
+    # --- Mask helpers ---
+    def _set_static(self, r, c):
+        self.grid[r, c] = -1
+        self.dynamic[r, c] = False
+
+    def _set_dynamic(self, r, c):
+        self.grid[r, c] = -1
+        self.dynamic[r, c] = True
+
+    def _clear_cell(self, r, c):
+        self.grid[r, c] = 0
+        self.dynamic[r, c] = False
+
+    def _clear_dynamic_bit(self, r, c):
+        self.dynamic[r, c] = False
+
+    # --- Vectorized queries (all views unless noted) ---
+    def static_mask(self):
+        """Boolean array of static walls (new array)"""
+        return (self.grid == -1) & ~self.dynamic
+
+    def passable_mask(self):
+        """Boolean array of open cells (new array)"""
+        return self.grid != -1
+
+    def wall_count(self):
+        return int(np.count_nonzero(self.grid))
+
+    def wall_buffer(self):
+        """Zero-copy flat byte view of the grid; walls read as 255, open cells as 0"""
+        return memoryview(self.grid.reshape(-1).view(np.uint8))
+
+    def wall_rows(self, dynamic=True):
+        for r in range(self.size):
+            if dynamic: yield r, self.grid[r].view(np.uint8).tobytes()
+            else: yield r, ((self.grid[r] != 0) & ~self.dynamic[r]).tobytes()
+
+    # --- Mutations ---
+    def add_static_wall(self, start_row, col, length):
+        """Creates a vertical wall for testing static obstacles"""
+        if 0 <= col < self.size:
+            self.grid[start_row:start_row + length, col] = -1
+            self.dynamic[start_row:start_row + length, col] = False
+            self.mark_changed()
+
+    def toggle_obstacle(self, r, c):
+        """Allows manual drawing/erasing of walls. Returns the changed cell (for replanners)"""
+        if 0 <= r < self.size and 0 <= c < self.size:
+            if self.grid[r, c] == -1: self._clear_cell(r, c)
+            else: self._set_static(r, c)
+            self.mark_changed()
+            return (r, c)
+        return None
+
+    def add_dynamic_obstacle(self, r, c):
+        if 0 <= r < self.size and 0 <= c < self.size and self.grid[r, c] == 0:
+            self._set_dynamic(r, c)
+            self.mark_changed()
+            return (r, c)
+        return None
+
+    def reset_grid(self):
+        """Completely wipes the grid clean (in place, so views stay valid)"""
+        self.grid.fill(0)
+        self.dynamic.fill(False)
+        self.terrain = None
+        self.mark_changed()
+
+    def clean_dynamic(self):
+        """Removes only dynamic obstacles but keeps Static Walls"""
+        self.grid[self.dynamic] = 0
+        self.dynamic.fill(False)
+        self.mark_changed()
+
+    def random_scatter(self, coverage=0.25, rng=None):
+        """Scatters random walls covering X% of the grid (Chaos Mode)"""
+        self.reset_grid()
+        num_obstacles = int(self.size * self.size * coverage)
+        # Seeded from `rng` or the global RNG, so a seed still makes maps reproducible
+        rng = np.random.default_rng((rng or random).getrandbits(64))
+        rows = rng.integers(0, self.size, num_obstacles)
+        cols = rng.integers(0, self.size, num_obstacles)
+        self.grid[rows, cols] = -1
+        self.mark_changed()
+
+    def fill_walls(self):
+        self.dynamic.fill(False)
+        self.grid.fill(-1)
+        self.mark_changed()
+
+    def _write_rows(self, rows):
+        for r, row in rows:
+            self.grid[r] = np.frombuffer(row, dtype=np.int8)
+            self.grid[r] *= -1
+
+
+# Cell bytes in a ChunkedGrid file
+EMPTY, STATIC, DYNAMIC = 0, 1, 2
+
+
+class ChunkedGrid:
+    """Square map stored as tile x tile byte tiles in a memory-mapped file.
+
+    Tiles are copied out of the mapping on first use and kept in a small LRU;
+    dirty tiles are written back when evicted or on flush(). `grid[r][c]`
+    reads 0 / -1 like the list-of-lists grid, so existing code keeps working,
+    and only the tiles it actually touches are ever paged in.
+    """
+    def __init__(self, size, path=None, tile=256, cache_tiles=64):
+        self.size, self.tile = size, tile
+        self.per_side = -(-size // tile)
+        self.tile_bytes = tile * tile
+        nbytes = max(self.per_side * self.per_side * self.tile_bytes, 1)
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.grid')
+            os.close(fd)
+            self.temporary = True
+        else:
+            self.temporary = False
+        self.path = path
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size < nbytes:
+            self.file.truncate(nbytes)  # Sparse: untouched tiles cost no disk or RAM
+        self.mm = mmap.mmap(self.file.fileno(), nbytes)
+        self.cache_tiles = cache_tiles
+        self.tiles = OrderedDict()  # (tile row, tile col) -> bytearray
+        self.dirty = set()
+        self.loads = 0              # Tiles paged in so far (for tests and stats)
+
+    # --- Tiles ---
+    def _tile(self, key):
+        data = self.tiles.get(key)
+        if data is not None:
+            self.tiles.move_to_end(key)
+            return data
+        offset = (key[0] * self.per_side + key[1]) * self.tile_bytes
+        data = bytearray(self.mm[offset:offset + self.tile_bytes])
+        self.loads += 1
+        self.tiles[key] = data
+        if len(self.tiles) > self.cache_tiles:
+            self._write_back(*self.tiles.popitem(last=False))
+        return data
+
+    def _write_back(self, key, data):
+        if key in self.dirty:
+            offset = (key[0] * self.per_side + key[1]) * self.tile_bytes
+            self.mm[offset:offset + self.tile_bytes] = data
+            self.dirty.discard(key)
+
+    def get(self, r, c):
+        """Raw cell byte (EMPTY / STATIC / DYNAMIC)"""
+        t = self.tile
+        return self._tile((r // t, c // t))[(r % t) * t + c % t]
+
+    def set(self, r, c, value):
+        t = self.tile
+        key = (r // t, c // t)
+        self._tile(key)[(r % t) * t + c % t] = value
+        self.dirty.add(key)
+
+    def flush(self):
+        for key, data in self.tiles.items():
+            self._write_back(key, data)
+        self.mm.flush()
+
+    def clear(self, value=EMPTY):
+        """Sets every cell to `value` (EMPTY re-sparsifies the file)"""
+        self.tiles.clear()
+        self.dirty.clear()
+        if value == EMPTY:
+            nbytes = len(self.mm)
+            self.mm.close()
+            self.file.truncate(0)
+            self.file.truncate(nbytes)
+            self.mm = mmap.mmap(self.file.fileno(), nbytes)
+            return
+        block = bytes([value]) * self.tile_bytes
+        for offset in range(0, len(self.mm), self.tile_bytes):
+            self.mm[offset:offset + self.tile_bytes] = block
+
+    def close(self):
+        if self.mm.closed: return
+        self.flush()
+        self.mm.close()
+        self.file.close()
+        if self.temporary: os.remove(self.path)
+
+    # --- Bulk reads ---
+    def window(self, r0, c0, side):
+        """Flat side x side wall buffer of the square at (r0, c0); cells off the map are walls"""
+        t, size = self.tile, self.size
+        buf = bytearray(b'\x01') * (side * side)
+        for r in range(r0, min(r0 + side, size)):
+            out = (r - r0) * side
+            c = c0
+            while c < min(c0 + side, size):
+                tile = self._tile((r // t, c // t))
+                start = (r % t) * t + c % t
+                run = min(t - c % t, c0 + side - c, size - c)
+                buf[out + c - c0:out + c - c0 + run] = tile[start:start + run]
+                c += run
+        return buf
+
+    def row(self, r):
+        """Raw cell bytes of row r (nonzero = blocked), read tile by tile"""
+        t = self.tile
+        start = (r % t) * t
+        out = bytearray()
+        for tc in range(self.per_side):
+            out += self._tile((r // t, tc))[start:start + min(t, self.size - tc * t)]
+        return bytes(out)
+
+    def count_nonzero(self):
+        self.flush()
+        total, step = 0, self.tile_bytes * 64
+        for offset in range(0, len(self.mm), step):
+            chunk = self.mm[offset:offset + step]
+            total += len(chunk) - chunk.count(0)
+        return total
+
+    def write_tile(self, key, data):
+        """Replaces a whole tile (bulk writers go through here instead of per-cell set)"""
+        self.tiles.pop(key, None)
+        self.dirty.discard(key)
+        offset = (key[0] * self.per_side + key[1]) * self.tile_bytes
+        self.mm[offset:offset + self.tile_bytes] = data
+
+    # --- grid[r][c] read path ---
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, r):
+        if not 0 <= r < self.size: raise IndexError(r)
+        return _ChunkedRow(self, r)
+
+    def __iter__(self):
+        return (_ChunkedRow(self, r) for r in range(self.size))
+
+
+class _ChunkedRow:
+    """One row of a ChunkedGrid: row[c] reads 0 / -1, row[c] = -1 writes a static wall"""
+    __slots__ = ('grid', 'r')
+
+    def __init__(self, grid, r):
+        self.grid, self.r = grid, r
+
+    def __len__(self):
+        return self.grid.size
+
+    def __getitem__(self, c):
+        if isinstance(c, slice):
+            return [self[i] for i in range(*c.indices(self.grid.size))]
+        if not 0 <= c < self.grid.size: raise IndexError(c)
+        return -1 if self.grid.get(self.r, c) else 0
+
+    def __setitem__(self, c, value):
+        self.grid.set(self.r, c, STATIC if value == -1 else EMPTY)
+
+    def __iter__(self):
+        return (self[c] for c in range(self.grid.size))
+
+    def count(self, value):
+        return sum(1 for v in self if v == value)
+
+
+class _StaticCells:
+    """Set-like view of the STATIC cells of a ChunkedGrid (iteration scans the whole map)"""
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __contains__(self, cell):
+        return self.grid.get(*cell) == STATIC
+
+    def __iter__(self):
+        size = self.grid.size
+        return ((r, c) for r in range(size) for c in range(size) if self.grid.get(r, c) == STATIC)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def add(self, cell): self.grid.set(*cell, STATIC)
+
+    def discard(self, cell):
+        if cell in self: self.grid.set(*cell, EMPTY)
+
+    def remove(self, cell):
+        if cell not in self: raise KeyError(cell)
+        self.grid.set(*cell, EMPTY)
+
+    def clear(self):
+        for cell in list(self): self.grid.set(*cell, EMPTY)
+
+
+class _DynamicCells(set):
+    """Dynamic obstacles: a real set (they are few) mirrored into the tile bytes"""
+    def __init__(self, grid):
+        super().__init__()
+        self.grid = grid
+
+    def add(self, cell):
+        super().add(cell)
+        self.grid.set(*cell, DYNAMIC)
+
+    def discard(self, cell):
+        # Like NumpyGridEnvironment: the cell stays blocked, just no longer dynamic
+        if cell in self:
+            super().discard(cell)
+            if self.grid.get(*cell) == DYNAMIC: self.grid.set(*cell, STATIC)
+
+    def remove(self, cell):
+        if cell not in self: raise KeyError(cell)
+        self.discard(cell)
+
+
+class ChunkedGridEnvironment(GridEnvironment):
+    """GridEnvironment backed by a ChunkedGrid, for maps far larger than RAM.
+
+    Memory use is bounded by the tile LRU (`cache_tiles` * `tile`^2 bytes)
+    plus the dynamic-obstacle set. Pass `path` to keep the map on disk
+    between runs; without it a temporary file is used and removed on close().
+    Whole-map operations (scatter, fill, counts) stream tile by tile.
+    """
+    per_cell_terrain = False
+
+    def __init__(self, size=20, path=None, tile=256, cache_tiles=64):
+        self.size = size
+        self.grid = ChunkedGrid(size, path, tile, cache_tiles)
+        self.static_obstacles = _StaticCells(self.grid)
+        self.dynamic_obstacles = _DynamicCells(self.grid)
+        self.obstacles = ObstacleScheduler(self)
+        self.version = 0
+        self.straight_cost = self.diagonal_cost = 1
+        self.terrain = None  # Always uniform: a weight per cell would not fit in RAM
+
+    def close(self):
+        self.grid.close()
+
+    # --- Queries ---
+    def wall_count(self):
+        return self.grid.count_nonzero()
+
+    def wall_buffer(self):
+        """Flat wall buffer of the whole map (size^2 bytes: only for maps that fit in RAM)"""
+        return self.grid.window(0, 0, self.size)
+
+    def wall_window(self, r0, c0, side):
+        return self.grid.window(r0, c0, side)
+
+    def wall_rows(self, dynamic=True):
+        static_only = bytes([EMPTY, STATIC, EMPTY]) + bytes(253)
+        for r in range(self.size):
+            row = self.grid.row(r)
+            yield r, row if dynamic else row.translate(static_only)
+
+    # --- Mutations ---
+    def add_static_wall(self, start_row, col, length):
+        """Creates a vertical wall for testing static obstacles"""
+        if 0 <= col < self.size:
+            for r in range(max(start_row, 0), min(start_row + length, self.size)):
+                self.dynamic_obstacles.discard((r, col))
+                self.grid.set(r, col, STATIC)
+            self.mark_changed()
+
+    def toggle_obstacle(self, r, c):
+        """Allows manual drawing/erasing of walls. Returns the changed cell (for replanners)"""
+        if 0 <= r < self.size and 0 <= c < self.size:
+            if self.grid.get(r, c):
+                set.discard(self.dynamic_obstacles, (r, c))
+                self.grid.set(r, c, EMPTY)
+            else:
+                self.grid.set(r, c, STATIC)
+            self.mark_changed()
+            return (r, c)
+        return None
+
+    def add_dynamic_obstacle(self, r, c):
+        if 0 <= r < self.size and 0 <= c < self.size and not self.grid.get(r, c):
+            self.dynamic_obstacles.add((r, c))
+            self.mark_changed()
+            return (r, c)
+        return None
+
+    def reset_grid(self):
+        """Completely wipes the grid clean"""
+        self.grid.clear()
+        set.clear(self.dynamic_obstacles)
+        self.mark_changed()
+
+    def clean_dynamic(self):
+        """Removes only dynamic obstacles but keeps Static Walls"""
+        for r, c in self.dynamic_obstacles:
+            if self.grid.get(r, c) == DYNAMIC: self.grid.set(r, c, EMPTY)
+        set.clear(self.dynamic_obstacles)
+        self.mark_changed()
+
+    def fill_walls(self):
+        set.clear(self.dynamic_obstacles)
+        self.grid.clear(STATIC)
+        self.mark_changed()
+
+    def _write_rows(self, rows):
+        # Buffers one band of tile rows, then writes each of its tiles whole
+        grid, t, size = self.grid, self.grid.tile, self.size
+        band = bytearray(t * size)
+        for r, row in rows:
+            i = r % t
+            band[i * size:(i + 1) * size] = row
+            if i == t - 1 or r == size - 1:
+                for tc in range(grid.per_side):
+                    c0 = tc * t
+                    data = bytearray(grid.tile_bytes)
+                    for j in range(i + 1):
+                        line = band[j * size + c0:j * size + min(c0 + t, size)]
+                        data[j * t:j * t + len(line)] = line
+                    grid.write_tile((r // t, tc), data)
+
+    def random_scatter(self, coverage=0.25, rng=None):
+        """Scatters random walls covering X% of the grid (Chaos Mode)"""
+        rng = rng or random
+        self.reset_grid()
+        # Tile by tile, so each tile is written once instead of paged in at random
+        grid, t, size = self.grid, self.grid.tile, self.size
+        for tr in range(grid.per_side):
+            rows = min(t, size - tr * t)
+            for tc in range(grid.per_side):
+                cols = min(t, size - tc * t)
+                data = bytearray(grid.tile_bytes)
+                for _ in range(int(rows * cols * coverage)):
+                    data[rng.randrange(rows) * t + rng.randrange(cols)] = STATIC
+                grid.write_tile((tr, tc), data)
+        self.mark_changed()
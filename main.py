@@ -1,348 +1,1005 @@
-import pygame
-import time
-from environment import GridEnvironment
-from ALGORITHM import SearchAlgorithms
-
-# --- Configuration ---
-WINDOW_TITLE = "SEARCHING VISUALIZER"
-GRID_SIZE = 20
-CELL_SIZE = 30
-GRID_PIXEL_SIZE = GRID_SIZE * CELL_SIZE
-PANEL_WIDTH = 320
-SCREEN_WIDTH = GRID_PIXEL_SIZE + PANEL_WIDTH
-SCREEN_HEIGHT = GRID_PIXEL_SIZE
-
-# --- Colors ---
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-LIGHT_GRAY = (240, 240, 240)
-GREEN = (46, 204, 113)   # Start / Active Button
-BLUE = (52, 152, 219)    # Target
-RED = (231, 76, 60)      # Agent
-DARK_GRAY = (52, 73, 94) # Wall
-PURPLE = (155, 89, 182)  # Dynamic Obstacle
-ORANGE = (243, 156, 18)  # Frontier
-LIGHT_BLUE = (174, 214, 241) # Explored
-YELLOW = (241, 196, 15)  # Planned Path
-CYAN = (0, 206, 209)     # Traced Path (The trail left behind)
-
-# Button Styling
-BTN_COLOR = (52, 73, 94)
-BTN_HOVER = (44, 62, 80)
-BTN_ACTIVE = (39, 174, 96) # Green for active mode
-TXT_COLOR = (236, 240, 241)
-
-class Button:
-    def __init__(self, x, y, w, h, text, action_code):
-        self.rect = pygame.Rect(x, y, w, h)
-        self.text = text
-        self.action_code = action_code
-        self.is_hovered = False
-
-    def draw(self, screen, font, is_active=False):
-        if is_active:
-            color = BTN_ACTIVE
-        else:
-            color = BTN_HOVER if self.is_hovered else BTN_COLOR
-            
-        # Shadow
-        pygame.draw.rect(screen, (149, 165, 166), (self.rect.x+3, self.rect.y+3, self.rect.w, self.rect.h), border_radius=6)
-        # Button Body
-        pygame.draw.rect(screen, color, self.rect, border_radius=6)
-        # Border
-        pygame.draw.rect(screen, (44, 62, 80), self.rect, 2, border_radius=6)
-        
-        text_surf = font.render(self.text, True, TXT_COLOR)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
-
-    def check_click(self, pos):
-        return self.rect.collidepoint(pos)
-
-class PathfinderApp:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(WINDOW_TITLE)
-        
-        # Fonts
-        self.header_font = pygame.font.SysFont('Segoe UI', 24, bold=True)
-        self.btn_font = pygame.font.SysFont('Segoe UI', 15, bold=True)
-        self.stats_font = pygame.font.SysFont('Consolas', 15) 
-        self.label_font = pygame.font.SysFont('Arial', 18, bold=True)
-
-        self.env = GridEnvironment(GRID_SIZE)
-        self.algo = SearchAlgorithms(GRID_SIZE)
-        
-        self.start = (2, 2)
-        self.target = (17, 17)
-        self.current_pos = self.start
-        
-        # State Variables
-        self.status_msg = "Ready"
-        self.nodes_visited = 0
-        self.path_len = 0
-        self.is_dragging = False 
-        self.animation_speed = 0.02 
-        self.speed_label = "Fast"
-        
-        self.current_mode = 'WALL' 
-        
-        self.setup_ui()
-        self.env.add_static_wall(5, 5, 10)
-
-    def setup_ui(self):
-        btn_w, btn_h = 260, 35
-        btn_gap = 10
-        start_y = 55
-        center_x = GRID_PIXEL_SIZE + (PANEL_WIDTH - btn_w) // 2
-        
-        self.buttons = [
-            Button(center_x, start_y, btn_w, btn_h, "1. Breadth-First (BFS)", 1),
-            Button(center_x, start_y + (btn_h+btn_gap)*1, btn_w, btn_h, "2. Depth-First (DFS)", 2),
-            Button(center_x, start_y + (btn_h+btn_gap)*2, btn_w, btn_h, "3. Uniform-Cost (UCS)", 3),
-            Button(center_x, start_y + (btn_h+btn_gap)*3, btn_w, btn_h, "4. Depth-Limited (DLS)", 4),
-            Button(center_x, start_y + (btn_h+btn_gap)*4, btn_w, btn_h, "5. Iterative Deep (IDDFS)", 5),
-            Button(center_x, start_y + (btn_h+btn_gap)*5, btn_w, btn_h, "6. Bidirectional", 6),
-        ]
-        
-        # Placement Mode Buttons
-        mode_y = start_y + (btn_h+btn_gap)*6 + 15
-        half_w = (btn_w - 10) // 2
-        self.btn_set_start = Button(center_x, mode_y, half_w, btn_h, "Set Start (S)", 'SET_S')
-        self.btn_set_target = Button(center_x + half_w + 10, mode_y, half_w, btn_h, "Set Target (T)", 'SET_T')
-        self.buttons.append(self.btn_set_start)
-        self.buttons.append(self.btn_set_target)
-
-        # Control Buttons
-        ctrl_y = mode_y + btn_h + 15
-        self.buttons.append(Button(center_x, ctrl_y, half_w, btn_h, "Reset Map", 'R'))
-        self.buttons.append(Button(center_x + half_w + 10, ctrl_y, half_w, btn_h, "Clear Dyn", 'C'))
-        
-        # Speed Button
-        self.speed_btn = Button(center_x, ctrl_y + btn_h + 10, btn_w, btn_h, f"Speed: {self.speed_label}", 'S')
-        self.buttons.append(self.speed_btn)
-
-    def draw_grid_cell(self, r, c, color):
-        rect = pygame.Rect(c*CELL_SIZE, r*CELL_SIZE, CELL_SIZE, CELL_SIZE)
-        pygame.draw.rect(self.screen, color, rect)
-        pygame.draw.rect(self.screen, (220, 220, 220), rect, 1)
-        
-        if (r, c) == self.start: 
-            text = self.label_font.render("S", True, WHITE)
-            self.screen.blit(text, text.get_rect(center=rect.center))
-        if (r, c) == self.target:
-            text = self.label_font.render("T", True, WHITE)
-            self.screen.blit(text, text.get_rect(center=rect.center))
-
-    def draw_ui(self):
-        self.screen.fill(WHITE)
-        # 1. Draw Grid
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                color = (252, 252, 252)
-                # Drawing Priority: Wall > Dyn Obstacle > Trace > Path > Frontier/Explored
-                if self.env.grid[r][c] == -1:
-                    color = PURPLE if (r, c) in self.env.dynamic_obstacles else DARK_GRAY
-                elif (r, c) in self.traced_set: color = CYAN # The new trail color
-                elif (r, c) in self.path_set: color = YELLOW
-                elif (r, c) in self.explored_set: color = LIGHT_BLUE
-                elif (r, c) in self.frontier_set: color = ORANGE
-                
-                # Overwrite for Start/Target/Agent
-                if (r, c) == self.start: color = GREEN
-                if (r, c) == self.target: color = BLUE
-                if (r, c) == self.current_pos: color = RED
-                
-                self.draw_grid_cell(r, c, color)
-
-        # 2. Side Panel
-        panel_rect = pygame.Rect(GRID_PIXEL_SIZE, 0, PANEL_WIDTH, SCREEN_HEIGHT)
-        pygame.draw.rect(self.screen, LIGHT_GRAY, panel_rect)
-        pygame.draw.line(self.screen, (189, 195, 199), (GRID_PIXEL_SIZE, 0), (GRID_PIXEL_SIZE, SCREEN_HEIGHT), 2)
-        
-        title = self.header_font.render("Control Menu", True, (44, 62, 80))
-        self.screen.blit(title, (GRID_PIXEL_SIZE + 80, 15))
-        
-        # Draw Buttons
-        mouse_pos = pygame.mouse.get_pos()
-        for btn in self.buttons:
-            btn.is_hovered = btn.rect.collidepoint(mouse_pos)
-            is_active = False
-            if btn.action_code == 'SET_S' and self.current_mode == 'START': is_active = True
-            if btn.action_code == 'SET_T' and self.current_mode == 'TARGET': is_active = True
-            
-            btn.draw(self.screen, self.btn_font, is_active)
-            
-        # Status Box
-        box_x = GRID_PIXEL_SIZE + 15
-        box_y = 500
-        box_w = PANEL_WIDTH - 30
-        box_h = 75
-        pygame.draw.rect(self.screen, (200, 200, 200), (box_x+2, box_y+2, box_w, box_h), border_radius=10)
-        pygame.draw.rect(self.screen, WHITE, (box_x, box_y, box_w, box_h), border_radius=10)
-        pygame.draw.rect(self.screen, (180, 180, 180), (box_x, box_y, box_w, box_h), 1, border_radius=10)
-        
-        stats = [
-            f"Status: {self.status_msg}",
-            f"Nodes Visited: {self.nodes_visited}",
-            f"Path Length:  {self.path_len}"
-        ]
-        for i, line in enumerate(stats):
-            text = self.stats_font.render(line, True, (50, 50, 50)) 
-            self.screen.blit(text, (box_x + 15, box_y + 10 + i*20))
-
-        # Mode Indicator
-        mode_text = f"Current Mode: {self.current_mode} Placement"
-        if self.current_mode == 'WALL': mode_text = "Current Mode: Draw Walls"
-        m_surf = self.stats_font.render(mode_text, True, (100, 100, 100))
-        self.screen.blit(m_surf, (GRID_PIXEL_SIZE + 30, box_y - 25))
-
-        inst_text = self.stats_font.render("Hold Click to Place | 'R' Reset", True, (100, 100, 100))
-        inst_rect = inst_text.get_rect(center=(GRID_PIXEL_SIZE + PANEL_WIDTH//2, SCREEN_HEIGHT - 15))
-        self.screen.blit(inst_text, inst_rect)
-
-        pygame.display.flip()
-
-    def handle_grid_click(self, r, c):
-        if self.current_mode == 'START':
-            if (r, c) != self.target and self.env.grid[r][c] != -1:
-                self.start = (r, c)
-                self.current_pos = (r, c)
-                self.status_msg = "Start Position Set"
-        elif self.current_mode == 'TARGET':
-            if (r, c) != self.start and self.env.grid[r][c] != -1:
-                self.target = (r, c)
-                self.status_msg = "Target Position Set"
-        elif self.current_mode == 'WALL':
-            if (r, c) != self.start and (r, c) != self.target:
-                self.env.toggle_obstacle(r, c)
-
-    def viz_callback(self, node, frontier, explored):
-        self.nodes_visited = len(explored)
-        self.frontier_set = set(frontier)
-        self.explored_set = set(explored)
-        self.draw_ui()
-        self.env.spawn_dynamic_obstacle(self.start, self.target, self.current_pos)
-        time.sleep(self.animation_speed)
-        pygame.event.pump()
-
-    def move_agent(self, path):
-        if not path: return
-        self.path_set = set(path)
-        self.path_len = len(path)
-        self.status_msg = "Path Found! Tracing..."
-        self.draw_ui()
-        
-        # Pause to show full yellow path
-        time.sleep(0.5)
-        
-        # Start Tracing
-        self.status_msg = "Moving Agent..."
-        self.traced_set = set() # Start a fresh trace
-        
-        for i in range(1, len(path)):
-            next_node = path[i]
-            
-            # Dynamic Re-planning Check
-            if self.env.grid[next_node[0]][next_node[1]] == -1:
-                self.status_msg = "BLOCKED! Re-planning..."
-                time.sleep(0.5)
-                return self.run_algo(self.last_algo_code)
-            
-            # Update Position and Trace
-            self.traced_set.add(self.current_pos) # Mark previous spot as traced
-            self.current_pos = next_node
-            self.traced_set.add(self.current_pos) # Mark current spot as traced
-            
-            self.draw_ui()
-            time.sleep(0.15) 
-            
-            if self.env.spawn_dynamic_obstacle(self.start, self.target, self.current_pos):
-                self.draw_ui()
-        
-        self.status_msg = "Target Reached!"
-        self.draw_ui()
-
-    def run_algo(self, code):
-        self.last_algo_code = code
-        self.nodes_visited = 0
-        self.frontier_set, self.explored_set, self.path_set = set(), set(), set()
-        self.traced_set = set() # Reset trace on new run
-        self.status_msg = "Searching..."
-        
-        if self.current_pos == self.target: self.current_pos = self.start
-            
-        methods = {
-            1: lambda: self.algo.bfs(self.current_pos, self.target, self.env.grid, self.viz_callback),
-            2: lambda: self.algo.dfs(self.current_pos, self.target, self.env.grid, self.viz_callback),
-            3: lambda: self.algo.ucs(self.current_pos, self.target, self.env.grid, self.viz_callback),
-            4: lambda: self.algo.dls(self.current_pos, self.target, self.env.grid, 20, self.viz_callback),
-            5: lambda: self.algo.iddfs(self.current_pos, self.target, self.env.grid, 30, self.viz_callback),
-            6: lambda: self.algo.bidirectional_search(self.current_pos, self.target, self.env.grid, self.viz_callback)
-        }
-        
-        if code in methods:
-            path = methods[code]()
-            if path:
-                self.move_agent(path)
-            else:
-                self.status_msg = "No Path Found!"
-                self.draw_ui()
-
-    def toggle_speed(self):
-        if self.speed_label == "Fast":
-            self.speed_label = "Slow"
-            self.animation_speed = 0.1
-        else:
-            self.speed_label = "Fast"
-            self.animation_speed = 0.02
-        self.speed_btn.text = f"Speed: {self.speed_label}"
-
-    def run(self):
-        running = True
-        self.frontier_set, self.explored_set, self.path_set, self.traced_set = set(), set(), set(), set()
-        
-        while running:
-            self.draw_ui()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: running = False
-                
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mx, my = pygame.mouse.get_pos()
-                    if mx < GRID_PIXEL_SIZE: 
-                        self.is_dragging = True
-                        r, c = my // CELL_SIZE, mx // CELL_SIZE
-                        self.handle_grid_click(r, c)
-                    else: 
-                        for btn in self.buttons:
-                            if btn.check_click((mx, my)):
-                                if isinstance(btn.action_code, int): self.run_algo(btn.action_code)
-                                elif btn.action_code == 'R': 
-                                    self.env.reset_grid()
-                                    self.current_pos = self.start
-                                    self.frontier_set, self.explored_set, self.path_set, self.traced_set = set(), set(), set(), set()
-                                    self.status_msg = "Map Reset"
-                                    self.nodes_visited, self.path_len = 0, 0
-                                elif btn.action_code == 'C': self.env.clean_dynamic()
-                                elif btn.action_code == 'S': self.toggle_speed()
-                                # NEW: Deselect logic added below
-                                elif btn.action_code == 'SET_S': 
-                                    # If already in START mode, deselect to WALL mode. Otherwise, switch to START mode.
-                                    self.current_mode = 'WALL' if self.current_mode == 'START' else 'START'
-                                elif btn.action_code == 'SET_T': 
-                                    # If already in TARGET mode, deselect to WALL mode. Otherwise, switch to TARGET mode.
-                                    self.current_mode = 'WALL' if self.current_mode == 'TARGET' else 'TARGET'
-
-                elif event.type == pygame.MOUSEBUTTONUP:
-                    self.is_dragging = False
-                
-                elif event.type == pygame.MOUSEMOTION and self.is_dragging:
-                    mx, my = pygame.mouse.get_pos()
-                    if mx < GRID_PIXEL_SIZE:
-                        r, c = my // CELL_SIZE, mx // CELL_SIZE
-                        self.handle_grid_click(r, c)
-
-if __name__ == "__main__":
-    app = PathfinderApp()
-    app.run()
\ No newline at end of file
+import argparse
+import json
+import os
+import random
+import time
+from environment import GridEnvironment
+from ALGORITHM import SearchAlgorithms, IncrementalPlanner, PUSH, POP, EXPAND, RESET, DONE, np
+from search_trace import TraceRecorder, TraceReader, TraceReplay
+from search_cache import SearchCache
+from search_stats import SearchStats, ProfileHook, TracemallocHook
+from map_io import MapFile, load_scenarios, save_scenarios, scenario
+from obstacles import DEFAULT_PROFILE, PROFILES
+from multi_agent import MultiAgentSim
+
+# --- Configuration ---
+WINDOW_TITLE = "SEARCHING VISUALIZER"
+GRID_SIZE = 20         # Default grid side (--size or a loaded map picks another)
+GRID_PIXEL_SIZE = 600  # Square grid viewport; the grid is zoomed and panned inside it
+PANEL_WIDTH = 320
+SCREEN_WIDTH = GRID_PIXEL_SIZE + PANEL_WIDTH
+SCREEN_HEIGHT = GRID_PIXEL_SIZE
+FPS = 60
+
+# Memory budget for cached search results (keyed by map version, algorithm, start, target)
+CACHE_BUDGET = 16 << 20
+
+# Search events consumed per second for each speed setting (cycled by the Speed button)
+SPEEDS = [("Fast", 50), ("Slow", 10), ("Turbo", 6000), ("Max", 200000)]
+
+# Viewport: mouse wheel zooms by ZOOM_STEP per notch (up to MAX_ZOOM pixels per cell),
+# right or middle drag pans, 'F' fits the whole grid
+MAX_ZOOM = 60
+ZOOM_STEP = 1.25
+GRID_LINE_ZOOM = 8   # Cell borders are drawn from this many pixels per cell up
+GLYPH_ZOOM = 18      # ... and the S / T labels from this many
+
+# Dynamic obstacles follow a simulation clock with one tick per agent step (obstacles.py).
+# While a search animates, the clock runs at the same pace in animation time.
+AGENT_STEP_S = 0.15
+OBSTACLE_PROFILES = list(PROFILES)  # Cycled by 'O'
+
+# Multi-agent mode ('M'): agents kept on the map, and goals they share (the target plus extras)
+AGENT_COUNT = 40
+AGENT_GOALS = 3
+EVENTS_PER_TICK = 5  # A multi-agent tick takes as long as this many search events
+
+# UI fonts as (family, size, bold). pygame.font.SysFont scans every installed font on
+# first use, so the file each family resolves to is cached in FONT_CACHE across runs
+FONTS = {
+    'header': ('Segoe UI', 24, True),
+    'btn': ('Segoe UI', 15, True),
+    'stats': ('Consolas', 15, False),
+    'label': ('Arial', 18, True),
+}
+FONT_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'searching-visualizer', 'fonts.json')
+
+# --- Colors ---
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+LIGHT_GRAY = (240, 240, 240)
+GREEN = (46, 204, 113)   # Start / Active Button
+BLUE = (52, 152, 219)    # Target
+RED = (231, 76, 60)      # Agent
+DARK_GRAY = (52, 73, 94) # Wall
+PURPLE = (155, 89, 182)  # Dynamic Obstacle
+ORANGE = (243, 156, 18)  # Frontier
+LIGHT_BLUE = (174, 214, 241) # Explored
+YELLOW = (241, 196, 15)  # Planned Path
+CYAN = (0, 206, 209)     # Traced Path (The trail left behind)
+AGENT_COLORS = [(192, 57, 43), (142, 68, 173), (22, 160, 133)]  # Multi-agent mode, one per goal
+GRID_LINE = (220, 220, 220)
+
+# The grid is drawn from one palette index per cell. Codes are ordered by how much
+# they matter when zoomed out: a pixel covering several cells shows the highest code.
+C_EMPTY, C_EXPLORED, C_FRONTIER, C_WALL, C_DYNAMIC, C_TRACE, C_PATH = range(7)
+C_AGENT = 7  # + goal index
+C_START, C_TARGET, C_CURRENT = range(C_AGENT + len(AGENT_COLORS), C_AGENT + len(AGENT_COLORS) + 3)
+PALETTE = [(252, 252, 252), LIGHT_BLUE, ORANGE, DARK_GRAY, PURPLE, CYAN, YELLOW] + AGENT_COLORS + [GREEN, BLUE, RED]
+WALL_CODES = bytes([C_EMPTY] + [C_WALL] * 255)  # Wall byte (nonzero = blocked) -> code
+
+# Button Styling
+BTN_COLOR = (52, 73, 94)
+BTN_HOVER = (44, 62, 80)
+BTN_ACTIVE = (39, 174, 96) # Green for active mode
+TXT_COLOR = (236, 240, 241)
+
+pygame = None  # Imported by load_pygame() when the GUI starts; cli.py never needs it
+
+
+def load_pygame():
+    global pygame
+    if pygame is None:
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+        import pygame
+    return pygame
+
+
+def load_fonts():
+    """pygame Fonts for FONTS. Each family is matched to a font file once per
+    machine; missing families fall back to pygame's default font, like SysFont."""
+    try:
+        with open(FONT_CACHE) as f: files = json.load(f)
+    except (OSError, ValueError):
+        files = {}
+    resolved = False
+    fonts = {}
+    for key, (family, size, bold) in FONTS.items():
+        spec = f"{family}:{'bold' if bold else 'regular'}"
+        path, fake_bold = files.get(spec, (None, False))
+        if spec not in files or (path and not os.path.exists(path)):
+            path = pygame.font.match_font(family, bold=bold)
+            # No bold face installed: match_font returns the regular file, which is emboldened
+            fake_bold = bold and path is not None and path == pygame.font.match_font(family)
+            files[spec] = (path, fake_bold)
+            resolved = True
+        font = pygame.font.Font(path, size)
+        if fake_bold or (bold and path is None): font.set_bold(True)
+        fonts[key] = font
+    if resolved:
+        try:
+            os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+            with open(FONT_CACHE, 'w') as f: json.dump(files, f)
+        except OSError:
+            pass  # Read-only home: resolve again next time
+    return fonts
+
+
+class Button:
+    def __init__(self, x, y, w, h, text, action_code):
+        self.rect = pygame.Rect(x, y, w, h)
+        self.text = text
+        self.action_code = action_code
+        self.is_hovered = False
+        self._label = None # (text, surface) cache so the label is rendered once
+
+    def draw(self, screen, font, is_active=False):
+        if is_active:
+            color = BTN_ACTIVE
+        else:
+            color = BTN_HOVER if self.is_hovered else BTN_COLOR
+            
+        # Shadow
+        pygame.draw.rect(screen, (149, 165, 166), (self.rect.x+3, self.rect.y+3, self.rect.w, self.rect.h), border_radius=6)
+        # Button Body
+        pygame.draw.rect(screen, color, self.rect, border_radius=6)
+        # Border
+        pygame.draw.rect(screen, (44, 62, 80), self.rect, 2, border_radius=6)
+        
+        if self._label is None or self._label[0] != self.text:
+            self._label = (self.text, font.render(self.text, True, TXT_COLOR))
+        text_surf = self._label[1]
+        text_rect = text_surf.get_rect(center=self.rect.center)
+        screen.blit(text_surf, text_rect)
+
+    def check_click(self, pos):
+        return self.rect.collidepoint(pos)
+
+class PathfinderApp:
+    def __init__(self, record_dir=None, stats_file=None, profile=False, grid_size=GRID_SIZE,
+                 obstacles=DEFAULT_PROFILE, obstacle_seed=None):
+        load_pygame().init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(WINDOW_TITLE)
+        
+        # Fonts
+        fonts = load_fonts()
+        self.header_font = fonts['header']
+        self.btn_font = fonts['btn']
+        self.stats_font = fonts['stats']
+        self.label_font = fonts['label']
+
+        # Pre-rendered glyphs and static panel text
+        self.glyphs = {
+            'S': self.label_font.render("S", True, WHITE),
+            'T': self.label_font.render("T", True, WHITE),
+        }
+        self.title_surf = self.header_font.render("Control Menu", True, (44, 62, 80))
+        self.inst_surf = self.stats_font.render("Click: Place | 'J' Stats | 'K' Scen | 'M' Agents | 'O' Obst.", True, (100, 100, 100))
+        self.palette = np.array(PALETTE, dtype=np.uint8) if np is not None else None
+        self.view_rect = pygame.Rect(0, 0, GRID_PIXEL_SIZE, SCREEN_HEIGHT)
+
+        self.start = (2, 2)
+        self.target = (grid_size - 3, grid_size - 3)
+        self.current_pos = self.start
+        
+        # State Variables
+        self.status_msg = "Ready"
+        self.nodes_visited = 0
+        self.path_len = 0
+        self.is_dragging = False 
+        self.speed_index = 0
+        self.speed_label, self.events_per_sec = SPEEDS[0]
+        
+        # The running activity (search animation, then agent movement) is a generator
+        # stepped once per frame by run(); it yields the seconds to wait before the next step
+        self.task = None
+        self.task_wake = 0.0
+        
+        # Trace recording (one file per search in record_dir) and replay
+        self.record_dir = record_dir
+        self.recorder = None
+        self.runs_recorded = 0
+        self.replay = None
+        
+        # Finished searches as (path, nodes visited); a repeated query on an unchanged map skips the search
+        self.cache = SearchCache(CACHE_BUDGET)
+        
+        # Instrumentation of the running / last search (shown in the panel, 'J' exports it)
+        self.stats = SearchStats(hooks=[ProfileHook(), TracemallocHook()] if profile else ())
+        self.stats_file = stats_file or "search_stats.jsonl"
+        self.stats_on_panel = False
+
+        # Dynamic obstacles: every run restarts the environment's obstacle timeline from
+        # the same seed, so each algorithm meets the same obstacles at the same ticks.
+        # The timeline logs its spawns as [tick, r, c] and 'K' saves them as a scenario;
+        # a loaded scenario with a schedule replays that instead of the seeded timeline.
+        self.obstacle_profile = obstacles
+        self.obstacle_seed = random.randrange(2 ** 31) if obstacle_seed is None else obstacle_seed
+        self.spawn_schedule = None  # [[tick, r, c], ...] from a loaded scenario
+        self.walk_changes = []      # Cells flipped (spawns, edits, clears) since the walk's planner last looked
+
+        # Multi-agent mode: the simulation and the drawn agents (cell -> goal index)
+        self.sim = None
+        self.agent_cells = {}
+        self.agent_goals = []
+        self.agent_rng = random.Random()
+        
+        self.current_mode = 'WALL' 
+        
+        # Rendering: cells in `dirty` get their palette code recomputed each frame, and the
+        # viewport is redrawn from the codes only when a code or the view changed
+        self.frontier_set, self.explored_set, self.path_set, self.traced_set = set(), set(), set(), set()
+        self.dirty = set()
+        self.full_redraw = True
+        self.drawn_markers = ()  # (start, target, current_pos) as of the last frame
+        self.panel_state = None  # Signature of the side panel as of the last frame
+        self.drawn_view = None   # (zoom, top row, left column) as of the last frame
+        self.pan_from = None     # Mouse position while a pan drag is in progress
+        
+        self.setup_ui()
+        self.set_env(GridEnvironment(grid_size))
+        if grid_size >= 16: self.env.add_static_wall(5, 5, 10)
+
+    def set_env(self, env):
+        """Switches to `env` (any size): new engine and codes, markers kept on the grid, view fitted"""
+        self.env = env
+        self.size = size = env.size
+        env.obstacles.listeners.append(self.mark_dirty)
+        self.algo = SearchAlgorithms(size)
+        self.codes = bytearray(size * size)  # Palette code per cell (see cell_code)
+        self.cache.clear()  # Versions restart with the new environment
+        clamp = lambda cell: (max(0, min(cell[0], size - 1)), max(0, min(cell[1], size - 1)))
+        self.start, self.target, self.current_pos = clamp(self.start), clamp(self.target), clamp(self.current_pos)
+        self.fit_view()
+        self.full_redraw = True
+
+    def setup_ui(self):
+        btn_w, btn_h = 260, 35
+        btn_gap = 10
+        start_y = 55
+        center_x = GRID_PIXEL_SIZE + (PANEL_WIDTH - btn_w) // 2
+        
+        algo_h, algo_gap = 26, 5  # Algorithm rows are slimmer so all eight fit
+        labels = ["1. Breadth-First (BFS)", "2. Depth-First (DFS)", "3. Uniform-Cost (UCS)",
+                  "4. Depth-Limited (DLS)", "5. Iterative Deep (IDDFS)", "6. Bidirectional",
+                  "7. Jump Point (JPS)", "8. A* Search"]
+        self.buttons = [
+            Button(center_x, start_y + (algo_h+algo_gap)*i, btn_w, algo_h, label, i + 1)
+            for i, label in enumerate(labels)
+        ]
+        
+        # Placement Mode Buttons
+        mode_y = start_y + (algo_h+algo_gap)*len(labels) + 9
+        half_w = (btn_w - 10) // 2
+        self.btn_set_start = Button(center_x, mode_y, half_w, btn_h, "Set Start (S)", 'SET_S')
+        self.btn_set_target = Button(center_x + half_w + 10, mode_y, half_w, btn_h, "Set Target (T)", 'SET_T')
+        self.buttons.append(self.btn_set_start)
+        self.buttons.append(self.btn_set_target)
+
+        # Control Buttons
+        ctrl_y = mode_y + btn_h + 15
+        self.buttons.append(Button(center_x, ctrl_y, half_w, btn_h, "Reset Map", 'R'))
+        self.buttons.append(Button(center_x + half_w + 10, ctrl_y, half_w, btn_h, "Clear Dyn", 'C'))
+        
+        # Speed Button
+        self.speed_btn = Button(center_x, ctrl_y + btn_h + 10, btn_w, btn_h, f"Speed: {self.speed_label}", 'S')
+        self.buttons.append(self.speed_btn)
+
+    def mark_dirty(self, cells):
+        self.dirty.update(cells)
+
+    def set_layer(self, name, cells):
+        """Replaces one of the overlay sets, marking only the cells that changed"""
+        cells = set(cells)
+        self.dirty.update(cells ^ getattr(self, name))
+        setattr(self, name, cells)
+
+    def clear_layers(self):
+        for name in ('frontier_set', 'explored_set', 'path_set', 'traced_set'):
+            self.set_layer(name, ())
+
+    def cell_code(self, r, c):
+        """Palette code of one cell. Drawing priority: Markers > Agents > Wall >
+        Dyn Obstacle > Trace > Path > Explored > Frontier"""
+        cell = (r, c)
+        if cell == self.current_pos: return C_CURRENT
+        if cell == self.target: return C_TARGET
+        if cell == self.start: return C_START
+        agent = self.agent_cells.get(cell)
+        if agent is not None: return C_AGENT + agent
+        if self.env.grid[r][c] == -1:
+            return C_DYNAMIC if cell in self.env.dynamic_obstacles else C_WALL
+        if cell in self.traced_set: return C_TRACE
+        if cell in self.path_set: return C_PATH
+        if cell in self.explored_set: return C_EXPLORED
+        if cell in self.frontier_set: return C_FRONTIER
+        return C_EMPTY
+
+    def rebuild_codes(self):
+        """Recomputes every code: walls a row at a time, then only the cells on a layer"""
+        size, codes = self.size, self.codes
+        for r, row in self.env.wall_rows():
+            codes[r * size:(r + 1) * size] = bytes(row).translate(WALL_CODES)
+        for r, c in self.env.dynamic_obstacles:
+            codes[r * size + c] = C_DYNAMIC
+        for cells, code in ((self.frontier_set, C_FRONTIER), (self.explored_set, C_EXPLORED),
+                            (self.path_set, C_PATH), (self.traced_set, C_TRACE)):
+            for r, c in cells:
+                if codes[r * size + c] < C_WALL: codes[r * size + c] = code
+        for (r, c), goal in self.agent_cells.items():
+            codes[r * size + c] = C_AGENT + goal
+        for (r, c), code in ((self.start, C_START), (self.target, C_TARGET), (self.current_pos, C_CURRENT)):
+            codes[r * size + c] = code
+
+    # --- Viewport (zoom in pixels per cell; view_r / view_c = grid position of the top-left corner) ---
+    def fit_view(self):
+        self.zoom = GRID_PIXEL_SIZE / self.size
+        self.view_r = self.view_c = 0.0
+
+    def clamp_view(self):
+        self.zoom = min(max(self.zoom, GRID_PIXEL_SIZE / self.size), MAX_ZOOM)
+        span = self.size - GRID_PIXEL_SIZE / self.zoom  # Cells that do not fit on screen
+        self.view_r = min(max(self.view_r, 0.0), max(span, 0.0))
+        self.view_c = min(max(self.view_c, 0.0), max(span, 0.0))
+
+    def zoom_at(self, mx, my, factor):
+        """Zooms by `factor`, keeping the grid point under the mouse in place"""
+        r, c = self.view_r + my / self.zoom, self.view_c + mx / self.zoom
+        self.zoom *= factor
+        self.clamp_view()
+        self.view_r, self.view_c = r - my / self.zoom, c - mx / self.zoom
+        self.clamp_view()
+
+    def pan(self, dx, dy):
+        self.view_r -= dy / self.zoom
+        self.view_c -= dx / self.zoom
+        self.clamp_view()
+
+    def screen_to_cell(self, mx, my):
+        """Grid cell under a viewport pixel, or None off the grid"""
+        r, c = int(self.view_r + my / self.zoom), int(self.view_c + mx / self.zoom)
+        if 0 <= r < self.size and 0 <= c < self.size: return (r, c)
+        return None
+
+    # --- Drawing ---
+    def draw_grid(self):
+        """Draws the visible part of the grid from the codes: a palette lookup into a
+        pixel buffer, one surfarray copy and one scale. Zoomed out below a pixel
+        per cell, each block of cells is reduced to its highest code first."""
+        size, zoom = self.size, self.zoom
+        r0, c0 = int(self.view_r), int(self.view_c)
+        rows = min(size - r0, int(GRID_PIXEL_SIZE / zoom) + 2)
+        cols = min(size - c0, int(GRID_PIXEL_SIZE / zoom) + 2)
+        block = max(1, int(1 / zoom))
+        rows, cols = max(block, rows // block * block), max(block, cols // block * block)
+        codes = np.frombuffer(self.codes, dtype=np.uint8).reshape(size, size)[r0:r0 + rows, c0:c0 + cols]
+        if block > 1:
+            # Max-pool block x block cells: rows first, then columns (strided views, no copies)
+            pooled = codes[::block].copy()
+            for i in range(1, block): np.maximum(pooled, codes[i::block], out=pooled)
+            codes = pooled[:, ::block].copy()
+            for j in range(1, block): np.maximum(codes, pooled[:, j::block], out=codes)
+        pixels = self.palette.take(codes.T, axis=0)  # surfarray is indexed [x, y]
+        surface = pygame.transform.scale(pygame.surfarray.make_surface(pixels),
+                                         (max(1, round(cols * zoom)), max(1, round(rows * zoom))))
+        self.screen.set_clip(self.view_rect)
+        self.screen.fill(WHITE, self.view_rect)
+        self.screen.blit(surface, (round((c0 - self.view_c) * zoom), round((r0 - self.view_r) * zoom)))
+        self.draw_overlay(r0, c0, rows, cols)
+        self.screen.set_clip(None)
+
+    def draw_grid_cells(self, cells):
+        """Without NumPy: one rect per visible cell in `cells` (None = the whole view)"""
+        zoom = self.zoom
+        if cells is None:
+            r0, c0 = int(self.view_r), int(self.view_c)
+            span = int(GRID_PIXEL_SIZE / zoom) + 2
+            cells = [(r, c) for r in range(r0, min(self.size, r0 + span)) for c in range(c0, min(self.size, c0 + span))]
+            self.screen.fill(WHITE, self.view_rect)
+        self.screen.set_clip(self.view_rect)
+        size, codes, width = self.size, self.codes, max(1, round(zoom))
+        for r, c in cells:
+            rect = pygame.Rect(round((c - self.view_c) * zoom), round((r - self.view_r) * zoom), width, width)
+            if self.view_rect.colliderect(rect):
+                pygame.draw.rect(self.screen, PALETTE[codes[r * size + c]], rect)
+                if zoom >= GRID_LINE_ZOOM: pygame.draw.rect(self.screen, GRID_LINE, rect, 1)
+        if zoom >= GLYPH_ZOOM: self.draw_glyphs()
+        self.screen.set_clip(None)
+
+    def draw_overlay(self, r0, c0, rows, cols):
+        """Cell borders and S / T labels once the cells are big enough"""
+        zoom = self.zoom
+        if zoom >= GRID_LINE_ZOOM:
+            top, left = (r0 - self.view_r) * zoom, (c0 - self.view_c) * zoom
+            bottom, right = top + rows * zoom, left + cols * zoom
+            for i in range(rows + 1):
+                y = round(top + i * zoom)
+                pygame.draw.line(self.screen, GRID_LINE, (left, y), (right, y))
+            for j in range(cols + 1):
+                x = round(left + j * zoom)
+                pygame.draw.line(self.screen, GRID_LINE, (x, top), (x, bottom))
+        if zoom >= GLYPH_ZOOM: self.draw_glyphs()
+
+    def draw_glyphs(self):
+        zoom = self.zoom
+        for cell, glyph in ((self.start, 'S'), (self.target, 'T')):
+            center = ((cell[1] - self.view_c + 0.5) * zoom, (cell[0] - self.view_r + 0.5) * zoom)
+            text = self.glyphs[glyph]
+            self.screen.blit(text, text.get_rect(center=center))
+
+    def draw_ui(self):
+        full = self.full_redraw
+        self.full_redraw = False
+        if full:
+            self.screen.fill(WHITE)
+            self.rebuild_codes()
+        else:
+            # Start/Target/Agent moves dirty both the old and the new cell
+            markers = (self.start, self.target, self.current_pos)
+            if markers != self.drawn_markers:
+                self.dirty.update(self.drawn_markers)
+                self.dirty.update(markers)
+        self.drawn_markers = (self.start, self.target, self.current_pos)
+
+        # 1. Update the codes of changed cells, then redraw the view if anything on it changed
+        size, codes = self.size, self.codes
+        dirty = [(r, c) for r, c in self.dirty if 0 <= r < size and 0 <= c < size]
+        self.dirty = set()
+        for r, c in dirty:
+            codes[r * size + c] = self.cell_code(r, c)
+        view = (self.zoom, self.view_r, self.view_c)
+        redraw = full or view != self.drawn_view
+        self.drawn_view = view
+        rects = []
+        if self.palette is not None:
+            if redraw or dirty:
+                self.draw_grid()
+                rects.append(self.view_rect)
+        elif redraw or dirty:
+            self.draw_grid_cells(None if redraw else dirty)
+            rects.append(self.view_rect)
+
+        # 2. Side Panel (only when something on it changed)
+        if self.draw_panel(full):
+            rects.append(pygame.Rect(GRID_PIXEL_SIZE, 0, PANEL_WIDTH, SCREEN_HEIGHT))
+
+        if full:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+    def draw_panel(self, force=False):
+        mouse_pos = pygame.mouse.get_pos()
+        hovered = tuple(btn.rect.collidepoint(mouse_pos) for btn in self.buttons)
+        stats_lines = self.stats.summary_lines() if self.stats_on_panel else []
+        state = (self.status_msg, self.nodes_visited, self.path_len, self.current_mode,
+                 self.speed_btn.text, hovered, tuple(stats_lines))
+        if not force and state == self.panel_state:
+            return False
+        self.panel_state = state
+
+        panel_rect = pygame.Rect(GRID_PIXEL_SIZE, 0, PANEL_WIDTH, SCREEN_HEIGHT)
+        pygame.draw.rect(self.screen, LIGHT_GRAY, panel_rect)
+        pygame.draw.line(self.screen, (189, 195, 199), (GRID_PIXEL_SIZE, 0), (GRID_PIXEL_SIZE, SCREEN_HEIGHT), 2)
+        
+        self.screen.blit(self.title_surf, (GRID_PIXEL_SIZE + 80, 15))
+        
+        # Draw Buttons
+        for btn, is_hovered in zip(self.buttons, hovered):
+            btn.is_hovered = is_hovered
+            is_active = False
+            if btn.action_code == 'SET_S' and self.current_mode == 'START': is_active = True
+            if btn.action_code == 'SET_T' and self.current_mode == 'TARGET': is_active = True
+            
+            btn.draw(self.screen, self.btn_font, is_active)
+            
+        # Status Box
+        box_x = GRID_PIXEL_SIZE + 15
+        box_y = 468
+        box_w = PANEL_WIDTH - 30
+        box_h = 108
+        pygame.draw.rect(self.screen, (200, 200, 200), (box_x+2, box_y+2, box_w, box_h), border_radius=10)
+        pygame.draw.rect(self.screen, WHITE, (box_x, box_y, box_w, box_h), border_radius=10)
+        pygame.draw.rect(self.screen, (180, 180, 180), (box_x, box_y, box_w, box_h), 1, border_radius=10)
+        
+        stats = [
+            f"Status: {self.status_msg}",
+            f"Nodes Visited: {self.nodes_visited}",
+            f"Path Length:  {self.path_len}"
+        ] + stats_lines
+        for i, line in enumerate(stats):
+            text = self.stats_font.render(line, True, (50, 50, 50) if i < 3 else (110, 110, 110)) 
+            self.screen.blit(text, (box_x + 15, box_y + 8 + i*16))
+
+        # Mode Indicator
+        mode_text = f"Current Mode: {self.current_mode} Placement"
+        if self.current_mode == 'WALL': mode_text = "Current Mode: Draw Walls"
+        m_surf = self.stats_font.render(mode_text, True, (100, 100, 100))
+        self.screen.blit(m_surf, (GRID_PIXEL_SIZE + 30, box_y - 20))
+
+        inst_rect = self.inst_surf.get_rect(center=(GRID_PIXEL_SIZE + PANEL_WIDTH//2, SCREEN_HEIGHT - 15))
+        self.screen.blit(self.inst_surf, inst_rect)
+        return True
+
+    def handle_grid_click(self, r, c):
+        if self.current_mode == 'START':
+            if (r, c) != self.target and self.env.grid[r][c] != -1:
+                self.start = (r, c)
+                self.current_pos = (r, c)
+                self.status_msg = "Start Position Set"
+        elif self.current_mode == 'TARGET':
+            if (r, c) != self.start and self.env.grid[r][c] != -1:
+                self.target = (r, c)
+                self.status_msg = "Target Position Set"
+        elif self.current_mode == 'WALL':
+            if (r, c) != self.start and (r, c) != self.target:
+                changed = self.env.toggle_obstacle(r, c)
+                if changed:
+                    self.dirty.add(changed)
+                    self.walk_changes.append(changed)
+                if changed and self.sim:
+                    if self.env.grid[r][c] == -1: self.sim.block(changed)
+                    else: self.sim.sync_walls()
+
+    def apply_event(self, kind, data):
+        """Applies one search delta event to the overlay layers"""
+        if kind == PUSH:
+            self.nodes_visited += 1
+            self.frontier_set.add(data)
+            self.dirty.add(data)
+        elif kind == POP:
+            self.frontier_set.discard(data)
+            self.dirty.add(data)
+        elif kind == EXPAND:
+            self.explored_set.add(data)
+            self.dirty.add(data)
+        elif kind == RESET:
+            self.set_layer('frontier_set', ())
+            self.set_layer('explored_set', ())
+            self.status_msg = f"Searching... (depth {data})"
+
+    def search_task(self, events, cache_key=None):
+        """Feeds search events to the layers at `events_per_sec`, batching per frame"""
+        budget = 0.0
+        while True:
+            for spawned in self.advance_obstacles(1 / (FPS * AGENT_STEP_S)):
+                if self.recorder: self.recorder.record_spawn(spawned)
+            budget += self.events_per_sec / FPS
+            for _ in range(int(budget)):
+                kind, data = next(events)
+                budget -= 1
+                if kind == DONE:
+                    if cache_key: self.cache.put(cache_key, (data, self.nodes_visited))
+                    if data:
+                        yield from self.move_agent(data)
+                    else:
+                        self.status_msg = "No Path Found!"
+                    return
+                self.apply_event(kind, data)
+            yield 0
+
+    def export_stats(self):
+        """Appends the last search's stats to the stats file as one JSON line"""
+        if self.stats.algorithm is None: return
+        self.stats.to_json(self.stats_file)
+        self.status_msg = f"Stats -> {os.path.basename(self.stats_file)}"
+
+    def cached_task(self, path):
+        """Replays a cached result: no search animation, straight to the agent walk"""
+        if path:
+            self.status_msg = "Cached Path!"
+            yield 0.25
+            yield from self.move_agent(path)
+        else:
+            self.status_msg = "No Path Found! (cached)"
+
+    def cancel_task(self):
+        if self.task is not None:
+            self.task = None
+            self.status_msg = "Cancelled"
+
+    def step_task(self):
+        if self.task is None or time.perf_counter() < self.task_wake: return
+        try:
+            delay = next(self.task)
+        except StopIteration:
+            self.task = None
+            return
+        self.task_wake = time.perf_counter() + delay
+
+    def show_path(self, path):
+        self.set_layer('path_set', path)
+        self.path_len = len(path)
+
+    def trace(self, cell):
+        self.traced_set.add(cell)
+        self.dirty.add(cell)
+
+    def move_agent(self, path):
+        """Generator: walks the agent along `path`, yielding the delay before each step"""
+        if not path: return
+        self.show_path(path)
+        self.status_msg = "Path Found! Tracing..."
+        
+        # Pause to show full yellow path
+        yield 0.5
+        
+        # Start Tracing
+        self.status_msg = "Moving Agent..."
+        self.set_layer('traced_set', ()) # Start a fresh trace
+        planner = None # D* Lite replanner, created on the first block and reused after
+        self.walk_changes = []
+        
+        i = 1
+        while i < len(path):
+            next_node = path[i]
+            
+            # Dynamic Re-planning Check (repairs the previous search instead of restarting)
+            if self.env.grid[next_node[0]][next_node[1]] == -1:
+                self.status_msg = "BLOCKED! Re-planning..."
+                yield 0.5
+                grid = self.env.grid
+                if planner is None:
+                    planner = IncrementalPlanner(self.size)
+                    path = planner.plan(self.current_pos, self.target, grid)
+                else:
+                    planner.move_to(self.current_pos)
+                    path = planner.update(self.walk_changes, grid)
+                    if path and len(path) > 1 and grid[path[1][0]][path[1][1]] == -1:
+                        # A change the planner was never told about: diff its walls with the grid
+                        path = planner.update(planner.stale_cells(grid), grid)
+                self.walk_changes = []
+                self.nodes_visited = planner.expanded
+                if not path:
+                    self.status_msg = "No Path Found!"
+                    return
+                self.show_path(path)
+                self.status_msg = "Moving Agent..."
+                i = 1
+                continue
+            
+            # Update Position and Trace
+            self.trace(self.current_pos) # Mark previous spot as traced
+            self.current_pos = next_node
+            self.trace(self.current_pos) # Mark current spot as traced
+            i += 1
+            
+            yield AGENT_STEP_S
+            
+            self.walk_changes.extend(self.advance_obstacles(1))
+        
+        self.status_msg = "Target Reached!"
+
+    # --- Multi-agent mode ---
+    def start_agents(self):
+        """'M': many agents walking to shared goals with reserved space-time paths"""
+        self.task = None
+        self.replay = None
+        self.clear_layers()
+        self.sim = MultiAgentSim(self.env)
+        self.restart_obstacles()
+        open_cells = [(r, c) for r in range(self.size) for c in range(self.size)
+                      if self.env.grid[r][c] != -1 and (r, c) != self.target]
+        self.agent_goals = [self.target] + self.agent_rng.sample(open_cells, min(AGENT_GOALS - 1, len(open_cells)))
+        self.task = self.agents_task()
+        self.task_wake = 0.0
+
+    def stop_agents(self):
+        if self.sim is None: return
+        self.sim = None
+        self.set_agents({})
+        self.set_layer('path_set', ())
+
+    def set_agents(self, cells):
+        """Replaces the drawn agents, marking only the cells whose sprite changed"""
+        old = self.agent_cells
+        self.dirty.update(cell for cell in old.keys() | cells.keys() if old.get(cell) != cells.get(cell))
+        self.agent_cells = cells
+
+    def add_agents(self):
+        """Tops the population up to AGENT_COUNT on random free cells"""
+        sim, rng, goals = self.sim, self.agent_rng, self.agent_goals
+        for _ in range(4 * AGENT_COUNT):
+            if len(sim.agents) >= AGENT_COUNT: break
+            cell = (rng.randrange(self.size), rng.randrange(self.size))
+            if cell not in goals: sim.add_agent(cell, goals[sim.next_id % len(goals)])
+
+    def agents_task(self):
+        sim = self.sim
+        goal_index = {sim.engine.node_id(goal): i for i, goal in enumerate(self.agent_goals)}
+        self.set_layer('path_set', self.agent_goals)
+        while self.sim is sim:
+            self.add_agents()
+            sim.spawn_obstacles()
+            sim.step()
+            self.set_agents({divmod(a.pos, self.size): goal_index[a.target] for a in sim.agents.values()})
+            m = sim.metrics()
+            self.status_msg = f"{m['agents']} agents, {m['agent_steps_per_s'] or 0:.0f} steps/s"
+            yield EVENTS_PER_TICK / self.events_per_sec
+
+    # --- Dynamic obstacles and scenarios ---
+    def clear_dynamic(self):
+        """'Clear Dyn': reopens every dynamic obstacle, telling the walk's planner and the agents"""
+        cleared = list(self.env.dynamic_obstacles)
+        self.mark_dirty(cleared)
+        self.walk_changes.extend(cleared)
+        self.env.clean_dynamic()
+        if self.sim: self.sim.sync_walls()
+
+    def restart_obstacles(self):
+        """Rewinds the obstacle timeline to tick 0 (a new run: same seed, same events).
+        The last run's obstacles go first: events only land on open cells."""
+        self.clear_dynamic()
+        self.env.obstacles.reset(self.obstacle_seed, self.obstacle_profile)
+        if self.spawn_schedule: self.env.obstacles.replay(self.spawn_schedule)
+
+    def advance_obstacles(self, ticks):
+        """Advances the obstacle clock; nothing spawns on the start, the target or the agent.
+        Returns the new obstacles (the renderer gets them as a listener)."""
+        safe = (self.start, self.target, self.current_pos)
+        return self.env.obstacles.advance(ticks, safe.__contains__)
+
+    def cycle_obstacles(self):
+        """'O': next obstacle profile, from the next run on"""
+        index = OBSTACLE_PROFILES.index(self.obstacle_profile) if self.obstacle_profile in OBSTACLE_PROFILES else -1
+        self.obstacle_profile = OBSTACLE_PROFILES[(index + 1) % len(OBSTACLE_PROFILES)]
+        self.status_msg = f"Obstacles: {self.obstacle_profile}"
+
+    def load_map(self, filename):
+        self.task = None
+        self.replay = None
+        self.stop_agents()
+        with MapFile(filename) as m: size = m.size
+        if size == self.size: self.env.load_map(filename)
+        else: self.set_env(GridEnvironment.from_file(filename))
+        self.clear_layers()
+        self.full_redraw = True
+        self.status_msg = f"Loaded {os.path.basename(filename)}"
+
+    def load_scenario(self, filename, index=0):
+        """Loads scenario `index` of a JSON-lines or .scen file: its map, start, target and spawns"""
+        sc = load_scenarios(filename)[index]
+        if sc['map'].get('kind') == 'file': self.load_map(sc['map']['path'])
+        self.start, self.target = tuple(sc['start']), tuple(sc['target'])
+        self.current_pos = self.start
+        if sc.get('seed') is not None: self.obstacle_seed = sc['seed']
+        if sc.get('obstacles') is not None: self.obstacle_profile = sc['obstacles']
+        self.spawn_schedule = sc.get('schedule') or None
+        self.full_redraw = True
+
+    def save_scenario(self, map_file="scenario.map", scenario_file="scenarios.jsonl"):
+        """Saves the static map and appends the last run (start, target, spawn seed and schedule)"""
+        self.env.save_map(map_file, dynamic=False)
+        sc = scenario(map_file, self.start, self.target, self.obstacle_seed, self.env.obstacles.log,
+                      id=f"run-{int(time.time())}", obstacles=self.obstacle_profile)
+        save_scenarios(scenario_file, load_scenarios(scenario_file) + [sc] if os.path.exists(scenario_file) else [sc])
+        self.status_msg = f"Scenario saved to {scenario_file}"
+
+    def run_algo(self, code):
+        """Starts a search as the current task (replacing any running one)"""
+        self.last_algo_code = code
+        self.stop_agents()
+        self.nodes_visited = 0
+        self.restart_obstacles()
+        self.clear_layers() # Also resets the trace on a new run
+        self.status_msg = "Searching..."
+        
+        if self.current_pos == self.target: self.current_pos = self.start
+            
+        methods = {
+            1: ('bfs', ()),
+            2: ('dfs', ()),
+            3: ('ucs', ()),
+            4: ('dls', (20,)),
+            5: ('iddfs', (30,)),
+            6: ('bidirectional_search', ()),
+            7: ('jps', ()),
+            8: ('astar', ()),
+        }
+        
+        if code in methods:
+            name, args = methods[code]
+            self.replay = None
+            self.stats_on_panel = False
+            # The search snapshots the grid, so its result belongs to the version it started on
+            key = (self.env.version, name, self.current_pos, self.target)
+            cached = self.cache.get(key)
+            if cached is not None:
+                path, self.nodes_visited = cached
+                self.task = self.cached_task(path)
+                self.task_wake = 0.0
+                return
+            self.algo.set_costs(self.env.straight_cost, self.env.diagonal_cost, self.env.terrain_buffer())
+            events = self.algo.steps(name, self.current_pos, self.target, self.env.grid, *args)
+            # Innermost, so recording and drawing count as callback time, not search time
+            events = self.stats.wrap(events, name)
+            self.stats_on_panel = True
+            if self.record_dir:
+                if self.recorder: self.recorder.close() # Previous run was cancelled
+                self.runs_recorded += 1
+                filename = os.path.join(self.record_dir, f"run-{self.runs_recorded:03d}-{name}.svt")
+                self.recorder = TraceRecorder(filename, self.size, self.current_pos, self.target, self.env.grid)
+                events = self.recorder.wrap(events)
+            self.task = self.search_task(events, key)
+            self.task_wake = 0.0
+
+    # --- Trace replay ---
+    def load_replay(self, filename):
+        reader = TraceReader(filename)
+        self.task = None
+        self.stop_agents()
+        if reader.size != self.size: self.set_env(GridEnvironment(reader.size))
+        self.env.reset_grid()
+        for node, blocked in enumerate(reader.walls):
+            if blocked: self.env.toggle_obstacle(*divmod(node, self.size))
+        self.start, self.target = reader.start, reader.target
+        self.current_pos = self.start
+        self.clear_layers()
+        self.nodes_visited, self.path_len = 0, 0
+        self.replay = TraceReplay(reader)
+        self.full_redraw = True
+        self.replay_sync(None)
+
+    def replay_sync(self, changed):
+        """Copies replay counters for `changed` node ids (None = all) into the layers"""
+        replay = self.replay
+        walls = replay.reader.walls
+        nodes = range(self.size * self.size) if changed is None else changed
+        for node in nodes:
+            cell = divmod(node, self.size)
+            if replay.frontier[node] > 0: self.frontier_set.add(cell)
+            else: self.frontier_set.discard(cell)
+            if replay.explored[node] > 0: self.explored_set.add(cell)
+            else: self.explored_set.discard(cell)
+            if not walls[node]:
+                if replay.dynamic[node] > 0:
+                    self.env.grid[cell[0]][cell[1]] = -1
+                    self.env.dynamic_obstacles.add(cell)
+                else:
+                    self.env.grid[cell[0]][cell[1]] = 0
+                    self.env.dynamic_obstacles.discard(cell)
+            self.dirty.add(cell)
+        self.env.mark_changed()
+        
+        path = replay.reader.path if replay.finished else None
+        self.set_layer('path_set', path or ())
+        self.path_len = len(path) if path else 0
+        depth = f" d={replay.depth}" if replay.depth is not None else ""
+        self.status_msg = f"Replay {replay.pos}/{len(replay.reader)}{depth}"
+
+    def replay_move(self, delta=None, to=None):
+        if self.replay is None: return
+        changed = self.replay.step(delta) if to is None else self.replay.seek(to)
+        self.replay_sync(changed)
+
+    def replay_task(self):
+        """Auto-plays the replay forward at the current speed"""
+        budget = 0.0
+        while not self.replay.finished:
+            budget += self.events_per_sec / FPS
+            self.replay_move(int(budget))
+            budget -= int(budget)
+            yield 0
+
+    def handle_replay_key(self, event):
+        count = len(self.replay.reader)
+        step = 100 if event.mod & pygame.KMOD_SHIFT else 1
+        if event.key == pygame.K_RIGHT: self.replay_move(step)
+        elif event.key == pygame.K_LEFT: self.replay_move(-step)
+        elif event.key == pygame.K_PAGEDOWN: self.replay_move(to=self.replay.pos + count // 10)
+        elif event.key == pygame.K_PAGEUP: self.replay_move(to=self.replay.pos - count // 10)
+        elif event.key == pygame.K_HOME: self.replay_move(to=0)
+        elif event.key == pygame.K_END: self.replay_move(to=count)
+        elif event.key == pygame.K_SPACE:
+            self.task = None if self.task else self.replay_task()
+            self.task_wake = 0.0
+
+    def toggle_speed(self):
+        self.speed_index = (self.speed_index + 1) % len(SPEEDS)
+        self.speed_label, self.events_per_sec = SPEEDS[self.speed_index]
+        self.speed_btn.text = f"Speed: {self.speed_label}"
+
+    def run(self):
+        running = True
+        clock = pygame.time.Clock()
+        
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: running = False
+                
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    self.cancel_task()
+                elif event.type == pygame.KEYDOWN and self.replay:
+                    self.handle_replay_key(event)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_j:
+                    self.export_stats()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_k:
+                    self.save_scenario()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                    if self.sim: self.stop_agents()
+                    else: self.start_agents()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                    self.fit_view()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_o:
+                    self.cycle_obstacles()
+                
+                if event.type == pygame.MOUSEWHEEL:
+                    mx, my = pygame.mouse.get_pos()
+                    if mx < GRID_PIXEL_SIZE: self.zoom_at(mx, my, ZOOM_STEP ** event.y)
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+                    if event.pos[0] < GRID_PIXEL_SIZE: self.pan_from = event.pos
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    mx, my = event.pos
+                    if mx < GRID_PIXEL_SIZE: 
+                        self.is_dragging = True
+                        cell = self.screen_to_cell(mx, my)
+                        if cell: self.handle_grid_click(*cell)
+                    else: 
+                        for btn in self.buttons:
+                            if btn.check_click((mx, my)):
+                                if isinstance(btn.action_code, int): self.run_algo(btn.action_code)
+                                elif btn.action_code == 'R': 
+                                    self.task = None
+                                    self.replay = None
+                                    self.stop_agents()
+                                    self.env.reset_grid()
+                                    self.obstacle_seed = random.randrange(2 ** 31)  # New map, new timeline
+                                    self.spawn_schedule = None
+                                    self.current_pos = self.start
+                                    self.clear_layers()
+                                    self.full_redraw = True
+                                    self.status_msg = "Map Reset"
+                                    self.nodes_visited, self.path_len = 0, 0
+                                elif btn.action_code == 'C': self.clear_dynamic()
+                                elif btn.action_code == 'S': self.toggle_speed()
+                                # NEW: Deselect logic added below
+                                elif btn.action_code == 'SET_S': 
+                                    # If already in START mode, deselect to WALL mode. Otherwise, switch to START mode.
+                                    self.current_mode = 'WALL' if self.current_mode == 'START' else 'START'
+                                elif btn.action_code == 'SET_T': 
+                                    # If already in TARGET mode, deselect to WALL mode. Otherwise, switch to TARGET mode.
+                                    self.current_mode = 'WALL' if self.current_mode == 'TARGET' else 'TARGET'
+
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    if event.button == 1: self.is_dragging = False
+                    else: self.pan_from = None
+                
+                elif event.type == pygame.MOUSEMOTION and self.pan_from:
+                    self.pan(event.pos[0] - self.pan_from[0], event.pos[1] - self.pan_from[1])
+                    self.pan_from = event.pos
+                elif event.type == pygame.MOUSEMOTION and self.is_dragging:
+                    mx, my = event.pos
+                    if mx < GRID_PIXEL_SIZE:
+                        cell = self.screen_to_cell(mx, my)
+                        if cell: self.handle_grid_click(*cell)
+            
+            self.step_task()
+            self.draw_ui()
+            clock.tick(FPS)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=WINDOW_TITLE)
+    parser.add_argument('--record', metavar='DIR', help="Write a binary trace of every search to DIR")
+    parser.add_argument('--replay', metavar='FILE', help="Open a recorded trace (arrows / PgUp / PgDn / Home / End / Space)")
+    parser.add_argument('--stats', metavar='FILE', help="JSON-lines file the 'J' key appends search stats to")
+    parser.add_argument('--profile', action='store_true', help="Run cProfile and tracemalloc around every search")
+    parser.add_argument('--size', type=int, default=GRID_SIZE, help=f"Grid side (default {GRID_SIZE})")
+    parser.add_argument('--map', metavar='FILE', help="Load a .map or binary map (the grid takes its size)")
+    parser.add_argument('--scenario', metavar='FILE', help="Load the first scenario of a .jsonl / .scen file")
+    parser.add_argument('--obstacles', default=DEFAULT_PROFILE, choices=PROFILES,
+                        help=f"Dynamic-obstacle profile (default {DEFAULT_PROFILE}; 'O' cycles it)")
+    parser.add_argument('--obstacle-seed', type=int, help="Seed of the obstacle timeline (default random)")
+    args = parser.parse_args(argv)
+    if args.record: os.makedirs(args.record, exist_ok=True)
+    
+    app = PathfinderApp(record_dir=args.record, stats_file=args.stats, profile=args.profile, grid_size=args.size,
+                        obstacles=args.obstacles, obstacle_seed=args.obstacle_seed)
+    if args.map: app.load_map(args.map)
+    if args.scenario: app.load_scenario(args.scenario)
+    if args.replay: app.load_replay(args.replay)
+    app.run()
+
+
+if __name__ == "__main__":
+    main()
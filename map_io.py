@@ -0,0 +1,230 @@
+"""Map and scenario files: MovingAI .map / .scen text and a bit-packed binary map.
+
+Text maps (the grid benchmark format):
+
+    type octile
+    height H
+    width W
+    map
+    <H rows of W characters; '.', 'G' and 'S' are passable>
+
+Binary maps (.bmap, little-endian):
+    header   HEADER (magic, version, flags, width, height, bytes per row)
+    walls    `height` rows of `bytes per row`, bit j of a row = column j blocked
+    terrain  width * height weight bytes, present when flags & F_TERRAIN
+
+Both are read through mmap one row at a time, so a map larger than RAM
+can be streamed into a ChunkedGridEnvironment. Maps are loaded into a
+square grid of side max(width, height); the padding is wall.
+
+Scenarios are dicts in the batch manifest shape, plus the seed of the
+dynamic-obstacle timeline and the spawns it produced, by clock tick (see
+obstacles.py):
+
+    {"id": "arena-0", "map": {"kind": "file", "path": "arena.map"},
+     "start": [r, c], "target": [r, c], "seed": 7, "schedule": [[tick, r, c], ...]}
+
+save_scenarios / load_scenarios keep them as JSON lines; read_scen and
+write_scen convert from and to MovingAI .scen files, which have no seed or
+schedule.
+"""
+import json
+import mmap
+import os
+import struct
+
+from ALGORITHM import np  # None without NumPy: rows are then unpacked one at a time
+from search_trace import pack_walls, unpack_walls
+
+MAGIC = b'SVMP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIII')
+F_TERRAIN = 1
+BAND_ROWS = 1024  # Binary rows unpacked per numpy call
+
+PASSABLE = b'.GS'  # MovingAI letters an agent can stand on; everything else is a wall
+
+_TEXT_WALLS = bytearray(b'\x01') * 256  # Map character -> wall byte
+for _ch in PASSABLE: _TEXT_WALLS[_ch] = 0
+_TEXT_CHARS = bytes([ord('.')] + [ord('@')] * 255)  # Wall byte -> map character
+
+
+class MapFile:
+    """Memory-mapped .map or binary map; rows() decodes it row by row"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.close()
+            raise ValueError(f"{path}: empty map file")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.mm[:len(MAGIC)] == MAGIC: self._open_binary()
+            else: self._open_text()
+        except Exception:
+            self.close()
+            raise
+        self.size = max(self.width, self.height)
+
+    def _open_binary(self):
+        magic, version, self.flags, self.width, self.height, self.row_bytes = HEADER.unpack_from(self.mm, 0)
+        if version != VERSION:
+            raise ValueError(f"{self.path}: unsupported map version {version}")
+        self.binary = True
+        self.offset = HEADER.size
+        need = self.offset + self.height * self.row_bytes
+        if self.flags & F_TERRAIN: need += self.width * self.height
+        if len(self.mm) < need:
+            raise ValueError(f"{self.path}: truncated map ({len(self.mm)} of {need} bytes)")
+
+    def _open_text(self):
+        self.binary, self.flags = False, 0
+        fields = {}
+        self.mm.seek(0)
+        while True:
+            line = self.mm.readline()
+            if not line:
+                raise ValueError(f"{self.path}: no 'map' line (not a .map file)")
+            words = line.split()
+            if words == [b'map']: break
+            if len(words) == 2: fields[words[0].decode()] = words[1].decode()
+        try:
+            self.height, self.width = int(fields['height']), int(fields['width'])
+        except (KeyError, ValueError):
+            raise ValueError(f"{self.path}: missing or bad height / width") from None
+        self.offset = self.mm.tell()
+
+    def rows(self):
+        """Yields (r, row) for r in range(size): `size` wall bytes, 1 = blocked"""
+        width, size = self.width, self.size
+        pad = b'\x01' * (size - width)
+        if self.binary and np is not None:
+            rb = self.row_bytes
+            for r0 in range(0, self.height, BAND_ROWS):
+                n = min(BAND_ROWS, self.height - r0)
+                start = self.offset + r0 * rb
+                bits = np.frombuffer(self.mm[start:start + n * rb], dtype=np.uint8).reshape(n, rb)
+                walls = np.unpackbits(bits, axis=1, bitorder='little')[:, :width]
+                for i in range(n):
+                    yield r0 + i, walls[i].tobytes() + pad
+        elif self.binary:
+            for r in range(self.height):
+                start = self.offset + r * self.row_bytes
+                yield r, bytes(unpack_walls(self.mm[start:start + self.row_bytes], width)) + pad
+        else:
+            self.mm.seek(self.offset)
+            for r in range(self.height):
+                line = self.mm.readline().rstrip(b'\r\n')[:width]
+                if len(line) < width:
+                    raise ValueError(f"{self.path}: row {r} has {len(line)} of {width} cells")
+                yield r, line.translate(_TEXT_WALLS) + pad
+        for r in range(self.height, size):
+            yield r, b'\x01' * size
+
+    @property
+    def terrain(self):
+        """size * size terrain weights (padding weighs 1), or None if the file has none"""
+        if not self.flags & F_TERRAIN: return None
+        width, size = self.width, self.size
+        start = self.offset + self.height * self.row_bytes
+        weights = bytearray(b'\x01') * (size * size)
+        for r in range(self.height):
+            weights[r * size:r * size + width] = self.mm[start + r * width:start + (r + 1) * width]
+        return weights
+
+    def close(self):
+        if not self.mm.closed: self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_map(path, size, rows, terrain=None):
+    """Writes (r, wall row) pairs as a .map text file or, for any other
+    extension, a binary map. Terrain only fits in the binary format."""
+    with open(path, 'wb') as f:
+        if path.endswith('.map'):
+            f.write(f"type octile\nheight {size}\nwidth {size}\nmap\n".encode())
+            for _, row in rows:
+                f.write(bytes(row).translate(_TEXT_CHARS) + b'\n')
+            return
+        row_bytes = (size + 7) // 8
+        f.write(HEADER.pack(MAGIC, VERSION, F_TERRAIN if terrain is not None else 0, size, size, row_bytes))
+        for _, row in rows:
+            f.write(pack_walls(row, size))
+        if terrain is not None:
+            f.write(bytes(terrain))
+
+
+# --- Scenarios ---
+def scenario(map_path, start, target, seed=None, schedule=(), **extra):
+    """A scenario dict (see the module docstring)"""
+    sc = {'map': {'kind': 'file', 'path': map_path}, 'start': list(start), 'target': list(target),
+          'seed': seed, 'schedule': [list(entry) for entry in schedule]}
+    sc.update(extra)
+    return sc
+
+
+def save_scenarios(path, scenarios):
+    with open(path, 'w') as f:
+        for sc in scenarios:
+            f.write(json.dumps(sc) + '\n')
+
+
+def load_scenarios(path):
+    """Scenarios from a JSON-lines file or a MovingAI .scen file"""
+    if path.endswith('.scen'): return read_scen(path)
+    scenarios = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line: continue
+            sc = json.loads(line)
+            sc.setdefault('id', str(line_no))
+            sc.setdefault('seed', None)
+            sc.setdefault('schedule', [])
+            scenarios.append(sc)
+    return scenarios
+
+
+def _resolve_map(scen_path, name):
+    """Map paths in .scen files are usually relative to the .scen, sometimes to a map root"""
+    base = os.path.dirname(scen_path)
+    for candidate in (os.path.join(base, name), os.path.join(base, os.path.basename(name))):
+        if os.path.exists(candidate): return candidate
+    return name
+
+
+def read_scen(path):
+    """Parses a MovingAI .scen file (x = column, y = row)"""
+    scenarios = []
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            fields = line.rstrip('\r\n').split('\t') if '\t' in line else line.split()
+            if not fields or fields[0] == 'version': continue
+            if len(fields) < 8:
+                raise ValueError(f"{path}:{line_no}: expected 9 fields, got {len(fields)}")
+            bucket, name = int(fields[0]), fields[1]
+            sx, sy, gx, gy = map(int, fields[4:8])
+            sc = scenario(_resolve_map(path, name), (sy, sx), (gy, gx), id=f"{stem}-{len(scenarios)}",
+                          bucket=bucket)
+            if len(fields) > 8: sc['optimal'] = float(fields[8])
+            scenarios.append(sc)
+    return scenarios
+
+
+def write_scen(path, scenarios, size):
+    """Writes the MovingAI fields of `scenarios` (all on `size` x `size` maps);
+    seed and schedule have no column there and are dropped"""
+    with open(path, 'w') as f:
+        f.write("version 1\n")
+        for sc in scenarios:
+            (sr, sc_), (tr, tc) = sc['start'], sc['target']
+            name = os.path.basename(sc['map']['path'])
+            f.write(f"{sc.get('bucket', 0)}\t{name}\t{size}\t{size}\t{sc_}\t{sr}\t{tc}\t{tr}\t"
+                    f"{sc.get('optimal', 0)}\n")
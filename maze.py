@@ -0,0 +1,174 @@
+"""Seeded, iterative perfect-maze generators.
+
+Rooms sit on even (r, c) cells; the odd cells between two rooms are the
+walls a generator knocks down. Every generator is iterative (no recursion
+limit) and reports the maze as grid rows of bytes, 1 = wall and 0 = open:
+
+    backtracker   randomized DFS with an explicit stack           O(cells)
+    kruskal       random edge order + union-find                  O(cells)
+    wilson        loop-erased random walks (uniform spanning tree) O(cells)
+    eller         one room row at a time                          O(width)
+
+`eller` never holds more than two grid rows, so it can stream a maze
+straight into a ChunkedGrid far larger than RAM:
+
+    for r, row in maze_rows(10000, 'eller', seed=7): ...
+"""
+import random
+from array import array
+
+GENERATORS = ('backtracker', 'kruskal', 'wilson', 'eller')
+
+
+def maze_rows(size, algorithm='backtracker', seed=None):
+    """Yields (r, row) for every grid row, row being `size` bytes (1 = wall).
+
+    With seed=None the generator is seeded from the global `random` state,
+    so random.seed() keeps making mazes reproducible.
+    """
+    if algorithm not in GENERATORS:
+        raise ValueError(f"unknown maze algorithm {algorithm!r} (choose from {', '.join(GENERATORS)})")
+    rng = random.Random(random.getrandbits(64) if seed is None else seed)
+    if algorithm == 'eller':
+        yield from enumerate(eller(size, rng))
+        return
+    cells = globals()[algorithm](size, rng)
+    for r in range(size):
+        yield r, cells[r * size:(r + 1) * size]
+
+
+def _rooms(size):
+    """Rooms per side: the even coordinates 0, 2, ... below `size`"""
+    return (size + 1) // 2
+
+
+def _carve(cells, size, k, a, b):
+    """Opens rooms a and b (room ids, i * k + j) and the wall cell between them"""
+    (ai, aj), (bi, bj) = divmod(a, k), divmod(b, k)
+    cells[2 * ai * size + 2 * aj] = 0
+    cells[2 * bi * size + 2 * bj] = 0
+    cells[(ai + bi) * size + aj + bj] = 0
+
+
+def backtracker(size, rng):
+    """Randomized DFS (recursive backtracker) with an explicit stack"""
+    cells = bytearray(b'\x01') * (size * size)
+    k = _rooms(size)
+    if not k: return cells
+    visited = bytearray(k * k)
+    visited[0], cells[0] = 1, 0
+    stack = [0]
+    while stack:
+        room = stack[-1]
+        i, j = divmod(room, k)
+        options = []
+        if i > 0 and not visited[room - k]: options.append(room - k)
+        if j + 1 < k and not visited[room + 1]: options.append(room + 1)
+        if i + 1 < k and not visited[room + k]: options.append(room + k)
+        if j > 0 and not visited[room - 1]: options.append(room - 1)
+        if not options:
+            stack.pop(); continue
+        nxt = options[rng.randrange(len(options))] if len(options) > 1 else options[0]
+        visited[nxt] = 1
+        _carve(cells, size, k, room, nxt)
+        stack.append(nxt)
+    return cells
+
+
+def kruskal(size, rng):
+    """Randomized Kruskal: knocks down walls in random order unless both sides
+    are already connected (union-find with path halving)"""
+    cells = bytearray(b'\x01') * (size * size)
+    k = _rooms(size)
+    if not k: return cells
+    cells[0] = 0  # A 1x1 room grid has no edges
+    # Edge e = 2 * room + 0 joins room and its right neighbour, + 1 its lower one
+    edges = array('i', (2 * room + d for room in range(k * k) for d in (0, 1)
+                        if (d == 0 and room % k + 1 < k) or (d == 1 and room + k < k * k)))
+    rng.shuffle(edges)
+    parent = array('i', range(k * k))
+    for e in edges:
+        a = e >> 1
+        b = a + (k if e & 1 else 1)
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]; a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]; b = parent[b]
+        if a != b:
+            parent[a] = b
+            room = e >> 1
+            _carve(cells, size, k, room, room + (k if e & 1 else 1))
+    return cells
+
+
+def wilson(size, rng):
+    """Wilson's algorithm: loop-erased random walks into the growing tree, which
+    gives every spanning tree (maze) the same probability"""
+    cells = bytearray(b'\x01') * (size * size)
+    k = _rooms(size)
+    if not k: return cells
+    n = k * k
+    in_tree = bytearray(n)
+    step = array('i', [0]) * n  # Last exit taken from each room on the current walk
+    root = rng.randrange(n)
+    in_tree[root] = 1
+    cells[2 * (root // k) * size + 2 * (root % k)] = 0
+    for start in range(n):
+        if in_tree[start]: continue
+        # Walk until the tree is hit; overwriting `step` erases any loop
+        room = start
+        while not in_tree[room]:
+            i, j = divmod(room, k)
+            while True:
+                d = rng.randrange(4)
+                if d == 0 and i > 0: nxt = room - k
+                elif d == 1 and j + 1 < k: nxt = room + 1
+                elif d == 2 and i + 1 < k: nxt = room + k
+                elif d == 3 and j > 0: nxt = room - 1
+                else: continue
+                break
+            step[room] = nxt
+            room = nxt
+        # Add the loop-erased path to the tree
+        room = start
+        while not in_tree[room]:
+            in_tree[room] = 1
+            _carve(cells, size, k, room, step[room])
+            room = step[room]
+    return cells
+
+
+def eller(size, rng):
+    """Eller's algorithm: yields grid rows top to bottom keeping only one row of
+    state, so memory is O(width) however tall the maze.
+
+    The rooms of a row that are already connected through earlier rows form a
+    set, kept as a ring of columns in increasing order (L / R links). Sets
+    never cross, so rooms j and j + 1 share a set exactly when R[j] == j + 1.
+    """
+    k = _rooms(size)
+    L, R = list(range(k)), list(range(k))
+    for i in range(k):
+        last = i == k - 1
+        room_row = bytearray(b'\x01') * size
+        room_row[0::2] = bytes(k)
+        link_row = bytearray(b'\x01') * size
+        coins = rng.randbytes(k)  # Bit 0: join right, bit 1: stay closed
+        for j in range(k):
+            # Join the room on the right unless that would close a loop; the last
+            # row joins every remaining pair of sets to keep the maze connected
+            if j + 1 < k and R[j] != j + 1 and (last or coins[j] & 1):
+                right, left = R[j], L[j + 1]
+                R[left], L[right] = right, left
+                R[j], L[j + 1] = j + 1, j
+                room_row[2 * j + 1] = 0
+            # Drop a passage down, except that a room may stay closed off while
+            # its set still has another room (which will drop one instead)
+            if not last:
+                if R[j] != j and coins[j] & 2:
+                    L[R[j]], R[L[j]] = L[j], R[j]
+                    L[j] = R[j] = j
+                else:
+                    link_row[2 * j] = 0
+        yield room_row
+        if 2 * i + 1 < size: yield link_row
@@ -0,0 +1,361 @@
+"""Multi-agent pathfinding: shared distance fields and windowed cooperative A*.
+
+Agents move in lockstep ticks on the 8-connected grid, one cell (or a wait)
+per tick. All agents heading for the same target share one BFS distance
+field rooted there (GridEngine.distance_field). The field is the heuristic of
+every agent's search and is exact on the map it was computed for.
+
+Each agent plans `window` ticks ahead in space-time (WHCA*) and reserves the
+cells and moves it will use in a ReservationTable. Agents that plan later
+treat those as blocked, so no two agents share a cell in a tick or swap
+places. Replans are staggered: an agent replans when half its window is used
+up. When a cell is blocked (block(), spawn_obstacles()), only the agents
+holding a reservation on it replan, and only their targets' fields are
+recomputed.
+
+    sim = MultiAgentSim(env, window=16)
+    for start, target in pairs: sim.add_agent(start, target)
+    sim.run(300)               # or sim.step() once per frame
+    print(sim.metrics())       # agent-steps per second, replans, fields, ...
+
+    python multi_agent.py --size 200 --agents 500 --targets 4 --ticks 300 --obstacles cluster
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+from array import array
+from collections import deque
+
+from ALGORITHM import GridEngine, wall_buffer
+from obstacles import PROFILES
+
+DEFAULT_WINDOW = 16
+MAX_REPLANS = 4  # Per agent and tick, so agents bumping each other cannot loop forever
+
+
+class Agent:
+    __slots__ = ('id', 'pos', 'target', 'plan', 'plan_t', 'replan_at', 'steps', 'waits')
+
+    def __init__(self, agent_id, pos, target):
+        self.id = agent_id
+        self.pos, self.target = pos, target  # Node ids
+        self.plan = [pos]   # Node per tick, plan[0] at tick plan_t
+        self.plan_t = 0
+        self.replan_at = 0  # Tick of the next scheduled replan
+        self.steps = self.waits = 0
+
+    def at(self, t):
+        """Planned node at tick t (the last planned node once the plan runs out)"""
+        i = t - self.plan_t
+        return self.plan[i] if i < len(self.plan) else self.plan[-1]
+
+
+class ReservationTable:
+    """Space-time reservations, each owned by one agent.
+
+    A cell key is t * cells + node; a move key (t, a, b) means its owner goes
+    from a to b between ticks t and t + 1, and blocks the opposite swap.
+    """
+    def __init__(self, cells):
+        self.n = cells
+        self.cells = {}   # cell key -> agent id
+        self.moves = {}   # (t, a, b) -> agent id
+        self.held = {}    # agent id -> (cell keys, move keys)
+        self.by_node = {} # node -> {agent id: reservation count}
+
+    def owner(self, t, node):
+        return self.cells.get(t * self.n + node)
+
+    def can_enter(self, agent_id, t, a, b):
+        """Whether `agent_id` may move from a (tick t) to b (tick t + 1)"""
+        owner = self.cells.get((t + 1) * self.n + b)
+        if owner is not None and owner != agent_id: return False
+        if a != b:
+            owner = self.moves.get((t, b, a))
+            if owner is not None and owner != agent_id: return False
+        return True
+
+    def reserve(self, agent_id, t0, path):
+        cell_keys, move_keys = [], []
+        n, by_node = self.n, self.by_node
+        for i, node in enumerate(path):
+            key = (t0 + i) * n + node
+            self.cells[key] = agent_id
+            cell_keys.append(key)
+            users = by_node.setdefault(node, {})
+            users[agent_id] = users.get(agent_id, 0) + 1
+            if i and path[i - 1] != node:
+                move = (t0 + i - 1, path[i - 1], node)
+                self.moves[move] = agent_id
+                move_keys.append(move)
+        self.held[agent_id] = (cell_keys, move_keys)
+
+    def release(self, agent_id):
+        cell_keys, move_keys = self.held.pop(agent_id, ((), ()))
+        n, by_node = self.n, self.by_node
+        for key in cell_keys:
+            if self.cells.get(key) == agent_id: del self.cells[key]
+            node = key % n
+            users = by_node[node]
+            if users[agent_id] == 1:
+                del users[agent_id]
+                if not users: del by_node[node]
+            else:
+                users[agent_id] -= 1
+        for move in move_keys:
+            if self.moves.get(move) == agent_id: del self.moves[move]
+
+    def users(self, node):
+        """Ids of the agents holding a reservation on `node`"""
+        return list(self.by_node.get(node, ()))
+
+
+class MultiAgentSim:
+    def __init__(self, env, window=DEFAULT_WINDOW, engine=None):
+        self.env = env
+        self.size = env.size
+        self.engine = engine or GridEngine(env.size)
+        self.window = window
+        self.walls = bytearray(map(bool, wall_buffer(env.grid)))  # Kept in step by block() / sync_walls()
+        # Moves per column class: waiting in place, then the engine's eight directions
+        self.moves_table = [(0,) + offsets for offsets in self.engine.offset_table]
+        self.table = ReservationTable(self.engine.cells)
+        self.agents = {}       # id -> Agent (arrived agents are removed)
+        self.occupied = {}     # node -> id of the agent standing there
+        self.targets = {}      # target node -> number of agents heading there
+        self.fields = {}       # target node -> (map version, distance field)
+        self.affected = deque()  # Agents to replan before the next move
+        self.tick = 0
+        self.next_id = 0
+        # Metrics
+        self.agent_steps = self.moves = self.waits = self.arrived = 0
+        self.replans = self.fields_computed = self.expanded = self.collisions = 0
+        self.sim_s = self.search_s = 0.0
+
+    # --- Agents ---
+    def add_agent(self, start, target):
+        """Adds an agent at cell `start` heading for cell `target`; returns its id,
+        or None if `start` is blocked or taken"""
+        eng = self.engine
+        node = eng.node_id(start)
+        if self.walls[node] or node in self.occupied: return None
+        agent = Agent(self.next_id, node, eng.node_id(target))
+        self.next_id += 1
+        agent.plan_t = agent.replan_at = self.tick
+        self.agents[agent.id] = agent
+        self.occupied[node] = agent.id
+        self.targets[agent.target] = self.targets.get(agent.target, 0) + 1
+        self.table.reserve(agent.id, self.tick, [node])
+        self.affected.append(agent.id)
+        return agent.id
+
+    def remove_agent(self, agent_id):
+        agent = self.agents.pop(agent_id)
+        self.table.release(agent_id)
+        if self.occupied.get(agent.pos) == agent_id: del self.occupied[agent.pos]
+        self.targets[agent.target] -= 1
+        if not self.targets[agent.target]: del self.targets[agent.target]
+
+    def positions(self):
+        """{agent id: (r, c)}"""
+        size = self.size
+        return {a.id: divmod(a.pos, size) for a in self.agents.values()}
+
+    # --- Map changes ---
+    def block(self, cell):
+        """Call after (r, c) became blocked: agents with reservations on it replan"""
+        node = self.engine.node_id(cell)
+        self.walls[node] = 1
+        self.affected.extend(self.table.users(node))
+
+    def sync_walls(self):
+        """Re-reads the whole map after arbitrary edits (walls cleared, map reset);
+        every field is recomputed and every agent replans"""
+        self.walls[:] = bytearray(map(bool, wall_buffer(self.env.grid)))
+        self.fields.clear()
+        self.affected.extend(self.agents)
+
+    def spawn_obstacles(self, ticks=1):
+        """Advances the environment's obstacle timeline (env.obstacles) by `ticks`;
+        its events never land on an agent or a target. Returns the new obstacles."""
+        size, occupied, targets = self.size, self.occupied, self.targets
+        spawned = self.env.obstacles.advance(
+            ticks, lambda cell: cell[0] * size + cell[1] in occupied or cell[0] * size + cell[1] in targets)
+        for cell in spawned: self.block(cell)
+        return spawned
+
+    # --- Planning ---
+    def field(self, target, fresh=False):
+        """Distance field of `target`, shared by every agent heading there. Added
+        walls only make an old field underestimate, so it stays admissible and is
+        recomputed only when `fresh` is asked for after an edit."""
+        entry = self.fields.get(target)
+        if entry is None or (fresh and entry[0] != self.env.version):
+            field = self.engine.distance_field(target, self.walls)
+            if not isinstance(field, array):  # NumPy: element access is much faster on an array
+                field = array('i', field.astype('i4').tobytes())
+            entry = self.fields[target] = (self.env.version, field)
+            self.fields_computed += 1
+        return entry[1]
+
+    def _search(self, agent, field):
+        """Windowed space-time A*: node per tick from now, up to `window` ticks
+        (fewer if the target comes first or every continuation is reserved)"""
+        eng, table, walls = self.engine, self.table, self.walls
+        n, size, window, t0 = eng.cells, self.size, self.window, self.tick
+        moves_table, col_class = self.moves_table, eng.col_class
+        target, aid = agent.target, agent.id
+        start = agent.pos
+        h0 = field[start]
+        if h0 < 0: return [start]  # Target unreachable: wait in place
+        parent = {start: None}     # state (dt * n + node) -> parent state
+        heap = [(h0, 0, start)]    # (f, -dt, node); prefers deeper states on ties
+        best, best_key = start, (0, h0)
+        expanded = 0
+        while heap:
+            f, neg_dt, node = heapq.heappop(heap)
+            dt = -neg_dt
+            state = dt * n + node
+            expanded += 1
+            if node == target or dt == window:
+                best = state
+                break
+            if (dt, -field[node]) > best_key: best, best_key = state, (dt, -field[node])
+            t = t0 + dt
+            nxt = (dt + 1) * n
+            for off in moves_table[col_class[node % size]]:
+                nb = node + off
+                if not 0 <= nb < n or walls[nb] or nxt + nb in parent: continue
+                h = field[nb]
+                if h < 0 or not table.can_enter(aid, t, node, nb): continue
+                parent[nxt + nb] = state
+                heapq.heappush(heap, (dt + 1 + h, -(dt + 1), nb))
+        self.expanded += expanded
+        path = []
+        while best is not None:
+            path.append(best % n)
+            best = parent[best]
+        return path[::-1]
+
+    def _replan(self, agent, fresh):
+        t0 = time.perf_counter()
+        self.table.release(agent.id)
+        path = self._search(agent, self.field(agent.target, fresh))
+        if len(path) == 1:
+            # Boxed in: wait here and push whoever reserved this cell next tick to replan
+            path.append(agent.pos)
+            owner = self.table.owner(self.tick + 1, agent.pos)
+            if owner is not None:
+                self.table.release(owner)
+                self.affected.append(owner)
+        agent.plan, agent.plan_t = path, self.tick
+        self.table.reserve(agent.id, self.tick, path)
+        depth = len(path) - 1
+        agent.replan_at = self.tick + (depth if path[-1] == agent.target else max(1, depth // 2))
+        self.replans += 1
+        self.search_s += time.perf_counter() - t0
+
+    # --- Simulation ---
+    def step(self):
+        """Advances one tick; returns the agents that reached their target (removed)"""
+        t0 = time.perf_counter()
+        agents, tick = self.agents, self.tick
+        replanned = {}
+
+        def drain():
+            # Affected agents (edits, new agents, bumps) get a field of the current map
+            while self.affected:
+                aid = self.affected.popleft()
+                if aid in agents and replanned.get(aid, 0) < MAX_REPLANS:
+                    replanned[aid] = replanned.get(aid, 0) + 1
+                    self._replan(agents[aid], True)
+
+        drain()
+        for agent in list(agents.values()):
+            if agent.replan_at <= tick and agent.id not in replanned:
+                replanned[agent.id] = 1
+                self._replan(agent, False)
+        drain()
+
+        occupied, arrived = {}, []
+        for agent in agents.values():
+            nxt = agent.at(tick + 1)
+            if self.walls[nxt]: nxt = agent.pos  # Blocked after planning; affected list replans it
+            if nxt in occupied: self.collisions += 1
+            if nxt == agent.pos:
+                agent.waits += 1; self.waits += 1
+            else:
+                agent.steps += 1; self.moves += 1
+            agent.pos = nxt
+            occupied[nxt] = agent.id
+            if nxt == agent.target: arrived.append(agent)
+        self.agent_steps += len(agents)
+        self.tick += 1
+        self.occupied = occupied
+        for agent in arrived:
+            self.remove_agent(agent.id)
+        self.arrived += len(arrived)
+        self.sim_s += time.perf_counter() - t0
+        return arrived
+
+    def run(self, ticks, spawn=False):
+        """Steps `ticks` times (advancing the obstacle timeline each tick if `spawn`)"""
+        for _ in range(ticks):
+            if not self.agents: break
+            if spawn: self.spawn_obstacles()
+            self.step()
+        return self.metrics()
+
+    def metrics(self):
+        return {'tick': self.tick, 'agents': len(self.agents), 'arrived': self.arrived,
+                'agent_steps': self.agent_steps, 'moves': self.moves, 'waits': self.waits,
+                'replans': self.replans, 'fields': self.fields_computed, 'expanded': self.expanded,
+                'collisions': self.collisions, 'sim_s': round(self.sim_s, 4), 'search_s': round(self.search_s, 4),
+                'agent_steps_per_s': round(self.agent_steps / self.sim_s, 1) if self.sim_s else None}
+
+
+def random_agents(sim, count, targets, rng):
+    """Adds `count` agents on random open cells, spread evenly over `targets`"""
+    size = sim.size
+    added = 0
+    while added < count:
+        start = (rng.randrange(size), rng.randrange(size))
+        if start in targets: continue
+        if sim.add_agent(start, targets[added % len(targets)]) is not None: added += 1
+
+
+def main(argv=None):
+    from benchmark import build_map
+
+    parser = argparse.ArgumentParser(description="Multi-agent throughput (agent-steps per second)")
+    parser.add_argument('--kind', default='scatter', help="empty, scatter or maze[:algorithm]")
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--coverage', type=float, default=0.15)
+    parser.add_argument('--agents', type=int, default=500)
+    parser.add_argument('--targets', type=int, default=4, help="Distinct targets the agents share")
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--obstacles', default='none', choices=PROFILES, help="Dynamic-obstacle profile (obstacles.py)")
+    parser.add_argument('--spawn', type=float, help="Dynamic-obstacle events per tick (overrides the profile's rate)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = build_map(args.kind, args.size, args.seed, args.coverage)
+    # Not `seed` itself: the scheduler and the agents would replay the map's own wall
+    # draws, so obstacle events would land on walls and agents start near them
+    obstacle_seed = random.Random(f"obstacles-{args.seed}").getrandbits(31)
+    env.obstacles.reset(obstacle_seed, args.obstacles, **({'rate': args.spawn} if args.spawn is not None else {}))
+    rng = random.Random(f"agents-{args.seed}")
+    open_cells = [(r, c) for r in range(args.size) for c in range(args.size) if env.grid[r][c] != -1]
+    targets = rng.sample(open_cells, args.targets)
+    sim = MultiAgentSim(env, args.window)
+    random_agents(sim, min(args.agents, len(open_cells) - args.targets), targets, rng)
+    print(json.dumps(sim.run(args.ticks, spawn=True)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
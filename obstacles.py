@@ -0,0 +1,116 @@
+"""Seeded dynamic-obstacle timeline, advanced by a simulation clock.
+
+Obstacles used to be rolled once per search callback, so their rate depended
+on how many nodes an algorithm pushed and no two runs could be compared. The
+scheduler instead generates events against a clock measured in ticks (one
+agent step in the app and in multi_agent.py). Callers advance the clock and
+get back the batch of cells blocked in that interval:
+
+    env.obstacles.reset(seed=7, profile='cluster')
+    spawned = env.obstacles.advance(1, protected=lambda cell: cell == agent)
+
+Where events fall depends only on the seed, the profile and the clock, never
+on the map, the algorithm or how the clock is chopped up. An event landing on
+a wall or a protected cell is dropped without changing later events, so the
+same timeline replays across every algorithm at any animation speed.
+
+A profile combines three sources, each event blocking `cluster` cells:
+
+    rate     Poisson arrivals, `rate` events per tick on average
+    burst    `burst` events at once every `period` ticks
+    cluster  each event blocks up to `cluster` cells within `radius` of a
+             random centre (1 = a single cell)
+
+Applied cells go to `log` as [tick, r, c], which is the schedule a scenario
+stores; `replay()` plays such a schedule back instead of the RNG. Every batch
+is also handed to the `listeners` (renderers, incremental planners).
+"""
+import random
+
+# Named profiles (see ObstacleScheduler.reset); rates are per tick
+PROFILES = {
+    'none': {'rate': 0.0},
+    'rate': {'rate': 0.1},
+    'burst': {'rate': 0.0, 'burst': 6, 'period': 25},
+    'cluster': {'rate': 0.04, 'cluster': 6, 'radius': 2},
+}
+DEFAULT_PROFILE = 'rate'
+BASE_SETTINGS = {'rate': 0.0, 'burst': 0, 'period': 0, 'cluster': 1, 'radius': 0}
+
+
+class ObstacleScheduler:
+    """Dynamic-obstacle events for one environment (see the module docstring)"""
+    def __init__(self, env, seed=None, profile=DEFAULT_PROFILE):
+        self.env = env
+        self.listeners = []  # Called with each non-empty batch of blocked cells
+        self.reset(seed, profile)
+
+    def reset(self, seed=None, profile=None, **overrides):
+        """Restarts the timeline at tick 0. `profile` is a PROFILES name or a
+        dict (None keeps the current one); keyword overrides patch single
+        settings, e.g. reset(3, 'burst', period=10)."""
+        if profile is not None:
+            self.settings = dict(BASE_SETTINGS, **(PROFILES[profile] if isinstance(profile, str) else profile))
+        self.settings.update(overrides)
+        self.rate, self.burst, self.period, self.cluster, self.radius = (
+            self.settings[key] for key in ('rate', 'burst', 'period', 'cluster', 'radius'))
+        # seed=None picks a fresh seed without touching the global RNG (map generators seed that)
+        self.seed = random.SystemRandom().randrange(2 ** 31) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.clock = 0.0
+        self.next_arrival = self.rng.expovariate(self.rate) if self.rate > 0 else float('inf')
+        self.next_burst = self.period if self.burst > 0 and self.period > 0 else float('inf')
+        self.schedule = None  # Recorded events being replayed instead, see replay()
+        self.log = []
+
+    def replay(self, schedule):
+        """Plays back a recorded schedule of [tick, r, c] from tick 0"""
+        self.clock = 0.0
+        self.schedule = sorted(((tick, r, c) for tick, r, c in schedule), key=lambda event: event[0])
+        self.replay_pos = 0
+        self.log = []
+
+    def _events(self, until):
+        """Yields (tick, cells) for every generated event up to `until`, in time order"""
+        rng, size = self.rng, self.env.size
+        while True:
+            tick = min(self.next_arrival, self.next_burst)
+            if tick > until: return
+            if self.next_arrival <= self.next_burst:
+                count = 1
+                self.next_arrival += rng.expovariate(self.rate)
+            else:
+                count = self.burst
+                self.next_burst += self.period
+            for _ in range(count):
+                # A fixed number of draws per event, whatever the map looks like
+                r, c = rng.randrange(size), rng.randrange(size)
+                cells = [(r, c)]
+                for _ in range(self.cluster - 1):
+                    cells.append((r + rng.randint(-self.radius, self.radius),
+                                  c + rng.randint(-self.radius, self.radius)))
+                yield tick, cells
+
+    def _replayed(self, until):
+        schedule = self.schedule
+        while self.replay_pos < len(schedule) and schedule[self.replay_pos][0] <= until:
+            tick, r, c = schedule[self.replay_pos]
+            self.replay_pos += 1
+            yield tick, [(r, c)]
+
+    def advance(self, ticks=1, protected=None):
+        """Moves the clock forward and blocks the cells of every event due by
+        then, except on cells where protected(cell) is true. Returns the batch
+        of newly blocked cells (also sent to the listeners)."""
+        self.clock = round(self.clock + ticks, 9)  # Many small steps must still reach whole ticks
+        events = self._replayed(self.clock) if self.schedule is not None else self._events(self.clock)
+        spawned = []
+        for tick, cells in events:
+            for cell in cells:
+                if protected is not None and protected(cell): continue
+                if self.env.add_dynamic_obstacle(*cell):
+                    spawned.append(cell)
+                    self.log.append([round(tick, 3), cell[0], cell[1]])
+        if spawned:
+            for listener in self.listeners: listener(spawned)
+        return spawned
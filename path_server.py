@@ -0,0 +1,403 @@
+"""Local path-query service: JSON lines over TCP or a Unix socket.
+
+The server keeps named maps in memory and answers one JSON object per line.
+Every request may carry an "id", which is echoed in its response; requests
+on one connection run concurrently, so responses can come back out of order.
+
+    {"op": "load", "map": "m", "spec": {"kind": "scatter", "size": 500, "seed": 1, "coverage": 0.2}}
+    {"op": "load", "map": "m", "path": "arena.map"}
+    {"op": "path", "map": "m", "start": [0, 0], "target": [499, 499]}             # + "algorithm"
+    {"op": "toggle", "map": "m", "cell": [3, 4]}
+    {"op": "spawn", "map": "m", "cells": [[5, 5], [6, 6]]}
+    {"op": "tick", "map": "m", "ticks": 5}              # + "seed" / "profile" to restart the timeline
+    {"op": "clear_dynamic", "map": "m"}
+    {"op": "stats"}
+
+Plain shortest-path queries on unit-cost maps are answered from a BFS
+distance field rooted at the target. Concurrent queries for the same target
+(and map version) share one field computation, and finished fields stay in a
+per-map SearchCache until the map is edited. Searches run in a process pool,
+so the event loop only parses, routes and walks fields downhill.
+
+    python path_server.py serve --port 8765 --map arena=arena.map --workers 4
+    python path_server.py load --port 8765 --size 500 --queries 5000 --concurrency 64 --targets 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ALGORITHM import GridEngine, wall_buffer
+from benchmark import ALGORITHMS, map_from_spec, search_args
+from environment import GridEnvironment
+from obstacles import PROFILES
+from search_cache import SearchCache, FIELD
+
+LATENCY_WINDOW = 100000  # Most recent request latencies kept for percentiles
+FIELD_BUDGET = 256 << 20  # Per-map distance-field cache
+
+# --- Worker side (runs in the pool processes) ---
+WORKER_ENGINES = {}
+
+
+def worker_engine(size, costs=(1, 1), terrain=None):
+    engine = WORKER_ENGINES.get(size)
+    if engine is None:
+        engine = WORKER_ENGINES[size] = GridEngine(size)
+    engine.set_costs(costs[0], costs[1], terrain)
+    return engine
+
+
+def worker_field(size, walls, target):
+    """BFS distance field rooted at node `target`"""
+    return worker_engine(size).distance_field(target, walls)
+
+
+def worker_search(size, walls, costs, terrain, name, start, target, args=()):
+    engine = worker_engine(size, costs, terrain)
+    return getattr(engine, name)(start, target, walls, *args)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of a non-empty sorted list"""
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+def latency_summary(latencies):
+    if not latencies: return {'count': 0}
+    ordered = sorted(latencies)
+    return {'count': len(ordered), 'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 3), 'max_ms': round(ordered[-1] * 1000, 3)}
+
+
+def downhill(engine, field, start, blocked=False):
+    """Node ids start..source read off a field. The field never enters a blocked
+    start, but the searches do step off one, so that walk begins at its nearest neighbour."""
+    if not blocked:
+        path = engine.downhill_path(field, start)
+        return path[::-1] if path is not None else None
+    n, best = engine.cells, None
+    for off in engine.offset_table[engine.col_class[start % engine.size]]:
+        nb = start + off
+        if 0 <= nb < n and field[nb] >= 0 and (best is None or field[nb] < field[best]): best = nb
+    return [start] + downhill(engine, field, best) if best is not None else None
+
+
+class RequestError(Exception):
+    """A bad request; reported to the client instead of closing the connection"""
+
+
+class MapEntry:
+    """One served map: the environment, a wall buffer kept in step with every
+    edit, and the fields computed (or being computed) for its current version"""
+    def __init__(self, env):
+        self.env = env
+        self.size = env.size
+        self.walls = bytearray(map(bool, wall_buffer(env.grid)))
+        self.engine = GridEngine(env.size)  # For downhill walks on the event loop
+        self.fields = SearchCache(FIELD_BUDGET)
+        self.pending = {}  # (version, target) -> future of its field
+
+    @property
+    def unit_cost(self):
+        env = self.env
+        return env.straight_cost == env.diagonal_cost == 1 and env.terrain is None
+
+    def cell(self, value):
+        try:
+            r, c = value
+        except (TypeError, ValueError):
+            raise RequestError(f"bad cell {value!r}") from None
+        if not (isinstance(r, int) and isinstance(c, int) and 0 <= r < self.size and 0 <= c < self.size):
+            raise RequestError(f"cell {value!r} is off the {self.size}x{self.size} map")
+        return r, c
+
+    def edited(self, cells):
+        """Syncs the wall buffer after an edit and drops fields of older versions"""
+        size = self.size
+        for r, c in cells:
+            self.walls[r * size + c] = self.env.grid[r][c] == -1
+        self.fields.discard_versions_before(self.env.version)
+
+
+class PathServer:
+    def __init__(self, workers=None):
+        self.maps = {}
+        self.pool = ProcessPoolExecutor(workers or os.cpu_count() or 1)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counts = {'requests': 0, 'errors': 0, 'searches': 0, 'fields': 0, 'coalesced': 0, 'cached': 0}
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    # --- Connections ---
+    async def handle(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                if not line.strip(): continue
+                task = asyncio.ensure_future(self.respond(line, writer, time.perf_counter()))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks: await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line, writer, t0):
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict): raise RequestError("request must be a JSON object")
+            response = await self.dispatch(request)
+            response['ok'] = True
+        except Exception as exc:  # One bad request must not take the connection down
+            self.counts['errors'] += 1
+            response = {'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+        if 'id' in request: response['id'] = request['id']
+        self.counts['requests'] += 1
+        self.latencies.append(time.perf_counter() - t0)
+        if writer.is_closing(): return
+        writer.write(json.dumps(response).encode() + b'\n')
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def dispatch(self, request):
+        op = request.get('op')
+        if op == 'stats': return self.stats()
+        if op == 'load': return await self.load(request)
+        entry = self.maps.get(request.get('map'))
+        if entry is None: raise RequestError(f"unknown map {request.get('map')!r}")
+        if op == 'path': return await self.path(entry, request)
+        env = entry.env
+        if op == 'toggle':
+            cell = env.toggle_obstacle(*entry.cell(request['cell']))
+            entry.edited([cell])
+            return {'version': env.version, 'blocked': env.grid[cell[0]][cell[1]] == -1}
+        if op == 'spawn':
+            cells = [entry.cell(cell) for cell in request['cells']]
+            spawned = [cell for cell in cells if env.add_dynamic_obstacle(*cell)]
+            entry.edited(spawned)
+            return {'version': env.version, 'spawned': spawned}
+        if op == 'tick':
+            # Advances the map's seeded obstacle timeline (obstacles.py)
+            profile = request.get('profile')
+            if isinstance(profile, str) and profile not in PROFILES: raise RequestError(f"unknown profile {profile!r}")
+            if 'seed' in request or profile is not None: env.obstacles.reset(request.get('seed'), profile)
+            spawned = env.obstacles.advance(request.get('ticks', 1))
+            entry.edited(spawned)
+            return {'version': env.version, 'clock': env.obstacles.clock, 'spawned': spawned}
+        if op == 'clear_dynamic':
+            cells = list(env.dynamic_obstacles)
+            env.clean_dynamic()
+            entry.edited(cells)
+            return {'version': env.version, 'cleared': len(cells)}
+        raise RequestError(f"unknown op {op!r}")
+
+    # --- Operations ---
+    async def load(self, request):
+        name = request.get('map')
+        if not isinstance(name, str): raise RequestError("load needs a map name")
+        loop = asyncio.get_running_loop()
+        # Building a map is CPU work too, but needs no pickling: a thread keeps the loop free
+        if 'path' in request:
+            env = await loop.run_in_executor(None, GridEnvironment.from_file, request['path'])
+        else:
+            env = await loop.run_in_executor(None, map_from_spec, request['spec'])
+        self.maps[name] = MapEntry(env)
+        return {'map': name, 'size': env.size, 'version': env.version}
+
+    async def path(self, entry, request):
+        start, target = entry.cell(request['start']), entry.cell(request['target'])
+        name = request.get('algorithm')
+        if name is not None and name not in ALGORITHMS: raise RequestError(f"unknown algorithm {name!r}")
+        eng = entry.engine
+        version = entry.env.version
+        start_id, target_id = eng.node_id(start), eng.node_id(target)
+        if entry.walls[target_id]:
+            ids = None  # The searches never reach a blocked target
+        elif name is None and entry.unit_cost:
+            field = await self.field(entry, version, target_id)
+            ids = downhill(eng, field, start_id, entry.walls[start_id])
+        else:
+            env = entry.env
+            name = name or ('bfs' if entry.unit_cost else 'ucs')
+            # dls / iddfs need a depth: the same default as batch.py and the CLI
+            args = tuple(request['args']) if 'args' in request else search_args(name, entry.size)
+            self.counts['searches'] += 1
+            ids = await asyncio.get_running_loop().run_in_executor(
+                self.pool, worker_search, entry.size, bytes(entry.walls),
+                (env.straight_cost, env.diagonal_cost), env.terrain and bytes(env.terrain),
+                name, start_id, target_id, args)
+        path = eng.to_cells(ids) if ids is not None else None
+        return {'version': version, 'path': path, 'length': len(path) if path else None}
+
+    async def field(self, entry, version, target):
+        """Distance field for `target` on map version `version`, computing it at most once"""
+        key = (version, FIELD, None, target)
+        field = entry.fields.get(key)
+        if field is not None:
+            self.counts['cached'] += 1
+            return field
+        future = entry.pending.get((version, target))
+        if future is not None:
+            self.counts['coalesced'] += 1
+            return await future
+        self.counts['fields'] += 1
+        future = asyncio.get_running_loop().run_in_executor(self.pool, worker_field, entry.size,
+                                                            bytes(entry.walls), target)
+        entry.pending[(version, target)] = future
+        try:
+            field = await future
+        finally:
+            del entry.pending[(version, target)]
+        if entry.env.version == version: entry.fields.put(key, field)
+        return field
+
+    def stats(self):
+        row = dict(self.counts)
+        row['latency'] = latency_summary(self.latencies)
+        row['maps'] = {name: {'size': e.size, 'version': e.env.version, 'cached_fields': len(e.fields)}
+                       for name, e in self.maps.items()}
+        return row
+
+
+async def serve(host='127.0.0.1', port=8765, unix=None, workers=None, maps=(), log=None):
+    server = PathServer(workers)
+    for name, path in maps:
+        await server.load({'map': name, 'path': path})
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, path=unix)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+    if log: log(f"Serving on {unix or f'{host}:{port}'} ({len(server.maps)} maps)")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if log: log(json.dumps(server.stats()))
+        server.close()
+
+
+# --- Load-test client ---
+async def open_client(host='127.0.0.1', port=8765, unix=None):
+    if unix: return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+
+class Client:
+    """Pipelined JSON-lines client: many requests in flight on one connection"""
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.waiting = {}
+        self.next_id = 0
+        self.listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line: break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get('id'), None)
+            if future is not None and not future.done(): future.set_result(response)
+        for future in self.waiting.values():
+            if not future.done(): future.set_exception(ConnectionError("server closed the connection"))
+
+    async def request(self, **request):
+        self.next_id += 1
+        request['id'] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+
+async def load_test(host='127.0.0.1', port=8765, unix=None, size=200, queries=2000, concurrency=32,
+                    targets=8, edit_every=0, seed=0, map_name='loadtest', log=print):
+    """Loads a scatter map, then fires `queries` path queries `concurrency` at a time,
+    drawing targets from a small pool so concurrent queries can share a field.
+    With edit_every > 0, one in that many requests toggles a random cell instead."""
+    rng = random.Random(f"queries-{seed}")  # Not `seed` itself: that would replay the map's own wall draws
+    client = Client(*await open_client(host, port, unix))
+    loaded = await client.request(op='load', map=map_name,
+                                  spec={'kind': 'scatter', 'size': size, 'seed': seed, 'coverage': 0.2})
+    if not loaded['ok']: raise RuntimeError(loaded['error'])
+    pool = [(rng.randrange(size), rng.randrange(size)) for _ in range(targets)]
+    latencies, failures = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal failures
+        async with semaphore:
+            t0 = time.perf_counter()
+            if edit_every and i % edit_every == edit_every - 1:
+                response = await client.request(op='toggle', map=map_name,
+                                                cell=[rng.randrange(size), rng.randrange(size)])
+            else:
+                response = await client.request(op='path', map=map_name, target=rng.choice(pool),
+                                                start=[rng.randrange(size), rng.randrange(size)])
+            latencies.append(time.perf_counter() - t0)
+            if not response['ok']: failures += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(queries)))
+    elapsed = time.perf_counter() - t0
+    server_stats = await client.request(op='stats')
+    await client.close()
+    report = {'queries': queries, 'failures': failures, 'seconds': round(elapsed, 3),
+              'qps': round(queries / elapsed, 1), 'client_latency': latency_summary(latencies),
+              'server': {k: v for k, v in server_stats.items() if k not in ('id', 'ok')}}
+    if log: log(json.dumps(report, indent=1))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON-lines path-query service")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'load'):
+        p = sub.add_parser(name)
+        p.add_argument('--host', default='127.0.0.1')
+        p.add_argument('--port', type=int, default=8765)
+        p.add_argument('--unix', metavar='PATH', help="Unix socket instead of TCP")
+    serve_p, load_p = sub.choices['serve'], sub.choices['load']
+    serve_p.add_argument('--workers', type=int, default=None, help="Search processes (default: CPU count)")
+    serve_p.add_argument('--map', action='append', default=[], metavar='NAME=FILE',
+                         help="Preload a .map / binary map (repeatable)")
+    load_p.add_argument('--size', type=int, default=200)
+    load_p.add_argument('--queries', type=int, default=2000)
+    load_p.add_argument('--concurrency', type=int, default=32)
+    load_p.add_argument('--targets', type=int, default=8, help="Distinct targets the queries draw from")
+    load_p.add_argument('--edit-every', type=int, default=0, help="Make every Nth request a map edit")
+    load_p.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        maps = [spec.split('=', 1) for spec in args.map]
+        if any(len(m) != 2 for m in maps): parser.error("--map takes NAME=FILE")
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, args.workers, maps, log=print))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    asyncio.run(load_test(args.host, args.port, args.unix, args.size, args.queries, args.concurrency,
+                          args.targets, args.edit_every, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
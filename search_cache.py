@@ -0,0 +1,93 @@
+"""LRU cache of search results and target-rooted distance fields.
+
+Entries are keyed by (map version, algorithm, start, target), where the map
+version is GridEnvironment.version: any edit bumps it, so stale entries are
+never returned and simply age out of the LRU. Paths on an 8-connected grid
+are reversible, so one BFS distance field rooted at a target answers "shortest
+path to target" for every start on that map version.
+
+    cache = SearchCache(budget=32 << 20)
+    path = cache.result(env.version, 'bfs', start, target,
+                        lambda: algo.bfs(start, target, env.grid))
+    path = cache.path_to(engine, env.version, walls, start_id, target_id)
+"""
+import sys
+from collections import OrderedDict
+
+FIELD = 'field'  # Algorithm slot used for distance-field entries
+
+
+def entry_size(value):
+    """Rough memory footprint of a cached value in bytes"""
+    if value is None: return 16
+    if hasattr(value, 'nbytes'): return int(value.nbytes)             # numpy arrays
+    if hasattr(value, 'itemsize'): return value.itemsize * len(value)  # array('i')
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(entry_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class SearchCache:
+    """Least-recently-used cache bounded by an approximate byte budget"""
+    def __init__(self, budget=64 << 20):
+        self.budget = budget
+        self.entries = OrderedDict()  # key -> (value, nbytes)
+        self.nbytes = 0
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """Stores `value`, evicting the oldest entries to stay within the budget.
+        Values larger than the whole budget are not cached."""
+        nbytes = entry_size(value)
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        if nbytes > self.budget: return value
+        while self.entries and self.nbytes + nbytes > self.budget:
+            self.nbytes -= self.entries.popitem(last=False)[1][1]
+        self.entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def discard_versions_before(self, version):
+        """Drops every entry for an older map version (optional; the LRU ages them out anyway)"""
+        for key in [key for key in self.entries if key[0] < version]:
+            self.nbytes -= self.entries.pop(key)[1]
+
+    # --- Lookups ---
+    def result(self, version, algorithm, start, target, compute):
+        """Cached search result, calling `compute()` on a miss"""
+        key = (version, algorithm, start, target)
+        if key in self.entries: return self.get(key)
+        self.misses += 1
+        return self.put(key, compute())
+
+    def distance_field(self, engine, version, walls, target):
+        """BFS distance field rooted at node `target` (see GridEngine.distance_field)"""
+        key = (version, FIELD, None, target)
+        if key in self.entries: return self.get(key)
+        self.misses += 1
+        return self.put(key, engine.distance_field(target, walls))
+
+    def path_to(self, engine, version, walls, start, target):
+        """Shortest path (node ids start..target) read off the target's cached field"""
+        path = engine.downhill_path(self.distance_field(engine, version, walls, target), start)
+        return path[::-1] if path is not None else None
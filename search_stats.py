@@ -0,0 +1,189 @@
+"""Search instrumentation: counters, timers and optional profiling hooks.
+
+Pass a SearchStats to any SearchAlgorithms method (`stats=`) or wrap a step
+event stream with `stats.wrap(events)`. Afterwards it holds:
+
+    expansions       nodes popped and expanded; a search that stops when it
+                     pops the target counts that pop too (as the engine does)
+    pushes           frontier insertions (including the root)
+    decrease_keys    in-place priority updates (indexed-heap UCS only)
+    duplicate_pops   pops of a node that was already expanded (stale heap
+                     entries, DLS/IDDFS revisits)
+    neighbor_calls   neighbour generations (one per expansion; the engine
+                     inlines get_neighbors)
+    peak_frontier    largest open list
+    peak_visited     most nodes marked visited at once
+    search_s         time inside the search itself
+    callback_s       time spent in the callback / event consumer
+    depth_s          IDDFS: search time per depth pass
+
+Hooks run around the search and may add their own fields:
+
+    stats = SearchStats(hooks=[ProfileHook(), TracemallocHook()])
+"""
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+from ALGORITHM import PUSH, POP, EXPAND, RESET, DONE
+
+COUNTERS = ['expansions', 'pushes', 'decrease_keys', 'duplicate_pops', 'neighbor_calls', 'peak_frontier', 'peak_visited']
+TIMERS = ['search_s', 'callback_s']
+
+
+class SearchStats:
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self._running = []  # Hooks started and not yet stopped
+        self.reset()
+
+    def reset(self, algorithm=None):
+        self.algorithm = algorithm
+        for name in COUNTERS: setattr(self, name, 0)
+        for name in TIMERS: setattr(self, name, 0.0)
+        self.depth_s = []
+        self.path_len = None
+        self.extra = {}  # Filled by hooks
+
+    # --- Direct calls (SearchAlgorithms._run) ---
+    def begin(self, algorithm):
+        self.reset(algorithm)
+        self._running = list(self.hooks)
+        for hook in self._running: hook.start()
+        self._t0 = time.perf_counter()
+
+    def end(self, engine, path):
+        total = time.perf_counter() - self._t0
+        self._stop_hooks()
+        self.search_s = max(total - self.callback_s, 0.0)
+        self.expansions = self.neighbor_calls = engine.expanded
+        self.pushes = engine.pushes
+        self.decrease_keys = engine.decrease_keys
+        self.duplicate_pops = engine.duplicate_pops
+        self.peak_frontier = engine.peak_frontier
+        self.peak_visited = engine.visited_count(self.algorithm)
+        if self.algorithm == 'iddfs': self.depth_s = list(engine.iteration_time)
+        self.path_len = len(path) if path else None
+
+    def timed(self, callback):
+        """Wraps a search callback so its run time is booked as callback time"""
+        def timed_callback(*args):
+            t0 = time.perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                self.callback_s += time.perf_counter() - t0
+        return timed_callback
+
+    # --- Step event streams ---
+    def wrap(self, events, algorithm=None):
+        """Passes (kind, data) events through, counting them. Time inside the
+        generator is search time; time between events is callback time."""
+        self.begin(algorithm)
+        frontier = 0
+        expanded, visited = set(), set()
+        # DLS / IDDFS pop a node when backtracking out of it, so a duplicate there is
+        # a second expansion; everywhere else it is a pop of an already expanded node
+        depth_first = algorithm in ('dls', 'iddfs')
+        depth_start = None  # search_s when the current IDDFS pass began
+        popped = None  # Last node popped and not (yet) reported expanded
+        clock = time.perf_counter
+        t = clock()
+        try:
+            for kind, data in events:
+                now = clock()
+                self.search_s += now - t
+                if kind == PUSH:
+                    self.pushes += 1
+                    frontier += 1
+                    visited.add(data)
+                    if frontier > self.peak_frontier: self.peak_frontier = frontier
+                    if len(visited) > self.peak_visited: self.peak_visited = len(visited)
+                elif kind == POP:
+                    frontier -= 1
+                    if not depth_first and data in expanded: self.duplicate_pops += 1
+                    popped = data
+                elif kind == EXPAND:
+                    self.expansions += 1
+                    self.neighbor_calls += 1
+                    if depth_first and data in expanded: self.duplicate_pops += 1
+                    expanded.add(data)
+                    popped = None
+                elif kind == RESET:  # IDDFS starts a pass (peaks are kept across passes)
+                    if depth_start is not None: self.depth_s.append(self.search_s - depth_start)
+                    depth_start = self.search_s
+                    frontier = 0
+                    expanded.clear(); visited.clear()
+                elif kind == DONE:
+                    # The pop that found the path ends the search before its EXPAND event
+                    # (depth-first streams POP when backtracking, so nothing is pending there)
+                    if data and popped is not None and not depth_first:
+                        self.expansions += 1
+                        self.neighbor_calls += 1
+                    if depth_start is not None: self.depth_s.append(self.search_s - depth_start)
+                    self.path_len = len(data) if data else None
+                    self._stop_hooks()  # Consumers usually stop pulling after DONE
+                yield kind, data
+                t = clock()
+                self.callback_s += t - now
+        finally:
+            self._stop_hooks()
+
+    def _stop_hooks(self):
+        hooks, self._running = self._running, []
+        for hook in reversed(hooks): hook.stop(self)
+
+    # --- Output ---
+    def to_dict(self):
+        row = {'algorithm': self.algorithm, 'path_len': self.path_len}
+        for name in COUNTERS: row[name] = getattr(self, name)
+        for name in TIMERS: row[name] = round(getattr(self, name), 6)
+        row['depth_s'] = [round(t, 6) for t in self.depth_s]
+        row.update(self.extra)
+        return row
+
+    def to_json(self, path=None):
+        """JSON text of to_dict(); appended as one line to `path` if given"""
+        text = json.dumps(self.to_dict())
+        if path:
+            with open(path, 'a') as f: f.write(text + '\n')
+        return text
+
+    def summary_lines(self):
+        """Short lines for the side panel"""
+        return [
+            f"Exp {self.expansions}  Push {self.pushes}  Dup {self.duplicate_pops}",
+            f"Peak F {self.peak_frontier}  V {self.peak_visited}",
+            f"Search {self.search_s * 1000:.1f}ms  UI {self.callback_s * 1000:.0f}ms",
+        ]
+
+
+class ProfileHook:
+    """cProfile around the search; stores the top functions by cumulative time"""
+    def __init__(self, top=15):
+        self.top = top
+
+    def start(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, stats):
+        self.profile.disable()
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+        stats.extra['profile'] = out.getvalue()
+
+
+class TracemallocHook:
+    """Peak Python allocation during the search (slows allocation down while on)"""
+    def start(self):
+        self.was_tracing = tracemalloc.is_tracing()
+        if not self.was_tracing: tracemalloc.start()
+        tracemalloc.reset_peak()
+
+    def stop(self, stats):
+        stats.extra['peak_alloc_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        if not self.was_tracing: tracemalloc.stop()
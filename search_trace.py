@@ -0,0 +1,262 @@
+"""Compact binary search traces: record step events, replay them through mmap.
+
+File layout (little-endian):
+    header   HEADER (magic, version, record size, grid size, start, target,
+             record count, path length)
+    walls    grid_size * grid_size bits, the map when recording started
+    records  `count` fixed-width RECORD entries (kind code, node id)
+    path     `path length` u32 node ids
+
+Every record is an invertible delta, so a replay can step backward as cheaply
+as forward. The recorder makes IDDFS resets invertible by writing explicit
+POP / UNEXPAND records for whatever the previous pass left on screen.
+"""
+import mmap
+import os
+import struct
+from array import array
+
+from ALGORITHM import PUSH, POP, EXPAND, RESET, DONE, wall_buffer, np
+
+MAGIC = b'SVTR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIQI')
+RECORD = struct.Struct('<BI')  # 5 bytes per step
+
+# On-disk kind codes
+K_PUSH, K_POP, K_EXPAND, K_UNEXPAND, K_RESET, K_SPAWN, K_DONE = range(1, 8)
+KIND_CODES = {PUSH: K_PUSH, POP: K_POP, EXPAND: K_EXPAND, RESET: K_RESET, DONE: K_DONE}
+
+FLUSH_BYTES = 1 << 20
+KEYFRAME_BUDGET = 64 << 20  # Bytes of keyframes a TraceReplay may hold
+
+
+def pack_walls(walls, cells):
+    """Bit-packs a flat wall buffer (nonzero = blocked), bit i = cell i"""
+    bits = bytes(walls).translate(bytes([48] + [49] * 255))  # b'0' / b'1' per cell
+    return int(bits[::-1] or b'0', 2).to_bytes((cells + 7) // 8, 'little')
+
+
+def unpack_walls(data, cells):
+    """Inverse of pack_walls: returns a bytearray with 1 for blocked cells"""
+    bits = format(int.from_bytes(data, 'little'), f'0{cells}b')[::-1].encode()
+    table = bytearray(range(256))
+    table[ord('0')], table[ord('1')] = 0, 1
+    return bytearray(bits.translate(table))
+
+
+class TraceRecorder:
+    """Writes the events of one search (plus dynamic obstacle spawns) to a trace file"""
+    def __init__(self, filename, grid_size, start, target, grid):
+        self.size = grid_size
+        self.cells = grid_size * grid_size
+        self.file = open(filename, 'wb')
+        self.start, self.target = self._id(start), self._id(target)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, grid_size,
+                                    self.start, self.target, 0, 0))
+        self.file.write(pack_walls(wall_buffer(grid), self.cells))
+        self.buf = bytearray()
+        self.count = 0
+        # What is currently on screen, so a RESET can be written as explicit deltas
+        self.frontier = {}
+        self.expanded = set()
+
+    def _id(self, cell):
+        return cell[0] * self.size + cell[1]
+
+    def _write(self, code, node):
+        self.buf += RECORD.pack(code, node)
+        self.count += 1
+        if len(self.buf) >= FLUSH_BYTES:
+            self.file.write(self.buf)
+            self.buf.clear()
+
+    def record(self, kind, data):
+        """Records one (kind, cell) event from SearchAlgorithms.steps"""
+        if kind == DONE:
+            self.close(data); return
+        if kind == RESET:
+            for node, count in self.frontier.items():
+                for _ in range(count): self._write(K_POP, node)
+            for node in self.expanded: self._write(K_UNEXPAND, node)
+            self.frontier.clear(); self.expanded.clear()
+            self._write(K_RESET, data); return
+
+        node = self._id(data)
+        if kind == PUSH:
+            self.frontier[node] = self.frontier.get(node, 0) + 1
+        elif kind == POP:
+            left = self.frontier.get(node, 0) - 1
+            if left > 0: self.frontier[node] = left
+            else: self.frontier.pop(node, None)
+        elif kind == EXPAND:
+            if node in self.expanded: return  # Already shown; keeps records invertible
+            self.expanded.add(node)
+        self._write(KIND_CODES[kind], node)
+
+    def record_spawn(self, cell):
+        self._write(K_SPAWN, self._id(cell))
+
+    def wrap(self, events):
+        """Passes a step-event stream through while recording it"""
+        for kind, data in events:
+            self.record(kind, data)
+            yield kind, data
+
+    def close(self, path=None):
+        if self.file.closed: return
+        self._write(K_DONE, len(path) if path else 0)
+        self.file.write(self.buf)
+        self.buf.clear()
+        if path:
+            self.file.write(array('I', [self._id(cell) for cell in path]).tobytes())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.size, self.start,
+                                    self.target, self.count, len(path) if path else 0))
+        self.file.close()
+
+
+class TraceReader:
+    """Memory-maps a trace; record i is read in O(1) without loading the file"""
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        if os.fstat(self.file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{filename}: not a search trace")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rec_size, self.size, start, target, self.count, path_len = \
+            HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION or rec_size != RECORD.size:
+            raise ValueError(f"{filename}: unsupported trace (magic {magic!r}, version {version})")
+        self.cells = self.size * self.size
+        self.start, self.target = divmod(start, self.size), divmod(target, self.size)
+
+        walls_len = (self.cells + 7) // 8
+        self.walls = unpack_walls(self.mm[HEADER.size:HEADER.size + walls_len], self.cells)
+        self.records_offset = HEADER.size + walls_len
+        path_offset = self.records_offset + self.count * RECORD.size
+        ids = array('I', self.mm[path_offset:path_offset + 4 * path_len])
+        self.path = [divmod(n, self.size) for n in ids] or None
+
+    def __len__(self):
+        return self.count
+
+    def record(self, i):
+        """(kind code, node) of record i"""
+        return RECORD.unpack_from(self.mm, self.records_offset + i * RECORD.size)
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+
+def sparse_counts(counts):
+    """(node ids, values) of the nonzero entries of an array('i') of counters"""
+    if np is not None:
+        values = np.frombuffer(counts, dtype=np.int32)
+        nodes = np.flatnonzero(values).astype(np.int32)
+        return array('i', nodes.tobytes()), array('i', values[nodes].tobytes())
+    nodes = array('i', [node for node, value in enumerate(counts) if value])
+    return nodes, array('i', [counts[node] for node in nodes])
+
+
+def snapshot_bytes(snapshot):
+    return sum(len(nodes) * 2 * nodes.itemsize for nodes, _ in snapshot[:3])
+
+
+class TraceReplay:
+    """Scrubbable replay state over a TraceReader.
+
+    State is per-cell counters (frontier pushes - pops, expansions, spawns).
+    step() applies or reverts records one by one; seek() starts from the
+    nearest keyframe, which are snapshotted lazily as playback passes them.
+
+    A keyframe keeps only the nonzero counters (8 bytes each), and all of
+    them together stay under `budget` bytes: past it every other keyframe is
+    dropped and the interval doubles. The first seek beyond the furthest
+    point played so far still steps through every record in between, O(trace
+    length); after that a seek restores one keyframe (O(cells)) and steps at
+    most one interval of records.
+    """
+    def __init__(self, reader, keyframes=64, budget=KEYFRAME_BUDGET):
+        self.reader = reader
+        n = reader.cells
+        self.frontier = array('i', [0]) * n
+        self.explored = array('i', [0]) * n
+        self.dynamic = array('i', [0]) * n
+        self.pos = 0  # Number of records applied
+        self.depth = None
+        self.interval = max(4096, reader.count // keyframes + 1)
+        self.budget = budget
+        self.keyframes = {0: self._snapshot()}
+        self.keyframe_bytes = 0  # Counter storage held by self.keyframes
+
+    def _snapshot(self):
+        return tuple(map(sparse_counts, (self.frontier, self.explored, self.dynamic))) + (self.depth,)
+
+    def _keyframe(self):
+        snapshot = self.keyframes[self.pos] = self._snapshot()
+        self.keyframe_bytes += snapshot_bytes(snapshot)
+        while self.keyframe_bytes > self.budget and len(self.keyframes) > 1:
+            self.interval *= 2
+            for p in [p for p in self.keyframes if p % self.interval]:
+                self.keyframe_bytes -= snapshot_bytes(self.keyframes.pop(p))
+
+    def _restore(self, snapshot):
+        for counts, (nodes, values) in zip((self.frontier, self.explored, self.dynamic), snapshot):
+            counts[:] = array('i', [0]) * len(counts)
+            if np is not None and len(nodes):
+                np.frombuffer(counts, dtype=np.int32)[np.frombuffer(nodes, dtype=np.int32)] = np.frombuffer(values, dtype=np.int32)
+            else:
+                for node, value in zip(nodes, values): counts[node] = value
+        self.depth = snapshot[3]
+
+    def _apply(self, i, sign):
+        code, node = self.reader.record(i)
+        if code == K_PUSH: self.frontier[node] += sign
+        elif code == K_POP: self.frontier[node] -= sign
+        elif code == K_EXPAND: self.explored[node] += sign
+        elif code == K_UNEXPAND: self.explored[node] -= sign
+        elif code == K_SPAWN: self.dynamic[node] += sign
+        elif code == K_RESET:
+            self.depth = node if sign > 0 else self._depth_before(i)
+            return None
+        else:
+            return None
+        return node
+
+    def _depth_before(self, i):
+        for j in range(i - 1, -1, -1):
+            code, node = self.reader.record(j)
+            if code == K_RESET: return node
+        return None
+
+    def step(self, delta=1):
+        """Moves by `delta` records; returns the set of node ids whose state changed"""
+        target = min(max(self.pos + delta, 0), len(self.reader))
+        changed = set()
+        while self.pos < target:
+            node = self._apply(self.pos, 1)
+            if node is not None: changed.add(node)
+            self.pos += 1
+            if self.pos % self.interval == 0 and self.pos not in self.keyframes:
+                self._keyframe()
+        while self.pos > target:
+            self.pos -= 1
+            node = self._apply(self.pos, -1)
+            if node is not None: changed.add(node)
+        return changed
+
+    def seek(self, k):
+        """Jumps to record k. Returns changed node ids, or None if everything may have changed"""
+        k = min(max(k, 0), len(self.reader))
+        base = max(p for p in self.keyframes if p <= k)
+        if abs(k - self.pos) <= k - base:
+            return self.step(k - self.pos)
+        self._restore(self.keyframes[base])
+        self.pos = base
+        self.step(k - base)
+        return None
+
+    @property
+    def finished(self):
+        return self.pos == len(self.reader)
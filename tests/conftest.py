@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# Modules live at the repository root, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app():
+    # Headless app on an empty 20x20 grid; app.shown records every path it displays
+    pytest.importorskip('pygame')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import main
+    app = main.PathfinderApp(grid_size=20, obstacles='none')
+    app.env.reset_grid()
+    app.start = app.current_pos = (0, 0)
+    app.target = (19, 19)
+    app.restart_obstacles()
+    shown = []
+    show_path = app.show_path
+    app.show_path = lambda path: (shown.append(list(path)), show_path(path))
+    app.shown = shown
+    return app
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from batch import run_batch
+
+
+@pytest.mark.parametrize('suffix', ['.jsonl', '.csv'])
+def test_resume_skips_numeric_ids(tmp_path, suffix):
+    manifest = tmp_path / 'manifest.jsonl'
+    spec = {'kind': 'scatter', 'size': 12, 'seed': 3, 'coverage': 0.0}
+    with open(manifest, 'w') as f:
+        for job_id in (1, 2, 3):
+            f.write(json.dumps({'id': job_id, 'map': spec, 'start': [0, 0], 'target': [job_id, 11],
+                                'algorithm': 'bfs'}) + '\n')
+    out = str(tmp_path / ('results' + suffix))
+    assert run_batch(str(manifest), out, workers=1) == 3
+    assert run_batch(str(manifest), out, workers=1) == 0
+
+
+def read_rows(path):
+    with open(path) as f:
+        return {row['id']: row for row in map(json.loads, f)}
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_bad_maps_and_cells_become_error_rows(tmp_path, workers):
+    manifest = tmp_path / 'manifest.jsonl'
+    good = {'kind': 'scatter', 'size': 12, 'seed': 3, 'coverage': 0.0}
+    bad = {'kind': 'file', 'path': str(tmp_path / 'nope.map')}
+    jobs = [('ok', good, [0, 0], [11, 11]), ('off-map', good, [0, 0], [50, 50]),
+            ('malformed', good, [0], [1, 1]), ('no-map-1', bad, [0, 0], [1, 1]),
+            ('no-map-2', bad, [0, 0], [2, 2])]
+    with open(manifest, 'w') as f:
+        for job_id, spec, start, target in jobs:
+            f.write(json.dumps({'id': job_id, 'map': spec, 'start': start, 'target': target,
+                                'algorithm': 'bfs'}) + '\n')
+    out = str(tmp_path / 'results.jsonl')
+    assert run_batch(str(manifest), out, workers=workers) == 5
+    rows = read_rows(out)
+    assert rows['ok']['error'] is None and rows['ok']['path_len'] == 12
+    assert 'off the 12x12 map' in rows['off-map']['error'] and rows['off-map']['path_len'] is None
+    assert rows['malformed']['error'].startswith('ValueError')
+    for job_id in ('no-map-1', 'no-map-2'):
+        assert rows[job_id]['error'].startswith('FileNotFoundError')
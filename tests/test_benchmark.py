@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from benchmark import SIZE_LIMITS, build_map, make_engine, run_suite, search_args, size_limit
+from ALGORITHM import wall_buffer
+
+
+def test_iddfs_depth_limit_reaches_long_maze_paths():
+    size = 31
+    env = build_map('maze', size, 0)
+    engine, walls = make_engine(env), wall_buffer(env.grid)
+    target = size * size - 1
+    bfs_len = len(engine.bfs(0, target, walls))
+    assert bfs_len > 2 * size  # Longer than the old 2 * size limit
+    path = engine.iddfs(0, target, walls, *search_args('iddfs', size))
+    assert path is not None and len(path) == bfs_len
+
+
+def test_size_limits_per_map_kind():
+    assert size_limit(SIZE_LIMITS, 'iddfs', 'maze:kruskal') == SIZE_LIMITS['iddfs/maze']
+    assert size_limit(SIZE_LIMITS, 'iddfs', 'scatter') == SIZE_LIMITS['iddfs']
+    assert size_limit(SIZE_LIMITS, 'bfs', 'maze') is None
+
+
+def test_suite_rows_all_find_paths():
+    rows = run_suite([20], [0.2], ['bfs', 'iddfs', 'dls'], repeat=1, memory=False)
+    assert {row['map'] for row in rows} == {'empty', 'scatter', 'maze'}
+    bfs = {row['map']: row['path_len'] for row in rows if row['algorithm'] == 'bfs'}
+    for row in rows:
+        assert row['path_len'] is not None
+        if row['algorithm'] == 'iddfs': assert row['path_len'] == bfs[row['map']]
+
+
+@pytest.mark.parametrize('kind', ['scatter', 'maze:kruskal'])
+def test_build_map_leaves_the_global_rng_alone(kind):
+    random.seed(11)
+    expected = random.random()
+    random.seed(11)
+    first = build_map(kind, 21, 5, 0.3, terrain=4)
+    assert random.random() == expected
+    second = build_map(kind, 21, 5, 0.3, terrain=4)
+    assert first.grid == second.grid and first.terrain == second.terrain
+
+
+@pytest.mark.parametrize('kind, coverage', [('scatter', 0.2), ('scatter', 0.4), ('maze', 0.0), ('maze:kruskal', 0.0)])
+def test_bidirectional_searches_are_optimal(kind, coverage):
+    from benchmark import path_cost
+    for seed in range(8):
+        size = 9 + 4 * seed
+        rng = random.Random(seed)
+        for terrain, costs in [(0, (1, 1)), (9, (10, 14)), (5, (3, 1))]:
+            env = build_map(kind, size, seed, coverage, terrain, costs)
+            walls = wall_buffer(env.grid)
+            engine = make_engine(env)
+            open_ids = [i for i in range(size * size) if not walls[i]]
+            pairs = [(0, size * size - 1)] + [tuple(rng.sample(open_ids, 2)) for _ in range(6)]
+            for start, target in pairs:
+                expected = path_cost(engine, engine.ucs(start, target, walls))
+                assert path_cost(engine, engine.bidirectional_ucs(start, target, walls)) == expected, \
+                    (kind, seed, costs, start, target)
+                if terrain: continue
+                bfs = engine.bfs(start, target, walls)
+                bidirectional = engine.bidirectional_search(start, target, walls)
+                assert (bidirectional and len(bidirectional)) == (bfs and len(bfs)), (kind, seed, start, target)
+                if bidirectional:
+                    assert bidirectional[0] == start and bidirectional[-1] == target
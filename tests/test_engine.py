@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from ALGORITHM import SearchAlgorithms
+
+
+def scatter_grid(size, coverage, seed):
+    rng = random.Random(seed)
+    grid = [[-1 if rng.random() < coverage else 0 for _ in range(size)] for _ in range(size)]
+    grid[0][0] = grid[size - 1][size - 1] = 0
+    return grid
+
+
+@pytest.mark.parametrize('name', ['bfs', 'dfs', 'ucs', 'bidirectional_search', 'astar'])
+def test_callback_sees_every_discovered_cell(name):
+    grid = scatter_grid(15, 0.2, 1)
+    algo = SearchAlgorithms(15)
+    calls = []
+    def callback(cell, frontier, discovered):
+        calls.append((cell, list(discovered)))
+    path = getattr(algo, name)((0, 0), (14, 14), grid, callback)
+    assert path is not None and calls
+    for cell, discovered in calls:
+        assert cell in discovered
+        assert len(discovered) == len(set(discovered))
+    # The mirror only grows within one search direction
+    assert len(calls[-1][1]) >= len(calls[0][1])
+
+
+def test_iddfs_callback_restarts_with_each_depth():
+    grid = scatter_grid(10, 0.1, 2)
+    seen = []
+    SearchAlgorithms(10).iddfs((0, 0), (9, 9), grid, 30, lambda cell, frontier, discovered: seen.append(len(discovered)))
+    assert seen and min(seen[1:]) < max(seen)  # Later depths start from a fresh list
+
+
+def test_bitset_distance_field_matches_queue_bfs():
+    np = pytest.importorskip('numpy')
+    from ALGORITHM import GridEngine, bitset_distance_field
+    # 150 > 2 ** LOW_BITS levels, and 130 columns leave a partial last word
+    for size, seed in [(150, 0), (130, 1), (7, 2)]:
+        grid = np.array(scatter_grid(size, 0.3, seed), dtype=np.int8)
+        blocked = (grid != 0).astype(np.uint8)
+        engine = GridEngine(size)
+        expected = np.array(engine._queue_distance_field(0, memoryview(blocked.reshape(-1))))
+        dist, _ = bitset_distance_field(grid == 0, (0, 0))
+        assert np.array_equal(dist.reshape(-1), expected)
+        target = (size - 1, size - 1)
+        dist, _ = bitset_distance_field(grid == 0, (0, 0), target)
+        assert dist[target] == expected[-1]
+
+
+def test_region_search_on_numpy_grid():
+    pytest.importorskip('numpy')
+    from environment import GridEnvironment, NumpyGridEnvironment
+    lists, arrays = GridEnvironment(40), NumpyGridEnvironment(40)
+    rng = random.Random(4)
+    for _ in range(300):
+        r, c = rng.randrange(40), rng.randrange(40)
+        lists.grid[r][c] = arrays.grid[r][c] = -1
+    algo = SearchAlgorithms(40)
+    for start, target in [((3, 3), (8, 9)), ((0, 0), (39, 39)), ((35, 2), (30, 38))]:
+        for env in (lists, arrays):
+            env.grid[start[0]][start[1]] = env.grid[target[0]][target[1]] = 0
+        expected = algo.region_search(start, target, lists.grid, margin=2)
+        assert algo.region_search(start, target, arrays.grid, margin=2) == expected
+        if expected is not None:
+            assert len(expected) == len(algo.bfs(start, target, lists.grid))
+
+
+@pytest.mark.parametrize('straight, diagonal', [(3, 1), (2, 1), (1, 3), (10, 14)])
+@pytest.mark.parametrize('terrain', [False, True])
+def test_weighted_astar_matches_ucs(straight, diagonal, terrain):
+    from ALGORITHM import GridEngine, wall_buffer
+    from benchmark import path_cost
+    size = 24
+    for seed in range(6):
+        rng = random.Random(seed)
+        walls = wall_buffer(scatter_grid(size, 0.25, seed))
+        weights = bytes(rng.randint(1, 5) for _ in range(size * size)) if terrain else None
+        engine = GridEngine(size)
+        engine.set_costs(straight, diagonal, weights)
+        for _ in range(5):
+            start, target = rng.randrange(size * size), rng.randrange(size * size)
+            if walls[start] or walls[target]: continue
+            expected = path_cost(engine, engine.ucs(start, target, walls))
+            for name in ('astar', 'jps'):
+                assert path_cost(engine, getattr(engine, name)(start, target, walls)) == expected, (name, seed)
+
+
+def reference_costs(engine, source, walls):
+    """Textbook heapq Dijkstra over engine.neighbors, independent of the engine's queues"""
+    import heapq
+    dist, pq = {source: 0}, [(0, source)]
+    while pq:
+        cost, node = heapq.heappop(pq)
+        if cost > dist[node]: continue
+        for nb in engine.neighbors(node, walls):
+            step = engine.straight_cost if abs(nb - node) in (1, engine.size) else engine.diagonal_cost
+            new_cost = cost + step * (engine.weights[nb] if engine.weights is not None else 1)
+            if new_cost < dist.get(nb, new_cost + 1):
+                dist[nb] = new_cost
+                heapq.heappush(pq, (new_cost, nb))
+    return dist
+
+
+@pytest.mark.parametrize('straight, diagonal', [(1, 1), (3, 1), (2, 3), (10, 14), (7, 5)])
+@pytest.mark.parametrize('terrain', [False, True])
+def test_ucs_queue_kinds_agree(straight, diagonal, terrain):
+    from ALGORITHM import GridEngine, wall_buffer
+    from benchmark import path_cost
+    size = 20
+    for seed in range(5):
+        rng = random.Random(seed)
+        walls = wall_buffer(scatter_grid(size, 0.3, seed))
+        weights = bytes(rng.randint(1, 9) for _ in range(size * size)) if terrain else None
+        engine = GridEngine(size)
+        engine.set_costs(straight, diagonal, weights)
+        for _ in range(4):
+            start, target = rng.randrange(size * size), rng.randrange(size * size)
+            if walls[start] or walls[target]: continue
+            expected = reference_costs(engine, start, walls).get(target)
+            for queue in ('heap', 'dial', 'radix', 'indexed'):
+                path = engine.ucs_weighted(start, target, walls, queue)
+                assert path_cost(engine, path) == expected, (queue, seed, start, target)
+                if path:
+                    assert path[0] == start and path[-1] == target
+                    assert all(b in engine.neighbors(a, walls) for a, b in zip(path, path[1:]))
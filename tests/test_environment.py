@@ -0,0 +1,30 @@
+import pytest
+
+from environment import GridEnvironment, ChunkedGridEnvironment
+
+
+@pytest.fixture
+def chunked():
+    env = ChunkedGridEnvironment(16, tile=8)
+    yield env
+    env.close()
+
+
+def test_chunked_rejects_terrain_maps(tmp_path, chunked):
+    weighted = GridEnvironment(16)
+    weighted.toggle_obstacle(3, 4)
+    weighted.set_terrain(5, 5, 7)
+    path = str(tmp_path / 'weighted.bin')
+    weighted.save_map(path)
+    chunked.toggle_obstacle(9, 9)
+    with pytest.raises(ValueError, match='per-cell terrain'):
+        chunked.load_map(path)
+    # Rejected before the grid was touched
+    assert chunked.grid.get(9, 9) and not chunked.grid.get(3, 4)
+
+
+@pytest.mark.parametrize('edit', [lambda env: env.random_terrain(5), lambda env: env.set_terrain(1, 1, 3)])
+def test_chunked_rejects_terrain_edits(chunked, edit):
+    with pytest.raises(ValueError, match='uniform terrain'):
+        edit(chunked)
+    assert chunked.terrain_buffer() is None
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+import map_io
+from environment import GridEnvironment, NumpyGridEnvironment, ChunkedGridEnvironment
+from map_io import MapFile, load_scenarios, read_scen, save_scenarios, scenario, write_scen
+
+
+def walls(env, dynamic=True):
+    return [bytes(map(bool, row)) for _, row in env.wall_rows(dynamic)]
+
+
+@pytest.fixture
+def env():
+    # 21 is not a multiple of 8, so binary rows end in a partial byte
+    env = GridEnvironment(21)
+    rng = random.Random(2)
+    for _ in range(120):
+        env.toggle_obstacle(rng.randrange(21), rng.randrange(21))
+    for _ in range(10):
+        env.add_dynamic_obstacle(rng.randrange(21), rng.randrange(21))
+    return env
+
+
+@pytest.mark.parametrize('suffix', ['.map', '.bmap'])
+def test_walls_round_trip(tmp_path, env, suffix):
+    path = str(tmp_path / ('arena' + suffix))
+    env.save_map(path)
+    loaded = GridEnvironment.from_file(path)
+    assert loaded.size == 21 and walls(loaded) == walls(env)
+    env.save_map(path, dynamic=False)
+    assert walls(GridEnvironment.from_file(path)) == walls(env, dynamic=False)
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_binary_terrain_round_trip(tmp_path, monkeypatch, env, numpy):
+    if not numpy: monkeypatch.setattr(map_io, 'np', None)
+    rng = random.Random(5)
+    for _ in range(50):
+        env.set_terrain(rng.randrange(21), rng.randrange(21), rng.randint(2, 255))
+    path = str(tmp_path / 'weighted.bmap')
+    env.save_map(path)
+    loaded = GridEnvironment.from_file(path)
+    assert walls(loaded) == walls(env)
+    assert loaded.terrain_buffer() == env.terrain_buffer()
+
+
+def test_other_backends_load_the_same_walls(tmp_path, env):
+    path = str(tmp_path / 'arena.bmap')
+    env.save_map(path)
+    if map_io.np is not None:
+        assert walls(NumpyGridEnvironment.from_file(path)) == walls(env)
+    chunked = ChunkedGridEnvironment.from_file(path, tile=8)
+    try:
+        assert walls(chunked) == walls(env)
+    finally:
+        chunked.close()
+
+
+def test_text_map_pads_to_a_square(tmp_path):
+    path = tmp_path / 'wide.map'
+    path.write_text("type octile\nheight 2\nwidth 4\nmap\n.@G.\nS..T\n")
+    with MapFile(str(path)) as m:
+        assert m.size == 4
+        assert [row for _, row in m.rows()] == [b'\0\1\0\0', b'\0\0\0\1', b'\1' * 4, b'\1' * 4]
+
+
+def test_scenarios_round_trip(tmp_path):
+    map_path = str(tmp_path / 'arena.map')
+    GridEnvironment(8).save_map(map_path)
+    scenarios = [scenario(map_path, (0, 1), (7, 6), seed=3, schedule=[[1.5, 2, 2]], id='a', bucket=0),
+                 scenario(map_path, (5, 0), (0, 5), id='b', bucket=2, optimal=5.0)]
+    save_scenarios(str(tmp_path / 'runs.jsonl'), scenarios)
+    assert load_scenarios(str(tmp_path / 'runs.jsonl')) == scenarios
+    write_scen(str(tmp_path / 'runs.scen'), scenarios, 8)
+    read = read_scen(str(tmp_path / 'runs.scen'))
+    assert [(sc['map']['path'], sc['start'], sc['target'], sc['bucket']) for sc in read] == \
+        [(map_path, sc['start'], sc['target'], sc['bucket']) for sc in scenarios]
+    assert read[1]['optimal'] == 5.0
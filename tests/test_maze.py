@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from maze import GENERATORS, maze_rows
+
+SIZES = [1, 2, 3, 4, 5, 8, 11, 20, 33, 61]
+
+
+def maze(size, algorithm, seed):
+    cells = bytearray()
+    for r, row in maze_rows(size, algorithm, seed):
+        assert len(row) == size
+        cells += row
+    assert len(cells) == size * size
+    return cells
+
+
+@pytest.mark.parametrize('algorithm', GENERATORS)
+@pytest.mark.parametrize('size', SIZES)
+def test_maze_is_a_spanning_tree_of_rooms(algorithm, size):
+    k = (size + 1) // 2
+    for seed in range(4):
+        cells = maze(size, algorithm, seed)
+        assert all(cells[r * size + c] == 0 for r in range(0, size, 2) for c in range(0, size, 2))
+        # Open non-room cells are exactly the knocked-down walls between two rooms
+        edges = []
+        for r in range(size):
+            for c in range(size):
+                if cells[r * size + c] or (r % 2 == 0 and c % 2 == 0): continue
+                assert r % 2 != c % 2 and r + r % 2 < size and c + c % 2 < size, (seed, r, c)
+                a = (r // 2) * k + c // 2
+                edges.append((a, a + (k if r % 2 else 1)))
+        assert len(edges) == k * k - 1, seed
+        # k*k - 1 edges that connect all k*k rooms: a tree, so a perfect maze
+        adjacent = {room: [] for room in range(k * k)}
+        for a, b in edges:
+            adjacent[a].append(b); adjacent[b].append(a)
+        seen, stack = {0}, [0]
+        while stack:
+            for nb in adjacent[stack.pop()]:
+                if nb not in seen:
+                    seen.add(nb); stack.append(nb)
+        assert len(seen) == k * k, seed
+
+
+@pytest.mark.parametrize('algorithm', GENERATORS)
+def test_maze_seeds_are_reproducible(algorithm):
+    for size in (15, 61):
+        assert maze(size, algorithm, 7) == maze(size, algorithm, 7)
+        assert maze(size, algorithm, 7) != maze(size, algorithm, 8)
+    random.seed(3)
+    first = maze(21, algorithm, None)
+    random.seed(3)
+    assert maze(21, algorithm, None) == first
+
+
+def test_unknown_generator():
+    with pytest.raises(ValueError, match='unknown maze algorithm'):
+        list(maze_rows(5, 'prim'))
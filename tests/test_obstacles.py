@@ -0,0 +1,62 @@
+import pytest
+
+from environment import GridEnvironment, NumpyGridEnvironment
+from obstacles import PROFILES
+
+
+def run(env, seed, profile, steps, ticks=1.0, protected=None):
+    env.obstacles.reset(seed, profile)
+    batches = []
+    env.obstacles.listeners.append(batches.append)
+    for _ in range(steps):
+        env.obstacles.advance(ticks, protected)
+    env.obstacles.listeners.remove(batches.append)
+    return env.obstacles.log, batches
+
+
+@pytest.mark.parametrize('profile', [name for name in PROFILES if name != 'none'])
+def test_timeline_depends_only_on_seed_and_clock(profile):
+    log, batches = run(GridEnvironment(30), 7, profile, 200)
+    assert log and sum(map(len, batches)) == len(log)
+    # Same seed, same events however the clock is chopped up
+    assert run(GridEnvironment(30), 7, profile, 800, ticks=0.25)[0] == log
+    assert run(GridEnvironment(30), 7, profile, 1, ticks=200)[0] == log
+    assert run(GridEnvironment(30), 8, profile, 200)[0] != log
+
+
+def test_blocked_cells_are_dropped_without_shifting_later_events():
+    open_log, _ = run(GridEnvironment(30), 3, 'cluster', 300)
+    walled = GridEnvironment(30)
+    walled.add_static_wall(0, 10, 30)
+    agent = (15, 15)
+    walled_log, _ = run(walled, 3, 'cluster', 300, protected=lambda cell: cell == agent)
+    assert walled_log == [e for e in open_log if e[2] != 10 and (e[1], e[2]) != agent]
+
+
+def test_replay_reproduces_the_recorded_grid():
+    pytest.importorskip('numpy')
+    source = GridEnvironment(30)
+    log, _ = run(source, 5, 'burst', 120)
+    for env in (GridEnvironment(30), NumpyGridEnvironment(30)):
+        env.obstacles.replay(log)
+        batches = []
+        env.obstacles.listeners.append(batches.append)
+        for _ in range(120):
+            env.obstacles.advance(1)
+        assert env.obstacles.log == log
+        assert [cell for batch in batches for cell in batch] == [(r, c) for _, r, c in log]
+        assert sorted(env.dynamic_obstacles) == sorted(source.dynamic_obstacles)
+
+
+def test_app_runs_meet_the_same_obstacles(app):
+    import main
+    app.obstacle_seed, app.obstacle_profile = 5, 'burst'
+    app.events_per_sec = main.FPS  # One search event per frame: every run is still searching
+    logs = []
+    for code in (1, 1, 3):  # bfs, bfs again, ucs
+        app.run_algo(code)
+        for _ in range(400):
+            next(app.task)
+        logs.append(list(app.env.obstacles.log))
+        assert sorted(app.env.dynamic_obstacles) == sorted((r, c) for _, r, c in logs[-1])
+    assert logs[0] and logs[0] == logs[1] == logs[2]
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from path_server import PathServer
+
+
+class Writer:
+    """Collects the response lines PathServer.respond writes"""
+    def __init__(self):
+        self.lines = []
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.lines.append(json.loads(data))
+
+    async def drain(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = PathServer(workers=1)
+    yield server
+    server.close()
+
+
+def run(server, *requests):
+    """Responses to `requests`, all sent at once as on one pipelined connection"""
+    writer = Writer()
+    async def send():
+        await asyncio.gather(*(server.respond(json.dumps(request).encode(), writer, 0.0)
+                               for request in requests))
+    asyncio.run(send())
+    return sorted(writer.lines, key=lambda response: response.get('id', 0))
+
+
+def test_fields_are_coalesced_cached_and_invalidated(server):
+    spec = {'kind': 'scatter', 'size': 20, 'seed': 1, 'coverage': 0.0}
+    loaded, = run(server, {'op': 'load', 'map': 'm', 'spec': spec})
+    assert loaded['ok'] and loaded['size'] == 20
+    query = {'op': 'path', 'map': 'm', 'start': [0, 0], 'target': [0, 19]}
+    first = run(server, *(dict(query, id=i) for i in range(4)))
+    assert [r['length'] for r in first] == [20] * 4
+    assert server.counts['fields'] == 1 and server.counts['coalesced'] == 3
+    assert run(server, query)[0]['length'] == 20 and server.counts['cached'] == 1
+
+    # An edit bumps the version; the old field must not answer for the new map
+    toggled, = run(server, {'op': 'toggle', 'map': 'm', 'cell': [0, 10]})
+    assert toggled['blocked'] and toggled['version'] > first[0]['version']
+    after, = run(server, query)
+    assert after['version'] == toggled['version'] and [0, 10] not in after['path']
+    assert server.counts['fields'] == 2
+
+    ticked, = run(server, {'op': 'tick', 'map': 'm', 'ticks': 30, 'seed': 2, 'profile': 'burst'})
+    assert ticked['spawned'] and ticked['version'] > toggled['version']
+    run(server, query)
+    assert server.counts['fields'] == 3
+
+
+@pytest.mark.parametrize('name', ['dls', 'iddfs', 'ucs', 'jps'])
+def test_named_searches_get_default_args(server, name):
+    run(server, {'op': 'load', 'map': 'm', 'spec': {'kind': 'maze', 'size': 15, 'seed': 2}})
+    bfs, searched = run(server, {'op': 'path', 'map': 'm', 'start': [0, 0], 'target': [14, 14], 'id': 1},
+                        {'op': 'path', 'map': 'm', 'start': [0, 0], 'target': [14, 14], 'id': 2,
+                         'algorithm': name})
+    assert searched['ok'], searched
+    assert searched['path'][0] == [0, 0] and searched['path'][-1] == [14, 14]
+    if name != 'dls': assert searched['length'] == bfs['length']
+
+
+def test_bad_requests_get_error_responses(server):
+    run(server, {'op': 'load', 'map': 'm', 'spec': {'kind': 'empty', 'size': 8}})
+    responses = run(server,
+                    {'id': 1, 'op': 'path', 'map': 'nope', 'start': [0, 0], 'target': [1, 1]},
+                    {'id': 2, 'op': 'path', 'map': 'm', 'start': [0, 0], 'target': [8, 8]},
+                    {'id': 3, 'op': 'path', 'map': 'm', 'start': [0], 'target': [1, 1]},
+                    {'id': 4, 'op': 'path', 'map': 'm', 'start': [0, 0], 'target': [1, 1], 'algorithm': 'x'},
+                    {'id': 5, 'op': 'tick', 'map': 'm', 'profile': 'x'},
+                    {'id': 6, 'op': 'fly', 'map': 'm'})
+    assert [r['id'] for r in responses] == [1, 2, 3, 4, 5, 6]
+    assert not any(r['ok'] for r in responses)
+    for r, text in zip(responses, ['unknown map', 'off the 8x8 map', 'bad cell', 'unknown algorithm',
+                                   'unknown profile', 'unknown op']):
+        assert text in r['error'] and r['error'].startswith('RequestError')
+    assert server.counts['errors'] == 6
+    bad_json = Writer()
+    asyncio.run(server.respond(b'[1, 2', bad_json, 0.0))
+    assert not bad_json.lines[0]['ok']
@@ -0,0 +1,79 @@
+import pytest
+
+from ALGORITHM import IncrementalPlanner, SearchAlgorithms
+
+
+def empty_grid(size):
+    return [[0] * size for _ in range(size)]
+
+
+def test_update_repairs_added_and_removed_walls():
+    grid = empty_grid(12)
+    planner = IncrementalPlanner(12)
+    path = planner.plan((0, 0), (11, 11), grid)
+    assert len(path) == 12
+    blocked = path[5]
+    grid[blocked[0]][blocked[1]] = -1
+    path = planner.update([blocked], grid)
+    assert blocked not in path and len(path) == len(SearchAlgorithms(12).bfs((0, 0), (11, 11), grid))
+    grid[blocked[0]][blocked[1]] = 0
+    path = planner.update([blocked], grid)
+    assert len(path) == 12
+
+
+def test_stale_cells_finds_edits_update_was_not_told_about():
+    grid = empty_grid(10)
+    planner = IncrementalPlanner(10)
+    path = planner.plan((0, 0), (9, 9), grid)
+    edit = path[1]
+    grid[edit[0]][edit[1]] = -1
+    assert planner.update([], grid)[1] == edit  # Unaware of the edit
+    assert planner.stale_cells(grid) == [edit]
+    path = planner.update(planner.stale_cells(grid), grid)
+    assert edit not in path
+
+
+def run_walk(app, edit, limit=500):
+    task = app.move_agent(SearchAlgorithms(20).bfs(app.start, app.target, app.env.grid))
+    for _ in range(limit):
+        try:
+            next(task)
+        except StopIteration:
+            return
+        edit(app)
+    raise AssertionError(f"walk did not finish: {app.status_msg}")
+
+
+def next_cell(app):
+    path = app.shown[-1]
+    return path[path.index(app.current_pos) + 1] if app.current_pos in path[:-1] else None
+
+
+def test_walk_replans_around_walls_drawn_on_the_replanned_path(app):
+    drawn = []
+    def edit(app):
+        # Wall off the next cell of the current plan, three times: the first block
+        # builds the planner, the later ones must reach it as changes
+        cell = next_cell(app)
+        if len(drawn) < 3 and cell and cell != app.target and app.current_pos != app.start \
+                and app.env.grid[cell[0]][cell[1]] == 0:
+            app.handle_grid_click(*cell)
+            drawn.append(cell)
+    run_walk(app, edit)
+    assert len(drawn) == 3
+    assert app.status_msg == "Target Reached!" and app.current_pos == app.target
+    assert not any(cell in app.traced_set for cell in drawn)
+
+
+def test_walk_sees_cells_reopened_by_clear_dynamic(app):
+    state = {'cleared': False}
+    def edit(app):
+        cell = next_cell(app)
+        if not state['cleared'] and cell and cell != app.target and app.current_pos != app.start:
+            if app.env.add_dynamic_obstacle(*cell):
+                app.walk_changes.append(cell)
+            if len(app.shown) >= 2:  # Replanned once: reopen everything
+                app.clear_dynamic()
+                state['cleared'] = True
+    run_walk(app, edit)
+    assert app.status_msg == "Target Reached!"
@@ -0,0 +1,45 @@
+import pytest
+
+from ALGORITHM import SearchAlgorithms, wall_buffer
+from benchmark import build_map, search_args
+from search_stats import SearchStats
+
+NAMES = ['bfs', 'dfs', 'ucs', 'dls', 'iddfs', 'bidirectional_search', 'bidirectional_ucs', 'astar', 'jps']
+COMPARED = ['expansions', 'neighbor_calls', 'pushes', 'duplicate_pops', 'peak_visited', 'path_len']
+
+
+def both_ways(env, name, start, target):
+    """Stats of one search run directly (stats=) and as a wrapped step stream"""
+    size = env.size
+    algo = SearchAlgorithms(size)
+    # The step stream is a lazy binary heap; other queues break cost ties in another order
+    algo.set_costs(env.straight_cost, env.diagonal_cost, queue='heap')
+    args = search_args(name, size)
+    direct = SearchStats()
+    getattr(algo, name)(start, target, env.grid, *args, stats=direct)
+    wrapped = SearchStats()
+    engine = algo.engine
+    events = engine.steps(name, engine.node_id(start), engine.node_id(target), wall_buffer(env.grid), *args)
+    for _ in wrapped.wrap(events, name): pass
+    return direct, wrapped
+
+
+@pytest.mark.parametrize('costs', [(1, 1), (10, 14)])
+@pytest.mark.parametrize('name', NAMES)
+def test_direct_and_wrapped_stats_agree(name, costs):
+    # Depth-limited searches stay on small maps: they are exponential in open space
+    size = 12 if name in ('dls', 'iddfs') else 40
+    for kind, coverage, seed in [('scatter', 0.3, 2), ('scatter', 0.45, 3), ('maze', 0.0, 1)]:
+        env = build_map(kind, size, seed, coverage, costs=costs)
+        for start, target in [((0, 0), (size - 1, size - 1)), ((0, 0), (0, 0)), ((5, 5), (6, 6))]:
+            if env.grid[start[0]][start[1]] or env.grid[target[0]][target[1]]: continue
+            direct, wrapped = both_ways(env, name, start, target)
+            for key in COMPARED:
+                assert getattr(direct, key) == getattr(wrapped, key), (key, kind, seed, start, target)
+
+
+def test_target_pop_counts_as_an_expansion():
+    env = build_map('empty', 5, 0)
+    direct, wrapped = both_ways(env, 'bfs', (2, 2), (2, 2))
+    assert direct.expansions == wrapped.expansions == 1
+    assert direct.path_len == wrapped.path_len == 1
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+import search_trace
+from ALGORITHM import SearchAlgorithms
+from search_trace import TraceRecorder, TraceReader, TraceReplay, snapshot_bytes
+
+
+@pytest.fixture
+def reader(tmp_path):
+    rng = random.Random(5)
+    size = 40
+    grid = [[-1 if rng.random() < 0.2 else 0 for _ in range(size)] for _ in range(size)]
+    grid[0][0] = grid[size - 1][size - 1] = 0
+    filename = str(tmp_path / 'bfs.svt')
+    recorder = TraceRecorder(filename, size, (0, 0), (size - 1, size - 1), grid)
+    for _ in recorder.wrap(SearchAlgorithms(size).steps('bfs', (0, 0), (size - 1, size - 1), grid)):
+        pass
+    reader = TraceReader(filename)
+    yield reader
+    reader.close()
+
+
+def state(replay):
+    return list(replay.frontier), list(replay.explored), list(replay.dynamic), replay.depth
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_seek_matches_stepping_under_a_small_budget(reader, monkeypatch, numpy):
+    if not numpy: monkeypatch.setattr(search_trace, 'np', None)
+    replay = TraceReplay(reader, budget=60000)
+    replay.interval = 50
+    replay.step(len(reader))
+    # Thinning doubled the interval and kept the keyframes under the budget
+    assert replay.interval > 50 and len(replay.keyframes) > 2
+    assert replay.keyframe_bytes == sum(map(snapshot_bytes, replay.keyframes.values()))
+    assert replay.keyframe_bytes <= 60000
+    assert all(p % replay.interval == 0 for p in replay.keyframes)
+    rng = random.Random(1)
+    for k in [0, len(reader)] + [rng.randrange(len(reader)) for _ in range(15)]:
+        replay.seek(k)
+        reference = TraceReplay(reader)
+        reference.step(k)
+        assert state(replay) == state(reference), k